@@ -1,16 +1,284 @@
 from __future__ import annotations
 
+import asyncio
+from array import array
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from datetime import datetime
+import hashlib
+import io
 import json
 import os
 import logging
-from typing import List, Tuple, Dict, Any, Optional
+import random
+import shutil
+import threading
+import time
+import traceback
+from functools import lru_cache
+from itertools import islice
+from typing import List, Tuple, Dict, Any, Iterator, Optional
 import re
 
+import httpx
+
+try:
+    import orjson  # type: ignore
+
+    _json_loads = orjson.loads
+    _json_dumpb = orjson.dumps
+except ImportError:  # pragma: no cover - stdlib fallback
+    _json_loads = json.loads
+
+    def _json_dumpb(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+try:
+    from openai import AsyncOpenAI, OpenAI  # type: ignore
+except ImportError:  # pragma: no cover - AI features are optional
+    AsyncOpenAI = None  # type: ignore
+    OpenAI = None  # type: ignore
+
+try:
+    import h2  # type: ignore  # noqa: F401  (enables httpx HTTP/2)
+
+    _HTTP2 = True
+except ImportError:  # pragma: no cover - HTTP/1.1 keep-alive pool instead
+    _HTTP2 = False
+
+try:
+    import fitz  # type: ignore
+except ImportError:  # pragma: no cover - PDF features need PyMuPDF
+    fitz = None  # type: ignore
+
+try:
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - sorted() fallback in _median_font_size
+    np = None  # type: ignore
+
 logger = logging.getLogger("summit.ai")
 
+# Compiled once: these run for every model response and every PDF text line
+_JSON_FENCE_LANG_RE = re.compile(r"^\s*json\s*\n", re.IGNORECASE)
+_JSON_STRUCT_RE = re.compile(r'[\[\]{}"\\]')
+_TRAILING_COMMA_RE = re.compile(r",\s*([\]}])")
+_CHAPTER_RE = re.compile(r"^(Chapter|Section|Part|Unit|Module|Lesson)\s+\d+", re.IGNORECASE)
+_NUMBERED_RE = re.compile(r"^\d+\.?\d*\s+[A-Z]")
+_CHAPTER_HEADER_RE = re.compile(r"^(\d+\.?\d*\s+[A-Z]|Chapter|Section|Part)", re.IGNORECASE)
+
+# Common preface/front matter sections dropped from AI-extracted TOCs (casefolded)
+_SKIP_EXACT = frozenset({
+    "preface", "foreword", "acknowledgment", "acknowledgments", "dedication",
+    "about the author", "about the authors", "about this book",
+    "to everyone", "to educators", "to students", "to readers",
+    "final words", "references", "bibliography", "index",
+    "table of contents", "contents", "copyright", "publishing information",
+    "a dialogue on the book",
+})
+_SKIP_PREFIX = ("preface to", "appendix", "how to use")
+# Chapters not worth a first-page parse + enhanced summary: the merged front-matter entry and
+# anything starting in the first few pages
+_FRONT_MATTER_TITLES = _SKIP_EXACT | {"introduction"}
+_FRONT_MATTER_PAGES = 5
+
+# --- Prompt templates ---
+# Static instructions come first and are byte-identical across calls so OpenAI's automatic
+# prompt caching can reuse the shared prefix; per-call values (counts, titles, text) go last.
+
+_JSON_ARRAY_SYSTEM = "Return only a JSON array. Do not include code fences or extra text."
+
+_SYLLABUS_INSTRUCTIONS = (
+    "Create a concise syllabus from the provided course text. "
+    "Return JSON array of objects: {title: string, summary: string}. "
+    "Keep summaries under 200 chars. "
+    "Do not include leading numbering tokens in titles (e.g., '1.', '1)', 'I.', 'A.', 'Chapter 1')."
+)
+
+_QUIZ_SYSTEM = "You are a quiz generator. Return only valid JSON array with no additional text or code fences."
+_QUIZ_INSTRUCTIONS = """Create multiple-choice questions based on the section content below.
+
+Each question should:
+- Test understanding of key concepts from the text
+- Be clear and unambiguous
+- Have exactly 4 options
+
+Return a JSON array where each item has:
+- "prompt": the question text
+- "correct": the correct answer
+- "wrong": array of 3 incorrect answers
+
+Example format:
+[
+  {
+    "prompt": "What is the main topic discussed?",
+    "correct": "The correct answer",
+    "wrong": ["Wrong answer 1", "Wrong answer 2", "Wrong answer 3"]
+  }
+]"""
+
+_FLASHCARD_SYSTEM = "You are a flashcard generator. Return only valid JSON array with no additional text or code fences."
+_FLASHCARD_INSTRUCTIONS = """Create flashcards for studying the section content below. Mix Q&A format and Term/Definition format based on what's most appropriate.
+
+For Q&A cards: front should be a question, back should be the answer
+For Term/Definition cards: front should be a key term, back should be its definition
+
+Return ONLY a JSON array (no code fences, no extra text):
+[
+  {
+    "front": "Question or Term",
+    "back": "Answer or Definition",
+    "card_type": "qa" or "term_definition"
+  }
+]"""
+
+_ASSIGNMENT_INSTRUCTIONS = (
+    "Create short-answer assignment prompts from the syllabus titles. "
+    "Return JSON array of {prompt: string, expected_keyword: string}."
+)
+
+_SUMMARY_SYSTEM = "Return only a single concise summary <= 200 chars."
+_MULTI_SUMMARY_SYSTEM = (
+    "You summarize textbook sections. Return only a JSON array of objects: {id: number, summary: string}, "
+    "one per section, each summary a single concise sentence <= 200 chars. "
+    "Do not include code fences or extra text."
+)
+
+_TOC_TEXT_SYSTEM = (
+    "You extract a Table of Contents from textbook text. "
+    "Return only JSON array of objects: {title: string, page?: number}. "
+    "Include only top-level items. Do not include nested sections. "
+    "Do not include code fences or any extra text—return raw JSON only."
+)
+
+_TOC_STRUCTURE_SYSTEM = "You extract table of contents structure. Return only JSON array of strings."
+_TOC_STRUCTURE_INSTRUCTIONS = """Extract the table of contents from this textbook. Return ONLY the chapter/section TITLES as a JSON array of strings.
+
+Rules:
+- Return chapter titles ONLY (no page numbers, no subsections)
+- Skip preface, acknowledgments, references, index
+- Focus on main learning chapters
+- Return empty array [] if no clear TOC found
+
+Example output: ["Introduction to Operating Systems", "Processes and Threads", "Memory Management", "File Systems"]"""
+
+_SAMPLES_SYSTEM = "You are an educational content analyzer. Return only valid JSON."
+_SAMPLES_INSTRUCTIONS = """You are analyzing a textbook. I'm providing you with text samples from various pages throughout the document.
+
+Based on these samples, create a logical syllabus structure with the requested number of main topics/chapters.
+
+Return a JSON array of objects with:
+- "title": A clear, descriptive chapter/topic title (no numbering prefixes like "1.", "Chapter 1")
+- "summary": A concise summary (under 200 characters)
+
+The syllabus should represent a logical learning progression through the material."""
+
+
+def _summary_user_prompt(title: str, text: str) -> str:
+    return f"Title: {title}\n\nTEXT (sample):\n{text[:2000]}"
+
+# Env settings read once; main.lifespan calls reload_env() after loading .env
+_OPENAI_API_KEY: Optional[str] = None
+_OPENAI_MODEL = "gpt-4o-mini"
+_OPENAI_TOC_MODEL = "gpt-4o-mini"
+_AI_DEBUG = False
+_SYLLABUS_MODEL = "o3-mini"
+_SYLLABUS_REASONING = True  # o-series models reject temperature and system prompts
+_ENHANCED_SUMMARIES = False
+_AI_BATCH = False
+
+
+def reload_env() -> None:
+    """Re-read the cached env settings (after load_dotenv, or when tests change them)."""
+    global _OPENAI_API_KEY, _OPENAI_MODEL, _OPENAI_TOC_MODEL, _AI_DEBUG
+    global _SYLLABUS_MODEL, _SYLLABUS_REASONING, _ENHANCED_SUMMARIES, _AI_BATCH
+    _OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+    _OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+    _OPENAI_TOC_MODEL = os.getenv("OPENAI_TOC_MODEL", _OPENAI_MODEL)
+    _AI_DEBUG = os.getenv("AI_DEBUG_LOG") == "1"
+    _SYLLABUS_MODEL = os.getenv("OPENAI_SYLLABUS_MODEL", "o3-mini")
+    _SYLLABUS_REASONING = _SYLLABUS_MODEL.startswith(("o3", "o1"))
+    _ENHANCED_SUMMARIES = os.getenv("ENABLE_ENHANCED_SUMMARIES", "false").lower() in ("true", "1", "yes")
+    _AI_BATCH = os.getenv("AI_BATCH") == "1"
+    # Clients capture the key at construction
+    _sync_client.cache_clear()
+    _async_client.cache_clear()
+
+
+# Keep-alive pool shared by every call so TLS sessions are reused across requests; with h2
+# installed the calls multiplex over a single HTTP/2 connection instead
+_HTTP_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+_HTTP_TIMEOUT = httpx.Timeout(60.0, connect=10.0)
+
+
+@lru_cache(maxsize=1)
+def _sync_client() -> "OpenAI":
+    """Process-wide OpenAI client (created on first use, after .env is loaded)."""
+    if OpenAI is None:
+        raise ImportError("openai package is not installed")
+    return OpenAI(
+        api_key=_OPENAI_API_KEY,
+        http_client=httpx.Client(http2=_HTTP2, limits=_HTTP_LIMITS, timeout=_HTTP_TIMEOUT),
+    )
+
+
+def _ai_concurrency() -> int:
+    """Max in-flight OpenAI requests for the async fan-out paths (AI_CONCURRENCY, default 10)."""
+    return max(1, int(os.getenv("AI_CONCURRENCY", "10")))
+
+
+@lru_cache(maxsize=1)
+def _async_client() -> "AsyncOpenAI":
+    """Process-wide AsyncOpenAI client for the parallel summary paths."""
+    if AsyncOpenAI is None:
+        raise ImportError("openai package is not installed")
+    # Size the async pool to the fan-out so bulk summaries never queue on the transport
+    concurrency = _ai_concurrency()
+    limits = httpx.Limits(max_connections=max(100, concurrency), max_keepalive_connections=max(100, concurrency))
+    return AsyncOpenAI(
+        api_key=_OPENAI_API_KEY,
+        http_client=httpx.AsyncClient(http2=_HTTP2, limits=limits, timeout=_HTTP_TIMEOUT),
+    )
+
+
+async def aclose_clients() -> None:
+    """Close the shared OpenAI clients and their connection pools (app shutdown)."""
+    if _async_client.cache_info().currsize:
+        await _async_client().close()
+    if _sync_client.cache_info().currsize:
+        _sync_client().close()
+    _sync_client.cache_clear()
+    _async_client.cache_clear()
+
+
+# Public accessors for the route modules; they read the cached state at call time so
+# reload_env() and client rebuilds are picked up
+def sync_client() -> "OpenAI":
+    """The shared OpenAI client."""
+    return _sync_client()
+
+
+def async_client() -> "AsyncOpenAI":
+    """The shared AsyncOpenAI client."""
+    return _async_client()
+
+
+def openai_model() -> str:
+    """Chat model from OPENAI_MODEL, as last read by reload_env()."""
+    return _OPENAI_MODEL
+
+
+reload_env()
+
+
+def _ai_debug() -> bool:
+    """AI_DEBUG_LOG prompt/response dumps; also skipped when DEBUG isn't enabled for this logger."""
+    return _AI_DEBUG and logger.isEnabledFor(logging.DEBUG)
+
 
 def _has_key() -> bool:
-    return bool(os.getenv("OPENAI_API_KEY"))
+    # Without the SDK every AI path would just fail into its fallback
+    return bool(_OPENAI_API_KEY) and OpenAI is not None
 
 
 def should_use_ai() -> bool:
@@ -45,93 +313,124 @@ def should_use_ai() -> bool:
     return has_key
 
 
+def _extract_balanced(text: str, open_c: str, close_c: str, start: int = 0) -> Optional[Tuple[int, int]]:
+    """Span of the first balanced open_c...close_c block at or after start.
+
+    Hops between structural characters only and ignores brackets inside JSON
+    strings, so the scan is linear in len(text) (no regex backtracking).
+    """
+    begin = text.find(open_c, start)
+    if begin == -1:
+        return None
+    depth = 0
+    in_string = False
+    skip_to = begin
+    for m in _JSON_STRUCT_RE.finditer(text, begin):
+        pos = m.start()
+        if pos < skip_to:
+            continue
+        c = m.group()
+        if in_string:
+            if c == "\\":
+                skip_to = pos + 2  # escaped character, e.g. \"
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = True
+        elif c == open_c:
+            depth += 1
+        elif c == close_c:
+            depth -= 1
+            if depth == 0:
+                return begin, pos + 1
+    return None
+
+
 def _try_parse_json(text: str) -> Any | None:
     """Best-effort JSON extraction from model output.
 
     Handles common cases:
     - Raw JSON
     - JSON wrapped in Markdown code fences (```json ... ```)
-    - JSON preceded/followed by prose; extracts first array/object via regex
+    - JSON preceded/followed by prose; extracts first balanced array/object
     """
-    # 1) Direct parse
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # 2) Strip Markdown code fences
-    if "```" in text:
+    # 1) Direct parse, only attempted when the text already looks like JSON
+    stripped = text.lstrip()
+    if stripped[:1] in ("[", "{"):
         try:
-            first = text.find("```")
-            second = text.find("```", first + 3)
-            if first != -1 and second != -1:
-                inner = text[first + 3 : second]
-                # remove optional language tag at start (e.g., 'json\n')
-                inner = re.sub(r"^\s*json\s*\n", "", inner, flags=re.IGNORECASE)
-                return json.loads(inner.strip())
-        except Exception:
+            return _json_loads(stripped)
+        except ValueError:
             pass
-    # 3) Regex extract first array/object block
-    try:
-        m = re.search(r"\[[\s\S]*\]", text)
-        if m:
-            return json.loads(m.group(0))
-    except Exception:
-        pass
-    try:
-        m = re.search(r"\{[\s\S]*\}", text)
-        if m:
-            return json.loads(m.group(0))
-    except Exception:
-        pass
-    logger.debug("_try_parse_json: failed to parse JSON from text (first 500 chars)=%r", text[:500])
+    # 2) Strip Markdown code fences
+    first = text.find("```")
+    if first != -1:
+        second = text.find("```", first + 3)
+        if second != -1:
+            inner = text[first + 3 : second]
+            # remove optional language tag at start (e.g., 'json\n')
+            inner = _JSON_FENCE_LANG_RE.sub("", inner)
+            try:
+                return _json_loads(inner.strip())
+            except ValueError:
+                pass
+    # 3) Extract first balanced array/object block
+    for open_c, close_c in (("[", "]"), ("{", "}")):
+        span = _extract_balanced(text, open_c, close_c)
+        while span is not None:
+            try:
+                return _json_loads(text[span[0] : span[1]])
+            except ValueError:
+                # e.g. "[see below]" in prose; keep scanning after it
+                span = _extract_balanced(text, open_c, close_c, span[1])
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("_try_parse_json: failed to parse JSON from text (first 500 chars)=%r", text[:500])
     return None
 
 
+def parse_json(text: str) -> Any | None:
+    """Best-effort JSON extraction from model output (see _try_parse_json)."""
+    return _try_parse_json(text)
+
+
+def _fallback_syllabus(text: str, max_items: int) -> List[Tuple[str, str]]:
+    """Naive syllabus: evenly spaced non-empty lines as titles, the following lines as summaries."""
+    # naive fallback: pick non-empty lines
+    lines = list(filter(None, map(str.strip, text.splitlines())))
+    if not lines:
+        return [("Introduction", "Overview of provided material.")]
+    step = max(1, len(lines) // max_items)
+    return [
+        (lines[i][:80] or f"Module {idx+1}", " ".join(lines[i + 1 : i + 4])[:200] or "Summary for this section.")
+        for idx, i in enumerate(range(0, len(lines), step)[:max_items])
+    ]
+
+
 def generate_syllabus(text: str, max_items: int = 8, use_ai: bool = False, topics: Optional[str] = None) -> List[Tuple[str, str]]:
     if not use_ai or not _has_key():
         logger.info("generate_syllabus: using fallback (use_ai=%s, has_key=%s)", use_ai, _has_key())
-        # naive fallback: pick non-empty lines
-        lines = [line.strip() for line in text.splitlines() if line.strip()]
-        if not lines:
-            return [("Introduction", "Overview of provided material.")]
-        items: list[tuple[str, str]] = []
-        step = max(1, len(lines) // max_items)
-        for idx, i in enumerate(range(0, len(lines), step)):
-            if idx >= max_items:
-                break
-            title = lines[i][:80]
-            summary = " ".join(lines[i + 1 : i + 1 + 3])[:200] or "Summary for this section."
-            items.append((title or f"Module {idx+1}", summary))
-        return items
+        return _fallback_syllabus(text, max_items)
 
     # AI path
     try:
-        from openai import OpenAI  # type: ignore
-
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        model = _OPENAI_MODEL
         logger.info("generate_syllabus: using AI model=%s, max_items=%d, topics_provided=%s", model, max_items, bool(topics))
-        prompt = (
-            "Create a concise syllabus from the provided course text. "
-            "Return JSON array of objects: {title: string, summary: string}. "
-            f"Limit to {max_items} items. Keep summaries under 200 chars. "
-            "Do not include leading numbering tokens in titles (e.g., '1.', '1)', 'I.', 'A.', 'Chapter 1')."
-        )
+        prompt = f"{_SYLLABUS_INSTRUCTIONS} Limit to {max_items} items."
         if topics:
             prompt += f" Focus on these topics/goals where relevant: {topics}."
         combined = f"{prompt}\n\nTEXT:\n{text[:12000]}"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("generate_syllabus: PROMPT (first 2k chars)=%s", combined[:2000])
         resp = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "Return only a JSON array. Do not include code fences or extra text."},
+                {"role": "system", "content": _JSON_ARRAY_SYSTEM},
                 {"role": "user", "content": combined},
             ],
             temperature=0.2,
         )
         content = resp.choices[0].message.content or "[]"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("generate_syllabus: RAW RESPONSE (first 2k chars)=%s", (content or "")[:2000])
         data = _try_parse_json(content) or []
         items: list[tuple[str, str]] = []
@@ -145,7 +444,24 @@ def generate_syllabus(text: str, max_items: int = 8, use_ai: bool = False, topic
             return items[:max_items]
     except Exception:
         logger.warning("generate_syllabus: AI path failed; falling back", exc_info=True)
-    return generate_syllabus(text, max_items=max_items, use_ai=False)
+    return _fallback_syllabus(text, max_items)
+
+
+def _fallback_quiz(section_title: str, num_questions: int) -> List[Dict[str, Any]]:
+    """Placeholder comprehension questions used when the AI path is off or fails."""
+    # Simple fallback - create basic comprehension questions
+    items: list[Dict[str, Any]] = []
+    for i in range(min(num_questions, 3)):
+        options = [
+            f"Answer option {j+1} for {section_title}" for j in range(4)
+        ]
+        random.shuffle(options)
+        items.append({
+            "prompt": f"Question {i+1} about {section_title}",
+            "options": options,
+            "answer_index": 0,  # First option is always correct in fallback
+        })
+    return items
 
 
 def generate_quiz_from_content(
@@ -155,61 +471,26 @@ def generate_quiz_from_content(
     use_ai: bool = False
 ) -> List[Dict[str, Any]]:
     """Generate quiz questions from full section content rather than just titles."""
-    import random
-
     if not use_ai or not _has_key():
         logger.info("generate_quiz_from_content: using fallback (use_ai=%s, has_key=%s)", use_ai, _has_key())
-        # Simple fallback - create basic comprehension questions
-        items: list[Dict[str, Any]] = []
-        for i in range(min(num_questions, 3)):
-            options = [
-                f"Answer option {j+1} for {section_title}" for j in range(4)
-            ]
-            random.shuffle(options)
-            items.append({
-                "prompt": f"Question {i+1} about {section_title}",
-                "options": options,
-                "answer_index": 0,  # First option is always correct in fallback
-            })
-        return items
+        return _fallback_quiz(section_title, num_questions)
 
     try:
-        from openai import OpenAI  # type: ignore
-
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        model = _OPENAI_MODEL
         logger.info("generate_quiz_from_content: using AI model=%s, num_questions=%d", model, num_questions)
 
         # Truncate content if too long (keep under ~8000 chars for context)
         content_excerpt = section_content[:8000] if len(section_content) > 8000 else section_content
 
-        prompt = f"""Create {num_questions} multiple-choice questions based on the following content from "{section_title}".
-
-Each question should:
-- Test understanding of key concepts from the text
-- Be clear and unambiguous
-- Have exactly 4 options
-
-Return a JSON array where each item has:
-- "prompt": the question text
-- "correct": the correct answer
-- "wrong": array of 3 incorrect answers
-
-Example format:
-[
-  {{
-    "prompt": "What is the main topic discussed?",
-    "correct": "The correct answer",
-    "wrong": ["Wrong answer 1", "Wrong answer 2", "Wrong answer 3"]
-  }}
-]
-
-CONTENT:
-{content_excerpt}
-
-Generate {num_questions} questions:"""
+        prompt = (
+            f"{_QUIZ_INSTRUCTIONS}\n\n"
+            f"SECTION: \"{section_title}\"\n\n"
+            f"CONTENT:\n{content_excerpt}\n\n"
+            f"Generate {num_questions} questions:"
+        )
 
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("="*80)
             logger.debug("GENERATE_QUIZ_FROM_CONTENT - START")
             logger.debug("Section Title: %s", section_title)
@@ -223,14 +504,14 @@ Generate {num_questions} questions:"""
         resp = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "You are a quiz generator. Return only valid JSON array with no additional text or code fences."},
+                {"role": "system", "content": _QUIZ_SYSTEM},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.3,
         )
 
         content = resp.choices[0].message.content or "[]"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("RESPONSE FROM MODEL (%s):", model)
             logger.debug(content)
             logger.debug("GENERATE_QUIZ_FROM_CONTENT - END")
@@ -247,12 +528,13 @@ Generate {num_questions} questions:"""
             if not prompt_text or not correct or len(wrong) < 3:
                 continue
 
-            # Combine correct and wrong answers, then shuffle
-            options = [correct] + [str(w)[:120] for w in wrong[:3]]
-            random.shuffle(options)
-
-            # Find where the correct answer ended up
-            answer_index = options.index(correct)
+            # Correct answer starts at 0; shuffle positions rather than the strings so the
+            # answer is located by int and duplicate option text can't pick the wrong slot
+            choices = [correct] + [str(w)[:120] for w in wrong[:3]]
+            perm = [0, 1, 2, 3]
+            random.shuffle(perm)
+            options = [choices[i] for i in perm]
+            answer_index = perm.index(0)
 
             out.append({
                 "prompt": prompt_text,
@@ -261,14 +543,14 @@ Generate {num_questions} questions:"""
             })
 
         if len(out) < num_questions:
-            logger.warning(f"Only generated {len(out)} questions out of {num_questions} requested")
+            logger.warning("Only generated %d questions out of %d requested", len(out), num_questions)
 
         return out[:num_questions]
 
-    except Exception as e:
+    except Exception:
         logger.warning("generate_quiz_from_content: AI path failed; falling back", exc_info=True)
 
-    return generate_quiz_from_content(section_title, section_content[:500], num_questions=min(num_questions, 3), use_ai=False)
+    return _fallback_quiz(section_title, num_questions)
 
 
 def generate_quiz_from_titles(titles: List[str], num_questions: int = 5, use_ai: bool = False) -> List[Dict[str, Any]]:
@@ -279,6 +561,32 @@ def generate_quiz_from_titles(titles: List[str], num_questions: int = 5, use_ai:
     return generate_quiz_from_content(title, content, num_questions, use_ai)
 
 
+def _fallback_flashcards(section_title: str, section_content: str, num_cards: int) -> List[Dict[str, Any]]:
+    """Q&A cards built from the section's longer sentences."""
+    # Fallback: extract key sentences as flashcards
+    sentences = [s.strip() for s in section_content.split('.') if len(s.strip()) > 20]
+    out: list[Dict[str, Any]] = []
+    for idx, sentence in enumerate(sentences[:num_cards]):
+        # Create simple Q&A from sentences
+        words = sentence.split()
+        if len(words) > 5:
+            # Make a question from the sentence
+            front = f"What does this statement mean: {' '.join(words[:8])}...?"
+            back = sentence
+            out.append({
+                "front": front[:200],
+                "back": back[:300],
+                "card_type": "qa"
+            })
+    if not out:
+        out.append({
+            "front": f"What is the main topic of {section_title}?",
+            "back": section_title,
+            "card_type": "qa"
+        })
+    return out[:num_cards]
+
+
 def generate_flashcards_from_content(section_title: str, section_content: str, num_cards: int = 12, use_ai: bool = False) -> List[Dict[str, Any]]:
     """Generate flashcards from section content.
 
@@ -289,62 +597,25 @@ def generate_flashcards_from_content(section_title: str, section_content: str, n
     """
     if not use_ai or not _has_key():
         logger.info("generate_flashcards_from_content: using fallback (use_ai=%s, has_key=%s)", use_ai, _has_key())
-        # Fallback: extract key sentences as flashcards
-        sentences = [s.strip() for s in section_content.split('.') if len(s.strip()) > 20]
-        out: list[Dict[str, Any]] = []
-        for idx, sentence in enumerate(sentences[:num_cards]):
-            # Create simple Q&A from sentences
-            words = sentence.split()
-            if len(words) > 5:
-                # Make a question from the sentence
-                front = f"What does this statement mean: {' '.join(words[:8])}...?"
-                back = sentence
-                out.append({
-                    "front": front[:200],
-                    "back": back[:300],
-                    "card_type": "qa"
-                })
-        if not out:
-            out.append({
-                "front": f"What is the main topic of {section_title}?",
-                "back": section_title,
-                "card_type": "qa"
-            })
-        return out[:num_cards]
+        return _fallback_flashcards(section_title, section_content, num_cards)
 
     try:
-        from openai import OpenAI  # type: ignore
-
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        model = _OPENAI_MODEL
         logger.info("generate_flashcards_from_content: using AI model=%s, section=%r, num_cards=%d",
                    model, section_title[:60], num_cards)
 
         # Limit content to avoid token limits
         content_excerpt = section_content[:8000]
 
-        prompt = f"""Create {num_cards} flashcards for studying this content. Mix Q&A format and Term/Definition format based on what's most appropriate.
-
-Section: {section_title}
-
-For Q&A cards: front should be a question, back should be the answer
-For Term/Definition cards: front should be a key term, back should be its definition
-
-Return ONLY a JSON array (no code fences, no extra text):
-[
-  {{
-    "front": "Question or Term",
-    "back": "Answer or Definition",
-    "card_type": "qa" or "term_definition"
-  }}
-]
-
-CONTENT:
-{content_excerpt}
-
-Generate {num_cards} flashcards:"""
+        prompt = (
+            f"{_FLASHCARD_INSTRUCTIONS}\n\n"
+            f"Section: {section_title}\n\n"
+            f"CONTENT:\n{content_excerpt}\n\n"
+            f"Generate {num_cards} flashcards:"
+        )
 
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("="*80)
             logger.debug("GENERATE_FLASHCARDS_FROM_CONTENT - START")
             logger.debug("Section Title: %s", section_title)
@@ -358,14 +629,14 @@ Generate {num_cards} flashcards:"""
         resp = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "You are a flashcard generator. Return only valid JSON array with no additional text or code fences."},
+                {"role": "system", "content": _FLASHCARD_SYSTEM},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.4,
         )
 
         content = resp.choices[0].message.content or "[]"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("RESPONSE FROM MODEL (%s):", model)
             logger.debug(content)
             logger.debug("GENERATE_FLASHCARDS_FROM_CONTENT - END")
@@ -393,50 +664,49 @@ Generate {num_cards} flashcards:"""
             })
 
         if len(out) < num_cards:
-            logger.warning(f"Only generated {len(out)} flashcards out of {num_cards} requested")
+            logger.warning("Only generated %d flashcards out of %d requested", len(out), num_cards)
 
         return out[:num_cards]
 
-    except Exception as e:
+    except Exception:
         logger.warning("generate_flashcards_from_content: AI path failed; falling back", exc_info=True)
 
-    return generate_flashcards_from_content(section_title, section_content[:500], num_cards=min(num_cards, 5), use_ai=False)
+    return _fallback_flashcards(section_title, section_content[:500], min(num_cards, 5))
+
+
+def _fallback_assignments(titles: List[str], max_q: int) -> List[Dict[str, str]]:
+    """Short-answer prompts with each title's first word as the keyword."""
+    # fallback: short-answer prompts and first word as keyword
+    out: list[Dict[str, str]] = []
+    for idx, t in enumerate(titles[:max_q]):
+        keyword = (t.split()[0] if t.split() else "topic").lower()
+        out.append({"prompt": f"Write 1-2 sentences summarizing: {t}", "expected_keyword": keyword})
+    return out
 
 
 def generate_assignments_from_titles(titles: List[str], max_q: int = 3, use_ai: bool = False) -> List[Dict[str, str]]:
     if not use_ai or not _has_key():
         logger.info("generate_assignments_from_titles: using fallback (use_ai=%s, has_key=%s)", use_ai, _has_key())
-        # fallback: short-answer prompts and first word as keyword
-        out: list[Dict[str, str]] = []
-        for idx, t in enumerate(titles[:max_q]):
-            keyword = (t.split()[0] if t.split() else "topic").lower()
-            out.append({"prompt": f"Write 1-2 sentences summarizing: {t}", "expected_keyword": keyword})
-        return out
+        return _fallback_assignments(titles, max_q)
 
     try:
-        from openai import OpenAI  # type: ignore
-
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        model = _OPENAI_MODEL
         logger.info("generate_assignments_from_titles: using AI model=%s, max_q=%d", model, max_q)
-        prompt = (
-            "Create short-answer assignment prompts from the syllabus titles. "
-            "Return JSON array of {prompt: string, expected_keyword: string}. Limit to "
-            f"{max_q}."
-        )
+        prompt = f"{_ASSIGNMENT_INSTRUCTIONS} Limit to {max_q}."
         combined = prompt + "\n\nTITLES:\n" + "\n".join(f"- {t}" for t in titles[:50])
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("generate_assignments_from_titles: PROMPT (first 2k chars)=%s", combined[:2000])
         resp = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "Return only a JSON array. Do not include code fences or extra text."},
+                {"role": "system", "content": _JSON_ARRAY_SYSTEM},
                 {"role": "user", "content": combined},
             ],
             temperature=0.2,
         )
         content = resp.choices[0].message.content or "[]"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("generate_assignments_from_titles: RAW RESPONSE (first 2k chars)=%s", (content or "")[:2000])
         data = _try_parse_json(content) or []
         out: list[Dict[str, str]] = []
@@ -449,7 +719,34 @@ def generate_assignments_from_titles(titles: List[str], max_q: int = 3, use_ai:
             return out[:max_q]
     except Exception:
         logger.warning("generate_assignments_from_titles: AI path failed; falling back", exc_info=True)
-    return generate_assignments_from_titles(titles, max_q=max_q, use_ai=False)
+    return _fallback_assignments(titles, max_q)
+
+
+# Recent AI summaries keyed by (title, sha256 of the text sample sent), so re-summarizing
+# the same section (retries, re-uploads of the same book) costs no request
+_SUMMARY_CACHE: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 1024
+_SUMMARY_CACHE_LOCK = threading.Lock()
+
+
+def _summary_cache_key(title: str, text: str) -> Tuple[str, str]:
+    return title, hashlib.sha256(text[:2000].encode("utf-8")).hexdigest()
+
+
+def _cached_summary(key: Tuple[str, str]) -> Optional[str]:
+    with _SUMMARY_CACHE_LOCK:
+        summary = _SUMMARY_CACHE.get(key)
+        if summary is not None:
+            _SUMMARY_CACHE.move_to_end(key)
+        return summary
+
+
+def _remember_summary(key: Tuple[str, str], summary: str) -> None:
+    with _SUMMARY_CACHE_LOCK:
+        _SUMMARY_CACHE[key] = summary
+        _SUMMARY_CACHE.move_to_end(key)
+        while len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.popitem(last=False)
 
 
 def summarize_section(title: str, text: str, use_ai: bool = False) -> str:
@@ -462,14 +759,17 @@ def summarize_section(title: str, text: str, use_ai: bool = False) -> str:
             return f"Summary for {title}."
         summary = plain.split(".")[0][:200]
         return summary if summary else f"Summary for {title}."
+    cache_key = _summary_cache_key(title, text)
+    cached = _cached_summary(cache_key)
+    if cached is not None:
+        return cached
     try:
-        from openai import OpenAI  # type: ignore
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        sys = "Return only a single concise summary <= 200 chars."
-        user = f"Title: {title}\n\nTEXT (sample):\n{text[:2000]}"
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        sys = _SUMMARY_SYSTEM
+        user = _summary_user_prompt(title, text)
+        model = _OPENAI_MODEL
         logger.info("summarize_section: using AI model=%s for title=%r", model, title[:80])
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("="*80)
             logger.debug("SUMMARIZE_SECTION - START")
             logger.debug("Model: %s", model)
@@ -487,12 +787,15 @@ def summarize_section(title: str, text: str, use_ai: bool = False) -> str:
             temperature=0.2,
         )
         content = (resp.choices[0].message.content or "").strip()
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("RESPONSE FROM MODEL (%s):", model)
             logger.debug(content)
             logger.debug("SUMMARIZE_SECTION - END")
             logger.debug("="*80)
-        return content[:200] if content else f"Summary for {title}."
+        if not content:
+            return f"Summary for {title}."
+        _remember_summary(cache_key, content[:200])
+        return content[:200]
     except Exception:
         logger.warning("summarize_section: AI path failed; falling back for title=%r", title[:80], exc_info=True)
         return f"Summary for {title}."
@@ -507,12 +810,15 @@ async def summarize_section_async(title: str, text: str, use_ai: bool = False) -
             return f"Summary for {title}."
         summary = plain.split(".")[0][:200]
         return summary if summary else f"Summary for {title}."
+    cache_key = _summary_cache_key(title, text)
+    cached = _cached_summary(cache_key)
+    if cached is not None:
+        return cached
     try:
-        from openai import AsyncOpenAI  # type: ignore
-        client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        sys = "Return only a single concise summary <= 200 chars."
-        user = f"Title: {title}\n\nTEXT (sample):\n{text[:2000]}"
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _async_client()
+        sys = _SUMMARY_SYSTEM
+        user = _summary_user_prompt(title, text)
+        model = _OPENAI_MODEL
 
         resp = await client.chat.completions.create(
             model=model,
@@ -520,12 +826,174 @@ async def summarize_section_async(title: str, text: str, use_ai: bool = False) -
             temperature=0.2,
         )
         content = (resp.choices[0].message.content or "").strip()
-        return content[:200] if content else f"Summary for {title}."
+        if not content:
+            return f"Summary for {title}."
+        _remember_summary(cache_key, content[:200])
+        return content[:200]
     except Exception:
         logger.warning("summarize_section_async: AI path failed; falling back for title=%r", title[:80], exc_info=True)
         return f"Summary for {title}."
 
 
+async def summarize_sections_bulk(sections: List[Tuple[str, str]], use_ai: bool = False) -> List[str]:
+    """
+    Summarize many sections concurrently, one request each, capped at AI_CONCURRENCY in-flight
+    requests. summarize_sections_multi uses it for sections its multi-section prompts leave out.
+    """
+    semaphore = asyncio.Semaphore(_ai_concurrency())
+
+    async def _bounded(title: str, text: str) -> str:
+        async with semaphore:
+            return await summarize_section_async(title, text, use_ai=use_ai)
+
+    results = await asyncio.gather(*[_bounded(title, text) for title, text in sections], return_exceptions=True)
+    return [
+        f"Summary for {title}." if isinstance(res, BaseException) else res
+        for (title, _), res in zip(sections, results)
+    ]
+
+
+# Sections per multi-section prompt; keeps each request well inside the context window
+_MULTI_SUMMARY_CHUNK = 15
+
+
+async def summarize_sections_multi(sections: List[Tuple[str, str]], use_ai: bool = False) -> List[str]:
+    """
+    Summarize sections with one request per chunk of up to 15 sections instead of one each.
+    Results are mapped back by id; cached sections are skipped and anything the model
+    leaves out is summarized individually. Chunks share the AI_CONCURRENCY cap.
+    """
+    if not use_ai or not _has_key():
+        return [await summarize_section_async(title, text, use_ai=False) for title, text in sections]
+
+    out: List[Optional[str]] = [_cached_summary(_summary_cache_key(title, text)) for title, text in sections]
+    todo = [i for i, summary in enumerate(out) if summary is None]
+    model = _OPENAI_MODEL
+    semaphore = asyncio.Semaphore(_ai_concurrency())
+
+    async def _summarize_chunk(indices: List[int]) -> None:
+        async with semaphore:
+            await _request_chunk(indices)
+
+    async def _request_chunk(indices: List[int]) -> None:
+        try:
+            blocks = []
+            for n, i in enumerate(indices, 1):
+                title, text = sections[i]
+                blocks.append(f"[{n}] Title: {title}\nText: {(text or '')[:2000]}")
+            user = "Summarize each section below.\n\n" + "\n\n".join(blocks)
+            resp = await _async_client().chat.completions.create(
+                model=model,
+                messages=[{"role": "system", "content": _MULTI_SUMMARY_SYSTEM}, {"role": "user", "content": user}],
+                temperature=0.2,
+            )
+            data = _try_parse_json(resp.choices[0].message.content or "[]") or []
+            for obj in data:
+                if not isinstance(obj, dict):
+                    continue
+                try:
+                    n = int(obj.get("id"))
+                except (TypeError, ValueError):
+                    continue
+                summary = str(obj.get("summary", "")).strip()[:200]
+                if 1 <= n <= len(indices) and summary:
+                    i = indices[n - 1]
+                    out[i] = summary
+                    _remember_summary(_summary_cache_key(*sections[i]), summary)
+        except Exception:
+            logger.warning("summarize_sections_multi: chunk of %d sections failed", len(indices), exc_info=True)
+
+    chunks = [todo[k : k + _MULTI_SUMMARY_CHUNK] for k in range(0, len(todo), _MULTI_SUMMARY_CHUNK)]
+    logger.info("summarize_sections_multi: %d sections (%d cached) in %d requests", len(sections), len(sections) - len(todo), len(chunks))
+    await asyncio.gather(*[_summarize_chunk(chunk) for chunk in chunks])
+
+    missing = [i for i, summary in enumerate(out) if summary is None]
+    if missing:
+        retried = await summarize_sections_bulk([sections[i] for i in missing], use_ai=True)
+        for i, summary in zip(missing, retried):
+            out[i] = summary
+    return out  # type: ignore[return-value]
+
+
+def batch_generate_summaries(sections: List[Tuple[str, str]], poll_interval: float = 5.0, timeout: float = 900.0) -> List[str]:
+    """
+    Summarize many sections with a single OpenAI Batch API job instead of N round-trips.
+    sections: [(title, text), ...]. Returns summaries in the same order.
+    Sections missing from the batch output get the same fallback as summarize_section.
+    """
+    fallback = [f"Summary for {title}." for title, _ in sections]
+    if not sections or not _has_key():
+        return fallback
+    try:
+        client = _sync_client()
+        model = _OPENAI_MODEL
+        sys = _SUMMARY_SYSTEM
+
+        # One JSONL request per section; custom_id maps results back to input order
+        lines = []
+        for idx, (title, text) in enumerate(sections):
+            lines.append(_json_dumpb({
+                "custom_id": str(idx),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": model,
+                    "messages": [
+                        {"role": "system", "content": sys},
+                        {"role": "user", "content": _summary_user_prompt(title, text or "")},
+                    ],
+                    "temperature": 0.2,
+                },
+            }))
+        payload = b"\n".join(lines) + b"\n"
+
+        batch_file = client.files.create(file=("summaries.jsonl", payload), purpose="batch")
+        batch = client.batches.create(
+            input_file_id=batch_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        logger.info("batch_generate_summaries: submitted batch %s with %d sections", batch.id, len(sections))
+
+        deadline = time.monotonic() + timeout
+        while batch.status not in ("completed", "failed", "expired", "cancelled"):
+            if time.monotonic() > deadline:
+                logger.warning("batch_generate_summaries: batch %s still %s after %.0fs; falling back", batch.id, batch.status, timeout)
+                try:
+                    client.batches.cancel(batch.id)
+                except Exception:
+                    pass
+                return fallback
+            time.sleep(poll_interval)
+            batch = client.batches.retrieve(batch.id)
+
+        if batch.status != "completed" or not batch.output_file_id:
+            logger.warning("batch_generate_summaries: batch %s ended with status=%s; falling back", batch.id, batch.status)
+            return fallback
+
+        out = list(fallback)
+        for line in client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            row = _json_loads(line)
+            try:
+                idx = int(row.get("custom_id"))
+            except (TypeError, ValueError):
+                continue
+            body = (row.get("response") or {}).get("body") or {}
+            choices = body.get("choices") or []
+            content = ((choices[0].get("message") or {}).get("content") or "").strip() if choices else ""
+            if 0 <= idx < len(out) and content:
+                out[idx] = content[:200]
+                title, text = sections[idx]
+                _remember_summary(_summary_cache_key(title, text or ""), out[idx])
+        logger.info("batch_generate_summaries: batch %s returned results for %d sections", batch.id, len(sections))
+        return out
+    except Exception:
+        logger.warning("batch_generate_summaries: batch path failed; falling back", exc_info=True)
+        return fallback
+
+
 def extract_toc_from_text(text: str, max_items: int = 20, use_ai: bool = False) -> List[Dict[str, Any]]:
     """
     Ask the model to extract a Table of Contents from provided textbook text.
@@ -535,19 +1003,13 @@ def extract_toc_from_text(text: str, max_items: int = 20, use_ai: bool = False)
         logger.info("extract_toc_from_text: using fallback (no-op) (use_ai=%s, has_key=%s)", use_ai, _has_key())
         return []
     try:
-        from openai import OpenAI  # type: ignore
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        sys = (
-            "You extract a Table of Contents from textbook text. "
-            "Return only JSON array of objects: {title: string, page?: number}. "
-            f"Include up to {max_items} top-level items. Do not include nested sections. "
-            "Do not include code fences or any extra text—return raw JSON only."
-        )
+        client = _sync_client()
+        sys = _TOC_TEXT_SYSTEM
         sample = text[:50000]  # cap for safety
-        user = "Extract a TOC from this text (first pages):\n\n" + sample
-        model = os.getenv("OPENAI_TOC_MODEL", os.getenv("OPENAI_MODEL", "gpt-4o-mini"))
+        user = f"Extract a TOC with up to {max_items} top-level items from this text (first pages):\n\n" + sample
+        model = _OPENAI_TOC_MODEL
         logger.info("extract_toc_from_text: using AI model=%s, sample_chars=%d, max_items=%d", model, len(sample), max_items)
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("="*80)
             logger.debug("EXTRACT_TOC_FROM_TEXT - START")
             logger.debug("Model: %s", model)
@@ -568,24 +1030,13 @@ def extract_toc_from_text(text: str, max_items: int = 20, use_ai: bool = False)
             temperature=0.1,
         )
         content = resp.choices[0].message.content or "[]"
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("RESPONSE FROM MODEL (%s):", model)
             logger.debug(content)
             logger.debug("EXTRACT_TOC_FROM_TEXT - END")
             logger.debug("="*80)
         data = _try_parse_json(content) or []
 
-        # Common preface/front matter sections to filter (exact matches or starts-with)
-        skip_exact = {
-            "preface", "foreword", "acknowledgment", "acknowledgments", "dedication",
-            "about the author", "about the authors", "about this book",
-            "to everyone", "to educators", "to students", "to readers",
-            "final words", "references", "bibliography", "index",
-            "table of contents", "contents", "copyright", "publishing information",
-            "a dialogue on the book"
-        }
-        skip_startswith = ["preface to", "appendix", "how to use"]
-
         out: List[Dict[str, Any]] = []
         for obj in data:
             title = str(obj.get("title", "")).strip()
@@ -593,15 +1044,15 @@ def extract_toc_from_text(text: str, max_items: int = 20, use_ai: bool = False)
                 continue
 
             # Skip common preface/front matter sections
-            title_lower = title.lower()
+            title_key = title.casefold()
 
             # Check exact matches
-            if title_lower in skip_exact:
+            if title_key in _SKIP_EXACT:
                 logger.debug("extract_toc_from_text: skipping preface item: %s", title)
                 continue
 
             # Check starts-with patterns
-            if any(title_lower.startswith(pattern) for pattern in skip_startswith):
+            if title_key.startswith(_SKIP_PREFIX):
                 logger.debug("extract_toc_from_text: skipping preface item: %s", title)
                 continue
 
@@ -619,69 +1070,144 @@ def extract_toc_from_text(text: str, max_items: int = 20, use_ai: bool = False)
         return []
 
 
+def _median_font_size(sizes: "array[float]") -> float:
+    """Upper median of collected span font sizes.
+
+    Uses an O(n) numpy.partition over the array's buffer when numpy is installed,
+    otherwise sorts.
+    """
+    mid = len(sizes) // 2
+    if np is None:
+        return sorted(sizes)[mid]
+    return float(np.partition(np.frombuffer(sizes, dtype=np.float64), mid)[mid])
+
+
+_TEXT_DICT_FLAGS = (fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES) if fitz is not None else 0
+
+
+def _iter_text_lines(page: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the text lines of a page from a single get_text("dict") call.
+    Image blocks are excluded at extraction time so MuPDF doesn't copy image bytes
+    into the dict only for them to be skipped.
+    """
+    for block in page.get_text("dict", flags=_TEXT_DICT_FLAGS)["blocks"]:
+        yield from block.get("lines", ())
+
+
+class _PageCache:
+    """
+    On-disk cache of parsed PDF data keyed by the file's md5, so re-running the syllabus
+    pipeline on the same upload skips re-extracting text from MuPDF.
+
+    Entries live under PDF_CACHE_DIR/{md5}/ as p{n}_{kind}.json (per page) or {kind}.json
+    (whole document), and are also kept in memory for the current run. Any cache I/O
+    problem just falls back to computing the value.
+    """
+
+    def __init__(self, pdf_path: str) -> None:
+        self.dir: Optional[str] = None
+        self._mem: Dict[str, Any] = {}
+        try:
+            digest = hashlib.md5(usedforsecurity=False)
+            with open(pdf_path, "rb") as fh:
+                for block in iter(lambda: fh.read(1 << 20), b""):
+                    digest.update(block)
+            self.dir = os.path.join(os.getenv("PDF_CACHE_DIR", "./storage/pdf_cache"), digest.hexdigest())
+        except OSError:
+            logger.warning("_PageCache: could not hash %s; caching disabled", pdf_path, exc_info=True)
+
+    def get_or_compute(self, page_no: Optional[int], kind: str, compute: Any) -> Any:
+        name = f"{kind}.json" if page_no is None else f"p{page_no}_{kind}.json"
+        if name in self._mem:
+            return self._mem[name]
+        if self.dir is None:
+            value = self._mem[name] = compute()
+            return value
+        path = os.path.join(self.dir, name)
+        try:
+            if os.path.getsize(path) > 0:
+                with open(path, "rb") as fh:
+                    value = self._mem[name] = _json_loads(fh.read())
+                    return value
+        except (OSError, ValueError):
+            pass
+        value = self._mem[name] = compute()
+        if not value:  # empty results may be failures; don't pin them on disk
+            return value
+        try:
+            os.makedirs(self.dir, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(_json_dumpb(value))
+            os.replace(tmp, path)
+        except OSError:
+            logger.warning("_PageCache: could not write %s", path, exc_info=True)
+        return value
+
+
+def drop_page_cache(pdf_path: str) -> None:
+    """Remove a PDF's _PageCache entries from disk (its course is being deleted).
+
+    A course uploaded from identical bytes shares the directory and simply re-extracts.
+    """
+    if not os.path.isfile(pdf_path):
+        return
+    cache_dir = _PageCache(pdf_path).dir
+    if cache_dir is not None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
 def extract_structural_markers(pdf_path: str, max_pages: int = None) -> List[Dict[str, Any]]:
     """
     Analyze PDF structure to find chapter/section markers using font size and formatting.
     Returns list of {text: str, page: int, font_size: float} for potential headers.
     """
     try:
-        import fitz  # type: ignore
-
         markers: List[Dict[str, Any]] = []
 
         with fitz.open(pdf_path) as doc:
             total_pages = doc.page_count if max_pages is None else min(doc.page_count, max_pages)
             logger.info("extract_structural_markers: analyzing %d pages for headers", total_pages)
 
-            # Collect font sizes across document to determine what's "large"
-            font_sizes: List[float] = []
+            # Single pass: collect font sizes across the document to determine what's "large",
+            # and keep each line's text/size so pages don't need to be parsed a second time
+            font_sizes = array("d")
+            candidates: List[Tuple[str, int, float]] = []
 
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                blocks = page.get_text("dict")["blocks"]
+            for page_num, page in enumerate(doc.pages(0, total_pages)):
+                for line in _iter_text_lines(page):
+                    sizes = [span["size"] for span in line["spans"]]
+                    font_sizes.extend(sizes)
+                    text = " ".join(span["text"] for span in line["spans"]).strip()
 
-                for block in blocks:
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            for span in line["spans"]:
-                                font_sizes.append(span["size"])
+                    # Filter out page numbers and very short text
+                    if text and len(text) > 5 and not text.isdigit():
+                        candidates.append((text, page_num + 1, max(sizes, default=0)))  # 1-indexed
 
             if not font_sizes:
                 return []
 
             # Calculate threshold: headers are typically 20%+ larger than median
-            font_sizes.sort()
-            median_size = font_sizes[len(font_sizes) // 2]
+            median_size = _median_font_size(font_sizes)
             header_threshold = median_size * 1.2
             logger.info("extract_structural_markers: median_font=%0.1f, threshold=%0.1f", median_size, header_threshold)
 
-            # Now extract text with large fonts
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                blocks = page.get_text("dict")["blocks"]
-
-                for block in blocks:
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            # Check if line has large font
-                            max_font_in_line = max((span["size"] for span in line["spans"]), default=0)
-
-                            if max_font_in_line >= header_threshold:
-                                # Extract text from this line
-                                text = " ".join(span["text"] for span in line["spans"]).strip()
-
-                                # Filter out page numbers and very short text
-                                if text and len(text) > 5 and not text.isdigit():
-                                    # Check for common chapter/section patterns
-                                    chapter_pattern = re.match(r'^(Chapter|Section|Part|Unit|Module|Lesson)\s+\d+', text, re.IGNORECASE)
-                                    numbered_pattern = re.match(r'^\d+\.?\d*\s+[A-Z]', text)
-
-                                    if chapter_pattern or numbered_pattern or max_font_in_line >= header_threshold * 1.1:
-                                        markers.append({
-                                            "text": text[:200],
-                                            "page": page_num + 1,  # 1-indexed
-                                            "font_size": max_font_in_line
-                                        })
+            # Now keep the lines with large fonts
+            for text, page_number, max_font_in_line in candidates:
+                if max_font_in_line < header_threshold:
+                    continue
+
+                # Check for common chapter/section patterns
+                chapter_pattern = _CHAPTER_RE.match(text)
+                numbered_pattern = _NUMBERED_RE.match(text)
+
+                if chapter_pattern or numbered_pattern or max_font_in_line >= header_threshold * 1.1:
+                    markers.append({
+                        "text": text[:200],
+                        "page": page_number,
+                        "font_size": max_font_in_line
+                    })
 
             logger.info("extract_structural_markers: found %d potential headers", len(markers))
             return markers
@@ -691,9 +1217,23 @@ def extract_structural_markers(pdf_path: str, max_pages: int = None) -> List[Dic
         return []
 
 
-def extract_toc_structure(pdf_path: str, use_ai: bool = False) -> List[str]:
+def _toc_source_text(pdf_path: str, cache: Optional[_PageCache] = None, doc: Any = None) -> str:
+    """Text of the first 30 pages, capped at the 20k char TOC prompt budget (blocking MuPDF work)."""
+    with fitz.open(pdf_path) if doc is None else nullcontext(doc) as doc:
+        # Stream the first 30 pages, stopping once the budget is filled
+        buf = io.StringIO()
+        for page_num, page in enumerate(doc.pages(0, min(doc.page_count, 30))):
+            buf.write(cache.get_or_compute(page_num, "text", page.get_text) if cache else page.get_text())
+            buf.write("\n")
+            if buf.tell() >= 20000:
+                break
+        return buf.getvalue()[:20000]
+
+
+async def extract_toc_structure(toc_text: str, use_ai: bool = False) -> List[str]:
     """
-    Extract table of contents STRUCTURE (chapter titles only, no page numbers) from first 30 pages.
+    Extract table of contents STRUCTURE (chapter titles only, no page numbers) from the text
+    of the first 30 pages (see _toc_source_text).
     Uses small/cheap model since this is just for context.
     Returns list of chapter titles.
     """
@@ -701,39 +1241,23 @@ def extract_toc_structure(pdf_path: str, use_ai: bool = False) -> List[str]:
         return []
 
     try:
-        import fitz  # type: ignore
-        from openai import OpenAI  # type: ignore
-
-        with fitz.open(pdf_path) as doc:
-            # Get first 30 pages
-            toc_pages = min(doc.page_count, 30)
-            toc_text = "\n".join([doc[i].get_text() for i in range(toc_pages)])[:20000]  # Limit chars
-
         if not toc_text.strip():
             return []
 
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Async client: the syllabus pipeline runs on the event loop
+        client = _async_client()
         model = "gpt-4o-mini"  # Use cheap model for this
 
-        prompt = f"""Extract the table of contents from this textbook. Return ONLY the chapter/section TITLES as a JSON array of strings.
-
-Rules:
-- Return chapter titles ONLY (no page numbers, no subsections)
-- Skip preface, acknowledgments, references, index
-- Focus on main learning chapters
-- Return empty array [] if no clear TOC found
-
-Example output: ["Introduction to Operating Systems", "Processes and Threads", "Memory Management", "File Systems"]
-
-TEXT FROM FIRST 30 PAGES:
-{toc_text}
-
-Return ONLY a JSON array of strings, no code fences."""
+        prompt = (
+            f"{_TOC_STRUCTURE_INSTRUCTIONS}\n\n"
+            f"TEXT FROM FIRST 30 PAGES:\n{toc_text}\n\n"
+            "Return ONLY a JSON array of strings, no code fences."
+        )
 
-        resp = client.chat.completions.create(
+        resp = await client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "You extract table of contents structure. Return only JSON array of strings."},
+                {"role": "system", "content": _TOC_STRUCTURE_SYSTEM},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.1,
@@ -756,38 +1280,146 @@ Return ONLY a JSON array of strings, no code fences."""
         return []
 
 
-def extract_all_headers_from_pdf(pdf_path: str, total_pages: int) -> List[Dict[str, Any]]:
+def _page_header_lines(
+    page: Any,
+    page_number: int,
+    font_sizes: Optional["array[float]"] = None,
+    threshold: Optional[float] = None,
+    page_texts: Optional[Dict[int, str]] = None,
+) -> Iterator[Tuple[str, int, float]]:
+    """
+    Yield (text, page_number, max_font) for the candidate header lines of one page.
+    Span sizes are appended to font_sizes when given; lines below threshold are skipped.
+    With page_texts, pages that yield a header also get their first 2000 chars of plain
+    text recorded there, so later steps don't have to parse the page again.
+    """
+    parts: List[str] = []
+    budget = 2000 if page_texts is not None else 0
+    found = False
+    for line in _iter_text_lines(page):
+        if not line["spans"]:
+            continue
+        if budget > 0:
+            parts.append("".join(span["text"] for span in line["spans"]))
+            budget -= len(parts[-1]) + 1
+
+        sizes = [span["size"] for span in line["spans"]]
+        if font_sizes is not None:
+            font_sizes.extend(sizes)
+        max_font = max(sizes)
+
+        if threshold is not None and max_font < threshold:
+            continue
+
+        text = " ".join(span["text"] for span in line["spans"]).strip()
+
+        # Basic cleanup only
+        if len(text) < 2 or len(text) > 250:
+            continue
+        if text.isdigit():
+            continue
+
+        found = True
+        yield text, page_number, max_font
+
+    if found and page_texts is not None:
+        page_texts[page_number] = "\n".join(parts)[:2000]
+
+
+def _scan_header_pages(
+    pdf_path: str, start: int, stop: int, threshold: float, with_text: bool = False
+) -> Tuple[List[Tuple[str, int, float]], Dict[int, str]]:
+    """Process-pool worker: large-font lines (and optionally page text) for pages [start, stop)."""
+    page_texts: Optional[Dict[int, str]] = {} if with_text else None
+    with fitz.open(pdf_path) as doc:
+        items = [
+            item
+            for page_num, page in enumerate(doc.pages(start, stop), start)
+            for item in _page_header_lines(page, page_num + 1, threshold=threshold, page_texts=page_texts)
+        ]
+    return items, page_texts or {}
+
+
+# Page-level parallelism only pays for the process start-up cost on large books
+_PARALLEL_HEADER_SCAN_MIN_PAGES = 200
+_HEADER_SCAN_CHUNK_PAGES = 50
+
+
+def _pdf_workers() -> int:
+    # Processes, not threads: MuPDF holds the GIL and Documents aren't thread-safe
+    return max(1, int(os.getenv("SUMMIT_PDF_WORKERS", "0")) or os.cpu_count() or 1)
+
+
+def _page_texts(pdf_path: str, start: int, stop: int) -> List[str]:
+    """Process-pool worker: plain text of pages [start, stop)."""
+    with fitz.open(pdf_path) as doc:
+        return [page.get_text() for page in doc.pages(start, stop)]
+
+
+def extract_pdf_page_texts(pdf_path: str) -> List[str]:
+    """
+    Plain text of every page, in page order. Large books are extracted in page-range chunks
+    across a process pool; small ones, or a pool that can't start, are read in-process.
+    """
+    with fitz.open(pdf_path) as doc:
+        total_pages = doc.page_count
+        if total_pages <= _PARALLEL_HEADER_SCAN_MIN_PAGES:
+            return [page.get_text() for page in doc]
+    starts = range(0, total_pages, _HEADER_SCAN_CHUNK_PAGES)
+    try:
+        with ProcessPoolExecutor(max_workers=min(_pdf_workers(), len(starts))) as pool:
+            futures = [
+                pool.submit(_page_texts, pdf_path, start, min(start + _HEADER_SCAN_CHUNK_PAGES, total_pages))
+                for start in starts
+            ]
+            return [text for future in futures for text in future.result()]
+    except Exception:
+        logger.warning("extract_pdf_page_texts: parallel extraction failed; extracting sequentially", exc_info=True)
+        return _page_texts(pdf_path, 0, total_pages)
+
+
+def extract_all_headers_from_pdf(
+    pdf_path: str,
+    total_pages: int,
+    max_headers: Optional[int] = None,
+    cache: Optional[_PageCache] = None,
+    doc: Any = None,
+    page_texts: Optional[Dict[int, str]] = None,
+) -> List[Dict[str, Any]]:
     """
     Extract ALL large-font text from PDF that could potentially be headers.
     Returns list of {text: str, page: int, font_size: float}
 
     No filtering - we let AI decide what's a chapter vs front matter.
+    Pass doc to reuse an already-open Document (the process-pool path still reopens by path).
+    With max_headers set, no further pages are scanned once at least that many have been
+    found (a soft cap: later pages are then not covered).
+    page_texts, when given, collects {page: first 2000 chars} for pages with headers
+    (not filled when the result comes from cache).
     """
+    if cache is not None:
+        kind = "headers" if max_headers is None else f"headers_max{max_headers}"
+        return cache.get_or_compute(
+            None, kind, lambda: extract_all_headers_from_pdf(pdf_path, total_pages, max_headers, doc=doc, page_texts=page_texts)
+        )
     try:
-        import fitz  # type: ignore
-
         logger.info("extract_all_headers_from_pdf: scanning %d pages for large text", total_pages)
 
-        with fitz.open(pdf_path) as doc:
-            # First: determine what "large" means by sampling
-            all_font_sizes = []
-            sample_pages = list(range(0, min(total_pages, 50)))
-
-            for page_num in sample_pages:
-                page = doc[page_num]
-                blocks = page.get_text("dict")["blocks"]
-                for block in blocks:
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            for span in line["spans"]:
-                                all_font_sizes.append(span["size"])
+        with fitz.open(pdf_path) if doc is None else nullcontext(doc) as doc:
+            # First: determine what "large" means by sampling, keeping the sampled lines
+            # so those pages are only parsed once
+            all_font_sizes = array("d")
+            sample_limit = min(total_pages, 50)
+            sampled: List[Tuple[str, int, float]] = []
+
+            for page_num, page in enumerate(doc.pages(0, sample_limit)):
+                sampled.extend(_page_header_lines(page, page_num + 1, font_sizes=all_font_sizes, page_texts=page_texts))
 
             if not all_font_sizes:
                 logger.warning("extract_all_headers_from_pdf: no text found")
                 return []
 
-            all_font_sizes.sort()
-            median_size = all_font_sizes[len(all_font_sizes) // 2]
+            median_size = _median_font_size(all_font_sizes)
             # Collect anything 20%+ larger than median
             threshold = median_size * 1.2
 
@@ -797,36 +1429,43 @@ def extract_all_headers_from_pdf(pdf_path: str, total_pages: int) -> List[Dict[s
             headers = []
             seen = set()
 
-            for page_num in range(total_pages):
-                page = doc[page_num]
-                blocks = page.get_text("dict")["blocks"]
-
-                for block in blocks:
-                    if "lines" in block:
-                        for line in block["lines"]:
-                            if not line["spans"]:
-                                continue
-
-                            max_font = max(span["size"] for span in line["spans"])
-
-                            if max_font >= threshold:
-                                text = " ".join(span["text"] for span in line["spans"]).strip()
-
-                                # Basic cleanup only
-                                if len(text) < 2 or len(text) > 250:
-                                    continue
-                                if text.isdigit():
-                                    continue
-
-                                # Track unique (text, page) pairs
-                                key = (text, page_num + 1)
-                                if key not in seen:
-                                    headers.append({
-                                        "text": text,
-                                        "page": page_num + 1,
-                                        "font_size": max_font
-                                    })
-                                    seen.add(key)
+            def add_header(text: str, page_number: int, max_font: float) -> None:
+                # Track unique (text, page) pairs
+                key = (text, page_number)
+                if key not in seen:
+                    headers.append({
+                        "text": text,
+                        "page": page_number,
+                        "font_size": max_font
+                    })
+                    seen.add(key)
+
+            def capped() -> bool:
+                return max_headers is not None and len(headers) >= max_headers
+
+            for item in sampled:
+                if item[2] >= threshold:
+                    add_header(*item)
+
+            remaining = range(sample_limit, total_pages)
+            chunks: Optional[List[List[Tuple[str, int, float]]]] = None
+            # Books within the sample have no remaining pages (doc.pages() rejects an empty range)
+            if capped() or not remaining:
+                chunks = []
+            elif total_pages > _PARALLEL_HEADER_SCAN_MIN_PAGES:
+                chunks = _parallel_header_scan(pdf_path, remaining, threshold, max_headers, page_texts)
+            if chunks is None:
+                # Generator: pages past the cap are never parsed
+                chunks = (
+                    _page_header_lines(page, page_num + 1, threshold=threshold, page_texts=page_texts)
+                    for page_num, page in enumerate(doc.pages(remaining.start, remaining.stop), remaining.start)
+                )
+            for chunk in chunks:
+                for item in chunk:
+                    add_header(*item)
+                if capped():
+                    logger.info("extract_all_headers_from_pdf: reached max_headers=%d; stopping scan", max_headers)
+                    break
 
             logger.info("extract_all_headers_from_pdf: found %d large-font items", len(headers))
             return headers
@@ -836,6 +1475,191 @@ def extract_all_headers_from_pdf(pdf_path: str, total_pages: int) -> List[Dict[s
         return []
 
 
+def _parallel_header_scan(
+    pdf_path: str,
+    pages: range,
+    threshold: float,
+    max_items: Optional[int] = None,
+    page_texts: Optional[Dict[int, str]] = None,
+) -> Optional[List[List[Tuple[str, int, float]]]]:
+    """
+    Scan page chunks in a process pool; each worker opens its own Document.
+    Returns per-chunk results in page order, or None if the pool can't be used.
+    Once max_items lines have come back, chunks that haven't started are cancelled.
+    """
+    starts = range(pages.start, pages.stop, _HEADER_SCAN_CHUNK_PAGES)
+    try:
+        with ProcessPoolExecutor(max_workers=min(_pdf_workers(), len(starts) or 1)) as pool:
+            futures = [
+                pool.submit(
+                    _scan_header_pages,
+                    pdf_path,
+                    start,
+                    min(start + _HEADER_SCAN_CHUNK_PAGES, pages.stop),
+                    threshold,
+                    page_texts is not None,
+                )
+                for start in starts
+            ]
+            results: List[List[Tuple[str, int, float]]] = []
+            found = 0
+            for future in futures:
+                items, texts = future.result()
+                results.append(items)
+                if page_texts is not None:
+                    page_texts.update(texts)
+                found += len(items)
+                if max_items is not None and found >= max_items:
+                    for pending in futures:
+                        pending.cancel()
+                    break
+            return results
+    except Exception:
+        logger.warning("extract_all_headers_from_pdf: parallel scan failed; scanning sequentially", exc_info=True)
+        return None
+
+
+# Books with more headers than this are split into overlapping windows (map) whose chapter
+# candidates are merged by start page (reduce), instead of one very long prompt
+_SYLLABUS_WINDOW_HEADERS = 300
+_SYLLABUS_WINDOW_OVERLAP = 20
+
+_SYLLABUS_WINDOW_INSTRUCTIONS = """You are analyzing one window of large-font text (with PDF page numbers) extracted from a textbook PDF.
+
+Your task: list the main chapters whose header STARTS inside this window.
+
+RULES:
+1. start_page = the page where the chapter header appears
+2. Only main chapters - not sections, subsections, figures or running headers
+3. If the window begins at page 1, combine ALL front matter (preface, acknowledgments, table of contents, etc.) into a SINGLE "Introduction" entry starting at page 1
+4. Skip references, bibliography, index and appendices
+5. Return [] if no chapter starts in this window
+
+Return JSON array: [{"title": str, "summary": str, "start_page": int}, ...]
+Return ONLY valid JSON array, no code fences or extra text."""
+
+
+# Structured output for syllabus calls on non-reasoning models. Strict schemas need an
+# object root, so the chapter list comes back wrapped as {"chapters": [...]}.
+_SYLLABUS_RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "syllabus",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "chapters": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "title": {"type": "string"},
+                            "summary": {"type": "string"},
+                            "start_page": {"type": "integer"},
+                            "end_page": {"type": "integer"},
+                        },
+                        "required": ["title", "summary", "start_page", "end_page"],
+                        "additionalProperties": False,
+                    },
+                }
+            },
+            "required": ["chapters"],
+            "additionalProperties": False,
+        },
+    },
+}
+
+
+def _parse_chapters(content: str) -> List[Dict[str, Any]]:
+    """Chapter objects from a syllabus response, either a bare array or {"chapters": [...]}."""
+    data = _try_parse_json(content)
+    if not isinstance(data, list) and not (isinstance(data, dict) and "chapters" in data):
+        # Reasoning models get no schema enforcement; retry once without trailing commas
+        data = _try_parse_json(_TRAILING_COMMA_RE.sub(r"\1", content))
+    if isinstance(data, dict):
+        data = data.get("chapters")
+    return [obj for obj in data if isinstance(obj, dict)] if isinstance(data, list) else []
+
+
+def _equal_division_fallback(total_pages: int) -> List[Dict[str, Any]]:
+    """Split the book into 8-12 equal page ranges when no usable chapters were found."""
+    items_count = max(1, min(12, max(8, total_pages // 50), total_pages))
+    # Integer edges (exact, so numpy and the plain path agree); the last range ends at total_pages
+    if np is not None:
+        edges = (1 + np.arange(items_count + 1) * total_pages // items_count).tolist()
+    else:
+        edges = [1 + i * total_pages // items_count for i in range(items_count + 1)]
+    return [
+        {
+            "title": f"Section {i + 1}",
+            "summary": f"Content from pages {start} to {end - 1}",
+            "start_page": start,
+            "end_page": end - 1,
+        }
+        for i, (start, end) in enumerate(zip(edges, edges[1:]))
+    ]
+
+
+def _merge_window_chapters(candidates: List[Dict[str, Any]], total_pages: int) -> List[Dict[str, Any]]:
+    """Order window candidates by start page, drop overlap duplicates and derive end pages."""
+    chapters: List[Dict[str, Any]] = []
+    for obj in sorted(candidates, key=lambda c: c["start_page"]):
+        # Overlapping windows report the same chapter twice, at the same page or back to back
+        if chapters and (
+            obj["start_page"] == chapters[-1]["start_page"]
+            or obj["title"].casefold() == chapters[-1]["title"].casefold()
+        ):
+            continue
+        chapters.append(obj)
+    for current, following in zip(chapters, chapters[1:]):
+        current["end_page"] = max(current["start_page"], following["start_page"] - 1)
+    if chapters:
+        chapters[-1]["end_page"] = total_pages
+    return chapters
+
+
+async def _windowed_syllabus(
+    ask: Any, all_headers: List[Dict[str, Any]], total_pages: int, toc_context: str, debug_log: Any
+) -> List[Dict[str, Any]]:
+    step = _SYLLABUS_WINDOW_HEADERS - _SYLLABUS_WINDOW_OVERLAP
+    windows = [
+        all_headers[k : k + _SYLLABUS_WINDOW_HEADERS]
+        for k in range(0, max(1, len(all_headers) - _SYLLABUS_WINDOW_OVERLAP), step)
+    ]
+    semaphore = asyncio.Semaphore(max(1, int(os.getenv("SUMMIT_SYLLABUS_WINDOW_CONCURRENCY", "4"))))
+    debug_log(f"Splitting {len(all_headers)} headers into {len(windows)} windows of up to {_SYLLABUS_WINDOW_HEADERS}")
+
+    async def run_window(window: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        first, last = window[0]["page"], window[-1]["page"]
+        headers_text = "\n".join(f"Page {h['page']}: {h['text']}" for h in window)
+        prompt = (
+            f"{_SYLLABUS_WINDOW_INSTRUCTIONS}\n{toc_context}\n"
+            f"The book has {total_pages} pages.\n\n"
+            f"HEADER WINDOW (pages {first}-{last}):\n{headers_text}"
+        )
+        async with semaphore:
+            content = await ask(prompt)
+        debug_log(f"WINDOW pages {first}-{last} RESPONSE:")
+        debug_log(content)
+        out = []
+        for obj in _parse_chapters(content):
+            try:
+                start_page = int(obj.get("start_page"))
+            except (AttributeError, TypeError, ValueError):
+                continue
+            title = str(obj.get("title", "")).strip()
+            if title and first <= start_page <= last:
+                out.append({"title": title, "summary": str(obj.get("summary", "")).strip(), "start_page": start_page})
+        return out
+
+    results = await asyncio.gather(*[run_window(window) for window in windows])
+    merged = _merge_window_chapters([c for chunk in results for c in chunk], total_pages)
+    debug_log(f"Merged {sum(map(len, results))} window candidates into {len(merged)} chapters")
+    debug_log("")
+    return merged
+
+
 async def generate_intelligent_syllabus(pdf_path: str, total_pages: int, use_ai: bool = False, debug_log_path: str = None) -> List[Dict[str, Any]]:
     """
     Generate syllabus by:
@@ -845,17 +1669,57 @@ async def generate_intelligent_syllabus(pdf_path: str, total_pages: int, use_ai:
 
     Returns list of dicts with: {title: str, summary: str, start_page: int, end_page: int}
     """
-    import fitz  # type: ignore
-    from openai import OpenAI  # type: ignore
-    from datetime import datetime
-    import asyncio
+    with ExitStack() as stack:
+        # Debug lines stream straight to the file instead of being joined at the end
+        debug_file = None
+        if debug_log_path:
+            try:
+                debug_file = stack.enter_context(open(debug_log_path, "w", buffering=1 << 20))
+            except OSError as e:
+                logger.error("Failed to open debug log: %s", e)
+        result = await _intelligent_syllabus(debug_file, pdf_path, total_pages, use_ai)
+    if debug_file is not None:
+        logger.info("Debug log saved to: %s", debug_log_path)
+    return result
+
+
+def _scan_pdf(
+    pdf_path: str, total_pages: int, with_toc: bool, max_headers: Optional[int]
+) -> Tuple[_PageCache, str, List[Dict[str, Any]], Dict[int, str]]:
+    """
+    Blocking MuPDF half of the syllabus pipeline, run in a worker thread: TOC source text and
+    large-font headers (plus the text of header pages) from one Document opened and closed here.
+    """
+    # Parsed pages are cached by file hash, so re-runs on the same PDF skip MuPDF extraction
+    page_cache = _PageCache(pdf_path)
+    header_page_texts: Dict[int, str] = {}
+    with fitz.open(pdf_path) as doc:
+        toc_text = _toc_source_text(pdf_path, cache=page_cache, doc=doc) if with_toc else ""
+        headers = extract_all_headers_from_pdf(
+            pdf_path, total_pages, max_headers=max_headers, cache=page_cache, doc=doc, page_texts=header_page_texts
+        )
+    return page_cache, toc_text, headers, header_page_texts
 
+
+def _chapter_page_texts(pdf_path: str, cache: _PageCache, pages: List[int]) -> Dict[int, str]:
+    """First 2000 chars of each 1-indexed page, for enhanced summaries (blocking; run in a worker thread)."""
+    texts: Dict[int, str] = {}
+    with fitz.open(pdf_path) as doc:
+        for page_number in pages:
+            try:
+                texts[page_number] = cache.get_or_compute(page_number - 1, "text", doc[page_number - 1].get_text)[:2000]
+            except Exception:
+                # No page text just means the base summary is kept
+                logger.debug("generate_intelligent_syllabus: no text for page %d", page_number, exc_info=True)
+    return texts
+
+
+async def _intelligent_syllabus(debug_file: Any, pdf_path: str, total_pages: int, use_ai: bool) -> List[Dict[str, Any]]:
     # Setup dedicated debug log
-    debug_lines = []
     def debug_log(msg: str):
-        timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
-        line = f"[{timestamp}] {msg}"
-        debug_lines.append(line)
+        if debug_file is not None:
+            timestamp = datetime.now().strftime("%H:%M:%S.%f")[:-3]
+            debug_file.write(f"[{timestamp}] {msg}\n")
         logger.info(msg)
 
     debug_log("="*80)
@@ -866,27 +1730,34 @@ async def generate_intelligent_syllabus(pdf_path: str, total_pages: int, use_ai:
     debug_log(f"AI Enabled: {use_ai}")
     debug_log("")
 
+    # STEP 1: Scan the PDF for TOC text and large-font headers, off the event loop
+    debug_log("STEP 1: Scanning first 30 pages for a table of contents and the whole PDF for large-font text...")
+    # Optional cap for very long books; unset keeps full-book coverage
+    max_headers = int(os.getenv("HEADER_SCAN_MAX_HEADERS", "0")) or None
+    with_toc = use_ai and _has_key()
+    # Text of header pages is kept from this scan for the enhanced-summary step
+    page_cache, toc_text, all_headers, header_page_texts = await asyncio.to_thread(
+        _scan_pdf, pdf_path, total_pages, with_toc, max_headers
+    )
+
     # STEP 1A: Extract TOC structure (titles only) from first 30 pages
     debug_log("STEP 1A: Extracting table of contents structure from first 30 pages...")
-    toc_titles = extract_toc_structure(pdf_path, use_ai=use_ai)
+    toc_titles = await extract_toc_structure(toc_text, use_ai=use_ai) if with_toc else []
 
     if toc_titles:
         debug_log(f"Found TOC with {len(toc_titles)} chapters:")
-        for i, title in enumerate(toc_titles, 1):
-            debug_log(f"  {i}. {title}")
+        debug_log("\n".join(f"  {i}. {title}" for i, title in enumerate(toc_titles, 1)))
     else:
         debug_log("No clear TOC found (this is okay, will use headers only)")
     debug_log("")
 
-    # STEP 1B: Extract all potential headers from the PDF
-    debug_log("STEP 1B: Extracting all large-font text from PDF...")
-    all_headers = extract_all_headers_from_pdf(pdf_path, total_pages)
-
+    # STEP 1B: All potential headers from the PDF
+    debug_log("STEP 1B: Extracted all large-font text from PDF")
     debug_log(f"Found {len(all_headers)} large-font items")
     debug_log("")
     debug_log("Extracted Headers:")
-    for i, h in enumerate(all_headers[:50], 1):  # Show first 50
-        debug_log(f"  {i}. Page {h['page']:3d}: {h['text']}")
+    # One log record for the block rather than one per line; show first 50
+    debug_log("\n".join(f"  {i}. Page {h['page']:3d}: {h['text']}" for i, h in enumerate(all_headers[:50], 1)))
     if len(all_headers) > 50:
         debug_log(f"  ... and {len(all_headers) - 50} more")
     debug_log("")
@@ -894,29 +1765,13 @@ async def generate_intelligent_syllabus(pdf_path: str, total_pages: int, use_ai:
     if not all_headers:
         debug_log("ERROR: No headers found!")
         debug_log("Using simple fallback: equal page division")
-        items_count = min(12, max(8, total_pages // 50))
-        pages_per = total_pages // items_count
-        result = []
-        for i in range(items_count):
-            start = i * pages_per + 1
-            end = total_pages if i == items_count - 1 else (i + 1) * pages_per
-            result.append({
-                "title": f"Section {i + 1}",
-                "summary": f"Content from pages {start} to {end}",
-                "start_page": start,
-                "end_page": end
-            })
-        return result
+        return _equal_division_fallback(total_pages)
 
     if not use_ai or not _has_key():
         debug_log("STEP 2: AI not available or disabled")
         debug_log("Using heuristic approach (pattern matching)")
         # Simple heuristic: take headers that look like chapters
-        import re
-        chapters = []
-        for h in all_headers:
-            if re.match(r'^(\d+\.?\d*\s+[A-Z]|Chapter|Section|Part)', h["text"], re.IGNORECASE):
-                chapters.append(h)
+        chapters = [h for h in all_headers if _CHAPTER_HEADER_RE.match(h["text"])]
 
         if len(chapters) < 3:
             chapters = all_headers[:min(15, len(all_headers))]
@@ -938,18 +1793,10 @@ async def generate_intelligent_syllabus(pdf_path: str, total_pages: int, use_ai:
     debug_log("")
 
     try:
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # Async client: this is the slowest call in the pipeline and must not block the event loop
+        client = _async_client()
         # Use reasoning model for syllabus generation - better at logical structure analysis
-        model = os.getenv("OPENAI_SYLLABUS_MODEL", "o3-mini")
-
-        # Send ALL headers to AI - we have plenty of context (128k tokens)
-        headers_text = "\n".join([
-            f"Page {h['page']}: {h['text']}"
-            for h in all_headers
-        ])
-
-        debug_log(f"Sending ALL {len(all_headers)} headers to AI model: {model}")
-        debug_log(f"Coverage: pages {all_headers[0]['page']} to {all_headers[-1]['page']}")
+        model = _SYLLABUS_MODEL
 
         # Build TOC context if available
         toc_context = ""
@@ -963,7 +1810,41 @@ NOTE: The TOC above shows the book's intended structure, but does NOT have accur
 Use the headers below (which have accurate PDF page numbers) to determine actual page ranges.
 """
 
-        prompt = f"""You are analyzing a {total_pages}-page textbook PDF. I've extracted the table of contents structure AND all large-font text with page numbers.
+        async def ask(user_prompt: str) -> str:
+            # Reasoning models (o3, o1) don't support temperature
+            if _SYLLABUS_REASONING:
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "user", "content": user_prompt}
+                    ],
+                )
+            else:
+                resp = await client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {"role": "system", "content": "You are an expert at analyzing textbook structure. Return only valid JSON."},
+                        {"role": "user", "content": user_prompt}
+                    ],
+                    temperature=0.2,
+                    response_format=_SYLLABUS_RESPONSE_FORMAT,
+                )
+            return resp.choices[0].message.content or "[]"
+
+        if len(all_headers) > _SYLLABUS_WINDOW_HEADERS:
+            # Map-reduce: chapters per overlapping header window in parallel, merged by page
+            data = await _windowed_syllabus(ask, all_headers, total_pages, toc_context, debug_log)
+        else:
+            # Send ALL headers to AI - we have plenty of context (128k tokens)
+            headers_text = "\n".join([
+                f"Page {h['page']}: {h['text']}"
+                for h in all_headers
+            ])
+
+            debug_log(f"Sending ALL {len(all_headers)} headers to AI model: {model}")
+            debug_log(f"Coverage: pages {all_headers[0]['page']} to {all_headers[-1]['page']}")
+
+            prompt = f"""You are analyzing a {total_pages}-page textbook PDF. I've extracted the table of contents structure AND all large-font text with page numbers.
 
 Your task: Create a syllabus with 10-20 main chapters.
 {toc_context}
@@ -1006,180 +1887,152 @@ EXTRACTED HEADERS:
 
 Return ONLY valid JSON array, no code fences or extra text."""
 
-        debug_log("")
-        debug_log("AI PROMPT:")
-        debug_log("-" * 40)
-        debug_log(prompt)
-        debug_log("-" * 40)
-        debug_log("")
-
-        # Reasoning models (o3, o1) don't support temperature
-        if model.startswith(("o3", "o1")):
-            resp = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ],
-            )
-        else:
-            resp = client.chat.completions.create(
-                model=model,
-                messages=[
-                    {"role": "system", "content": "You are an expert at analyzing textbook structure. Return only valid JSON."},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.2,
-            )
+            debug_log("")
+            debug_log("AI PROMPT:")
+            debug_log("-" * 40)
+            debug_log(prompt)
+            debug_log("-" * 40)
+            debug_log("")
 
-        content = resp.choices[0].message.content or "[]"
+            content = await ask(prompt)
 
-        debug_log("AI RESPONSE:")
-        debug_log("-" * 40)
-        debug_log(content)
-        debug_log("-" * 40)
-        debug_log("")
+            debug_log("AI RESPONSE:")
+            debug_log("-" * 40)
+            debug_log(content)
+            debug_log("-" * 40)
+            debug_log("")
 
-        data = _try_parse_json(content) or []
+            data = _parse_chapters(content)
         result = []
 
         # Check if enhanced summaries are enabled (default: disabled for speed)
-        enable_enhanced_summaries = os.getenv("ENABLE_ENHANCED_SUMMARIES", "false").lower() in ("true", "1", "yes")
-
-        with fitz.open(pdf_path) as doc:
-            # First pass: collect all valid chapters with their base summaries
-            chapters_to_enhance = []
-
-            for obj in data:
-                title = str(obj.get("title", "")).strip()[:120]
-                summary = str(obj.get("summary", "")).strip()[:250]
-                start_page = obj.get("start_page")
-                end_page = obj.get("end_page")
-
-                try:
-                    start_page = int(start_page)
-                    end_page = int(end_page)
-
-                    # Validate range
-                    start_page = max(1, min(start_page, total_pages))
-                    end_page = max(start_page, min(end_page, total_pages))
-
-                    if title and summary:
-                        chapter_data = {
-                            "title": title,
-                            "summary": summary,
-                            "start_page": start_page,
-                            "end_page": end_page,
-                            "page_text": None
-                        }
-
-                        # Extract first page text if enhanced summaries are enabled
-                        if enable_enhanced_summaries and use_ai:
-                            try:
-                                chapter_data["page_text"] = doc[start_page - 1].get_text()[:2000]
-                            except:
-                                pass
-
-                        chapters_to_enhance.append(chapter_data)
-                except (ValueError, TypeError):
-                    logger.warning("generate_intelligent_syllabus: invalid page numbers: %s", obj)
-                    continue
-
-            # Second pass: enhance summaries in parallel using async
-            if enable_enhanced_summaries and use_ai and chapters_to_enhance:
-                debug_log(f"STEP 3: Enhancing summaries for {len(chapters_to_enhance)} chapters in parallel...")
+        enable_enhanced_summaries = _ENHANCED_SUMMARIES
 
-                # Create async tasks for all chapters that have page text
-                async_tasks = []
-                task_indices = []
+        # First pass: collect all valid chapters with their base summaries
+        chapters_to_enhance = []
+        pages_to_read: List[int] = []
 
-                for i, chapter in enumerate(chapters_to_enhance):
-                    if chapter["page_text"]:
-                        async_tasks.append(
-                            summarize_section_async(chapter["title"], chapter["page_text"], use_ai=True)
-                        )
-                        task_indices.append(i)
-
-                # Run all summarizations in parallel
-                if async_tasks:
-                    enhanced_summaries = await asyncio.gather(*async_tasks)
+        for obj in data:
+            title = str(obj.get("title", "")).strip()[:120]
+            summary = str(obj.get("summary", "")).strip()[:250]
+            start_page = obj.get("start_page")
+            end_page = obj.get("end_page")
 
-                    # Update chapters with enhanced summaries
-                    for task_idx, enhanced_summary in zip(task_indices, enhanced_summaries):
-                        if enhanced_summary and len(enhanced_summary) > 20:
-                            chapters_to_enhance[task_idx]["summary"] = enhanced_summary
+            try:
+                start_page = int(start_page)
+                end_page = int(end_page)
+
+                # Validate range
+                start_page = max(1, min(start_page, total_pages))
+                end_page = max(start_page, min(end_page, total_pages))
+
+                if title and summary:
+                    chapter_data = {
+                        "title": title,
+                        "summary": summary,
+                        "start_page": start_page,
+                        "end_page": end_page,
+                        "page_text": None
+                    }
+
+                    # First page text if enhanced summaries are enabled (content chapters only)
+                    if (
+                        enable_enhanced_summaries
+                        and use_ai
+                        and start_page > _FRONT_MATTER_PAGES
+                        and title.casefold() not in _FRONT_MATTER_TITLES
+                    ):
+                        chapter_data["page_text"] = header_page_texts.get(start_page)
+                        if not chapter_data["page_text"]:
+                            pages_to_read.append(start_page)
+
+                    chapters_to_enhance.append(chapter_data)
+            except (ValueError, TypeError):
+                logger.warning("generate_intelligent_syllabus: invalid page numbers: %s", obj)
+                continue
 
-            # Build final result
+        # Pages the header scan didn't keep are read in one worker-thread pass
+        if pages_to_read:
+            read_texts = await asyncio.to_thread(_chapter_page_texts, pdf_path, page_cache, pages_to_read)
             for chapter in chapters_to_enhance:
-                result.append({
-                    "title": chapter["title"],
-                    "summary": chapter["summary"],
-                    "start_page": chapter["start_page"],
-                    "end_page": chapter["end_page"]
-                })
+                if not chapter["page_text"]:
+                    chapter["page_text"] = read_texts.get(chapter["start_page"])
+
+        # Second pass: enhance summaries in parallel using async
+        if enable_enhanced_summaries and use_ai and chapters_to_enhance:
+            debug_log(f"STEP 3: Enhancing summaries for {len(chapters_to_enhance)} chapters in parallel...")
+
+            # Only chapters that have page text get an enhanced summary
+            task_indices = [i for i, chapter in enumerate(chapters_to_enhance) if chapter["page_text"]]
+
+            if task_indices:
+                sections = [(chapters_to_enhance[i]["title"], chapters_to_enhance[i]["page_text"]) for i in task_indices]
+                if _AI_BATCH:
+                    # Single Batch API job; polling blocks, so keep it off the event loop
+                    enhanced_summaries = await asyncio.to_thread(batch_generate_summaries, sections)
+                else:
+                    # Several sections per request, chunks run in parallel
+                    enhanced_summaries = await summarize_sections_multi(sections, use_ai=True)
+
+                # Update chapters with enhanced summaries
+                for task_idx, enhanced_summary in zip(task_indices, enhanced_summaries):
+                    if enhanced_summary and len(enhanced_summary) > 20:
+                        chapters_to_enhance[task_idx]["summary"] = enhanced_summary
+
+        # Build final result
+        for chapter in chapters_to_enhance:
+            result.append({
+                "title": chapter["title"],
+                "summary": chapter["summary"],
+                "start_page": chapter["start_page"],
+                "end_page": chapter["end_page"]
+            })
 
         if result and len(result) >= 3:
             debug_log("STEP 3: AI successfully identified chapters")
             debug_log("")
             debug_log(f"Final Syllabus ({len(result)} chapters):")
-            for i, ch in enumerate(result, 1):
-                debug_log(f"  {i}. {ch['title']}")
-                debug_log(f"      Pages: {ch['start_page']}-{ch['end_page']}")
-                debug_log(f"      Summary: {ch['summary']}")
-                debug_log("")
+            debug_log("".join(
+                f"  {i}. {ch['title']}\n      Pages: {ch['start_page']}-{ch['end_page']}\n      Summary: {ch['summary']}\n\n"
+                for i, ch in enumerate(result, 1)
+            ))
 
             debug_log("="*80)
             debug_log("SUCCESS: Syllabus generation complete")
             debug_log("="*80)
 
-            # Save debug log to file
-            if debug_log_path:
-                try:
-                    with open(debug_log_path, 'w') as f:
-                        f.write("\n".join(debug_lines))
-                    debug_log(f"Debug log saved to: {debug_log_path}")
-                except Exception as e:
-                    logger.error(f"Failed to save debug log: {e}")
-
             return result
         else:
             debug_log(f"WARNING: AI returned insufficient chapters ({len(result)})")
 
     except Exception as e:
         debug_log(f"ERROR: AI processing failed: {e}")
-        import traceback
         debug_log(traceback.format_exc())
 
     # Fallback if AI fails
     debug_log("Using fallback: equal page division")
-    items_count = min(12, max(8, total_pages // 50))
-    pages_per = total_pages // items_count
-    result = []
-    for i in range(items_count):
-        start = i * pages_per + 1
-        end = total_pages if i == items_count - 1 else (i + 1) * pages_per
-        result.append({
-            "title": f"Section {i + 1}",
-            "summary": f"Content from pages {start} to {end}",
-            "start_page": start,
-            "end_page": end
-        })
+    result = _equal_division_fallback(total_pages)
 
     debug_log("")
     debug_log(f"Fallback generated {len(result)} sections")
     debug_log("="*80)
 
-    # Save debug log
-    if debug_log_path:
-        try:
-            with open(debug_log_path, 'w') as f:
-                f.write("\n".join(debug_lines))
-            logger.info(f"Debug log saved to: {debug_log_path}")
-        except Exception as e:
-            logger.error(f"Failed to save debug log: {e}")
-
     return result
 
 
+def _fallback_syllabus_from_samples(samples: List[Dict[str, str]], max_items: int) -> List[Tuple[str, str]]:
+    """First line of each sample as the title, the next few lines as the summary."""
+    # Simple fallback: use first line of each sample as title
+    items = []
+    for idx, sample in enumerate(samples[:max_items]):
+        # Only the first four non-empty lines are used; don't strip the rest of the page
+        lines = list(islice(filter(None, map(str.strip, sample["content"].split("\n"))), 4))
+        title = lines[0][:80] if lines else f"Section {idx + 1}"
+        summary = " ".join(lines[1:4])[:200] if len(lines) > 1 else "Summary for this section."
+        items.append((title, summary))
+    return items
+
+
 def generate_syllabus_from_samples(samples: List[Dict[str, str]], total_pages: int, max_items: int = 8, use_ai: bool = False) -> List[Tuple[str, str]]:
     """
     Generate syllabus from distributed page samples across a large document.
@@ -1188,20 +2041,11 @@ def generate_syllabus_from_samples(samples: List[Dict[str, str]], total_pages: i
     """
     if not use_ai or not _has_key():
         logger.info("generate_syllabus_from_samples: using fallback")
-        # Simple fallback: use first line of each sample as title
-        items = []
-        for idx, sample in enumerate(samples[:max_items]):
-            lines = [l.strip() for l in sample["content"].split("\n") if l.strip()]
-            title = lines[0][:80] if lines else f"Section {idx + 1}"
-            summary = " ".join(lines[1:4])[:200] if len(lines) > 1 else "Summary for this section."
-            items.append((title, summary))
-        return items
+        return _fallback_syllabus_from_samples(samples, max_items)
 
     try:
-        from openai import OpenAI  # type: ignore
-
-        client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+        client = _sync_client()
+        model = _OPENAI_MODEL
 
         # Build context from samples
         context_parts = []
@@ -1210,22 +2054,15 @@ def generate_syllabus_from_samples(samples: List[Dict[str, str]], total_pages: i
 
         context = "\n\n".join(context_parts)
 
-        prompt = f"""You are analyzing a {total_pages}-page textbook. I'm providing you with text samples from various pages throughout the document.
-
-Based on these samples, create a logical syllabus structure with {max_items} main topics/chapters.
-
-Return a JSON array of objects with:
-- "title": A clear, descriptive chapter/topic title (no numbering prefixes like "1.", "Chapter 1")
-- "summary": A concise summary (under 200 characters)
-
-The syllabus should represent a logical learning progression through the material.
-
-SAMPLES:
-{context}
-
-Return only valid JSON array, no code fences or extra text."""
+        prompt = (
+            f"{_SAMPLES_INSTRUCTIONS}\n\n"
+            f"TOTAL PAGES: {total_pages}\n"
+            f"NUMBER OF TOPICS: {max_items}\n\n"
+            f"SAMPLES:\n{context}\n\n"
+            "Return only valid JSON array, no code fences or extra text."
+        )
 
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("="*80)
             logger.debug("GENERATE_SYLLABUS_FROM_SAMPLES - START")
             logger.debug("Model: %s", model)
@@ -1240,7 +2077,7 @@ Return only valid JSON array, no code fences or extra text."""
         resp = client.chat.completions.create(
             model=model,
             messages=[
-                {"role": "system", "content": "You are an educational content analyzer. Return only valid JSON."},
+                {"role": "system", "content": _SAMPLES_SYSTEM},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,
@@ -1248,7 +2085,7 @@ Return only valid JSON array, no code fences or extra text."""
 
         content = resp.choices[0].message.content or "[]"
 
-        if os.getenv("AI_DEBUG_LOG") == "1":
+        if _ai_debug():
             logger.debug("RESPONSE FROM MODEL:")
             logger.debug(content)
             logger.debug("GENERATE_SYLLABUS_FROM_SAMPLES - END")
@@ -1272,4 +2109,4 @@ Return only valid JSON array, no code fences or extra text."""
         logger.warning("generate_syllabus_from_samples: AI failed, using fallback: %s", e, exc_info=True)
 
     # Fallback
-    return generate_syllabus_from_samples(samples, total_pages, max_items, use_ai=False)
+    return _fallback_syllabus_from_samples(samples, max_items)
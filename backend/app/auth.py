@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import os
-from typing import Optional
+import threading
+import time
+from typing import Optional, Tuple
 
 import jwt
 from fastapi import Depends, HTTPException, status, Query
@@ -18,9 +24,40 @@ JWT_SECRET = os.getenv("JWT_SECRET", "dev-secret-change-me")
 JWT_ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRES_MINUTES = int(os.getenv("JWT_EXPIRES_MINUTES", str(60 * 24)))
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt work factor; lower it (e.g. BCRYPT_ROUNDS=4) only for tests
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
 http_bearer = HTTPBearer(auto_error=False)
 
+# Detached User rows by email, so authenticated requests skip the lookup query for a while.
+# No route changes or deletes a User, so entries are never invalidated explicitly; a row
+# changed out of band (e.g. by an admin script) can be served stale for up to the TTL.
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+_USER_CACHE: "OrderedDict[str, Tuple[float, User]]" = OrderedDict()
+_USER_CACHE_MAX = 10_000
+_USER_CACHE_LOCK = threading.Lock()
+
+
+def _cached_user(email: str) -> Optional[User]:
+    with _USER_CACHE_LOCK:
+        entry = _USER_CACHE.get(email)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            del _USER_CACHE[email]
+            return None
+        _USER_CACHE.move_to_end(email)
+        return entry[1]
+
+
+def _remember_user(user: User) -> None:
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[user.email] = (time.monotonic() + USER_CACHE_TTL_SECONDS, user)
+        _USER_CACHE.move_to_end(user.email)
+        if len(_USER_CACHE) > _USER_CACHE_MAX:
+            _USER_CACHE.popitem(last=False)
+
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -30,6 +67,32 @@ def verify_password(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+def dummy_verify_password() -> None:
+    """Spend one hash verification when there is no user, so login time doesn't reveal which emails exist."""
+    pwd_context.dummy_verify()
+
+
+@lru_cache(maxsize=1)
+def _bcrypt_pool() -> ProcessPoolExecutor:
+    """Worker processes for bcrypt, created on first use."""
+    return ProcessPoolExecutor(max_workers=os.cpu_count())
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password in the bcrypt pool, so async callers don't block the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool(), hash_password, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    """verify_password in the bcrypt pool, so async callers don't block the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(_bcrypt_pool(), verify_password, password, password_hash)
+
+
+async def dummy_verify_password_async() -> None:
+    """dummy_verify_password in the bcrypt pool, so async callers don't block the event loop."""
+    await asyncio.get_running_loop().run_in_executor(_bcrypt_pool(), dummy_verify_password)
+
+
 def create_access_token(subject: str, expires_minutes: int = ACCESS_TOKEN_EXPIRES_MINUTES) -> str:
     now = datetime.now(timezone.utc)
     payload = {
@@ -40,6 +103,36 @@ def create_access_token(subject: str, expires_minutes: int = ACCESS_TOKEN_EXPIRE
     return jwt.encode(payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
 
 
+# Verified token -> (sub, exp). Tokens are immutable and signed, so a token that verified
+# once stays valid until exp; cleared wholesale when full. Sync dependencies run in
+# threadpool workers, so access goes through the lock.
+_TOKEN_CACHE: dict[str, Tuple[str, float]] = {}
+_TOKEN_CACHE_MAX = 20_000
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+
+def _decode_subject(token: str) -> str:
+    """Verify the JWT and return its subject, skipping the HMAC check for recently seen tokens."""
+    with _TOKEN_CACHE_LOCK:
+        cached = _TOKEN_CACHE.get(token)
+    if cached is not None and cached[1] > time.time():
+        return cached[0]
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+        sub = payload.get("sub")
+        if not sub:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    except jwt.PyJWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        with _TOKEN_CACHE_LOCK:
+            if len(_TOKEN_CACHE) >= _TOKEN_CACHE_MAX:
+                _TOKEN_CACHE.clear()
+            _TOKEN_CACHE[token] = (sub, exp)
+    return sub
+
+
 def get_current_user(
     creds: Optional[HTTPAuthorizationCredentials] = Depends(http_bearer),
     session: Session = Depends(get_session),
@@ -50,15 +143,16 @@ def get_current_user(
     token = creds.credentials if creds is not None else (token_q or access_token_q)
     if not token:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Not authenticated")
-    try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        sub = payload.get("sub")
-        if not sub:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    except jwt.PyJWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    sub = _decode_subject(token)
 
-    user = session.exec(select(User).where(User.email == sub)).first()
+    user = _cached_user(sub)
+    if user is not None:
+        return user
+    user = session.scalar(select(User).where(User.email == sub))
     if not user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    if USER_CACHE_TTL_SECONDS > 0:
+        # Columns are already loaded; detach so the row outlives this session
+        session.expunge(user)
+        _remember_user(user)
     return user
@@ -1,23 +1,107 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Any, Iterator
 
+from sqlalchemy import event
 from sqlmodel import Session, SQLModel, create_engine
 
 # SQLite database in the project directory for simplicity
 SQLITE_URL = "sqlite:///./notes.db"
 
-# check_same_thread=False allows using the same connection across threads (needed for TestClient)
-engine = create_engine(SQLITE_URL, connect_args={"check_same_thread": False})
+# check_same_thread=False allows using the same connection across threads (needed for TestClient);
+# timeout waits on a locked database instead of failing, and the pool covers FastAPI's threadpool.
+# The compiled-statement LRU is sized well above the number of distinct statements the routes
+# issue so hot queries never fall out and get recompiled.
+engine = create_engine(
+    SQLITE_URL,
+    connect_args={"check_same_thread": False, "timeout": 30},
+    pool_size=20,
+    max_overflow=40,
+    query_cache_size=5000,
+)
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_connection: Any, _record: Any) -> None:
+    """WAL lets readers run alongside the single writer; NORMAL sync is safe under WAL."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-65536")
+    cursor.close()
+
+
+def _migrate_quiz_question_options() -> None:
+    """Fold the legacy option_a..option_d columns of quizquestion into its JSON options column."""
+    with engine.begin() as conn:
+        columns = {row[1] for row in conn.exec_driver_sql("PRAGMA table_info(quizquestion)")}
+        if "option_a" not in columns:
+            return
+        if "options" not in columns:
+            conn.exec_driver_sql("ALTER TABLE quizquestion ADD COLUMN options JSON")
+        conn.exec_driver_sql(
+            "UPDATE quizquestion SET options = json_array(option_a, option_b, option_c, option_d) WHERE options IS NULL"
+        )
+        for column in ("option_a", "option_b", "option_c", "option_d"):
+            conn.exec_driver_sql(f"ALTER TABLE quizquestion DROP COLUMN {column}")
+
+
+def _normalize_user_emails() -> None:
+    """Lowercase emails stored before registration normalized them.
+
+    Accounts whose emails differ only in case or whitespace each own their own courses and can't
+    be merged automatically; startup fails listing them rather than leaving one unable to log in.
+    """
+    with engine.begin() as conn:
+        collisions = conn.exec_driver_sql(
+            'SELECT lower(trim(email)), group_concat(id) FROM "user" GROUP BY lower(trim(email)) HAVING count(*) > 1'
+        ).all()
+        if collisions:
+            details = "; ".join(f"{email} (user ids {ids})" for email, ids in collisions)
+            raise RuntimeError(f"Duplicate accounts differ only in email case; merge or delete them first: {details}")
+        conn.exec_driver_sql('UPDATE "user" SET email = lower(trim(email)) WHERE email <> lower(trim(email))')
+
+
+# (parent table, counter column, child table, child foreign key)
+_CHILD_COUNTERS = (
+    ("quiz", "num_questions", "quizquestion", "quiz_id"),
+    ("flashcard", "num_cards", "flashcarditem", "flashcard_id"),
+    ("assignment", "num_questions", "assignmentquestion", "assignment_id"),
+)
+
+
+def _add_child_counters() -> None:
+    """Add the stored child-count columns to older databases and fill them from the child rows."""
+    with engine.begin() as conn:
+        for parent, column, child, fk in _CHILD_COUNTERS:
+            columns = {row[1] for row in conn.exec_driver_sql(f"PRAGMA table_info({parent})")}
+            if column in columns:
+                continue
+            conn.exec_driver_sql(f"ALTER TABLE {parent} ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0")
+            conn.exec_driver_sql(
+                f"UPDATE {parent} SET {column} = (SELECT count(*) FROM {child} WHERE {child}.{fk} = {parent}.id)"
+            )
 
 
 def create_db_and_tables() -> None:
     """Create database tables if they don't exist."""
     SQLModel.metadata.create_all(engine)
+    _migrate_quiz_question_options()
+    _normalize_user_emails()
+    _add_child_counters()
+    # create_all skips tables that already exist, so indexes declared after a table was
+    # first created (e.g. ix_user_email on older databases) are added here
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(engine, checkfirst=True)
 
 
 def get_session() -> Iterator[Session]:
     """FastAPI dependency that yields a database session."""
-    with Session(engine) as session:
+    # Objects keep their loaded state after commit; routes that add-commit-return don't pay a
+    # reload SELECT per object (server-generated columns are still fetched on first access)
+    with Session(engine, expire_on_commit=False) as session:
         yield session
@@ -11,6 +11,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import Session, select
 
 import os
+from .ai import aclose_clients, reload_env
 from .db import create_db_and_tables, get_session
 from .models import Note, NoteCreate, NoteRead, NoteUpdate
 from .routes_auth import router as auth_router
@@ -31,6 +32,7 @@ async def lifespan(_: FastAPI):
     print(f"DEBUG: Loading .env from: {os.path.abspath(env_path)}")
     print(f"DEBUG: .env exists: {os.path.exists(os.path.abspath(env_path))}")
     load_dotenv(env_path)
+    reload_env()
     print(f"DEBUG: AI_DEBUG_LOG = {os.getenv('AI_DEBUG_LOG')}")
     # Initialize logging for observability
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -71,6 +73,7 @@ async def lifespan(_: FastAPI):
     # Initialize database tables on startup
     create_db_and_tables()
     yield
+    await aclose_clients()
 
 
 app = FastAPI(title="Summit API", version="0.1.0", lifespan=lifespan)
@@ -109,7 +112,7 @@ def health() -> dict:
 
 @app.get("/notes", response_model=List[NoteRead])
 def list_notes(session: Session = Depends(get_session)) -> List[NoteRead]:
-    notes = session.exec(select(Note).order_by(Note.created_at.desc())).all()
+    notes = session.scalars(select(Note).order_by(Note.created_at.desc())).all()
     return notes
 
 
@@ -118,7 +121,6 @@ def create_note(payload: NoteCreate, session: Session = Depends(get_session)) ->
     note = Note(**payload.model_dump())
     session.add(note)
     session.commit()
-    session.refresh(note)
     return note
 
 
@@ -143,7 +145,6 @@ def update_note(note_id: int, payload: NoteUpdate, session: Session = Depends(ge
 
     session.add(note)
     session.commit()
-    session.refresh(note)
     return note
 
 
@@ -1,9 +1,38 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone, date
-from typing import Optional, List
+from datetime import datetime, date
+from enum import Enum
+from typing import Any, Optional, List
 
-from sqlmodel import Field, SQLModel
+from sqlalchemy import JSON, Column, DateTime, Enum as SAEnum, Index, text
+from sqlalchemy.orm import deferred
+from pydantic import field_validator
+from sqlmodel import AutoString, Field, SQLModel
+from typing_extensions import TypedDict
+
+# UTC timestamp computed by SQLite, in the same text format SQLAlchemy writes for datetimes
+_UTC_NOW_SQL = "strftime('%Y-%m-%d %H:%M:%f000', 'now')"
+
+
+def _utc_now_column(on_update: bool = False) -> Any:
+    """Timestamp column filled in by the database instead of a Python datetime per row.
+
+    The SQL default is rendered into each INSERT, so it also works on tables created before
+    the server default existed.
+    """
+    return Column(
+        DateTime(timezone=True),
+        default=text(_UTC_NOW_SQL),
+        server_default=text(f"({_UTC_NOW_SQL})"),
+        onupdate=text(_UTC_NOW_SQL) if on_update else None,
+        nullable=False,
+    )
+
+
+# Full extracted text, mapped deferred so listing/lookup queries don't pull it into every row;
+# it is loaded on first attribute access
+_COURSE_RAW_TEXT = Column("raw_text", AutoString, nullable=False)
+_SYLLABUS_ITEM_CONTENT = Column("content", AutoString, nullable=True)
 
 
 class NoteBase(SQLModel):
@@ -17,15 +46,15 @@ class Note(NoteBase, table=True):
     """SQLModel table for persisted notes."""
 
     id: Optional[int] = Field(default=None, primary_key=True)
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(sa_column=_utc_now_column())
+    updated_at: datetime = Field(sa_column=_utc_now_column(on_update=True))
 
 
 class User(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     email: str = Field(index=True, unique=True)
     password_hash: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    created_at: datetime = Field(sa_column=_utc_now_column())
 
     # Relationship fields are omitted in MVP to simplify mapping
 
@@ -34,6 +63,12 @@ class UserCreate(SQLModel):
     email: str
     password: str
 
+    @field_validator("email")
+    @classmethod
+    def _normalize_email(cls, value: str) -> str:
+        # Stored and looked up in canonical form so the unique index serves case-insensitive logins
+        return value.strip().lower()
+
 
 class UserRead(SQLModel):
     id: int
@@ -41,19 +76,41 @@ class UserRead(SQLModel):
     created_at: datetime
 
 
+class CourseStatus(str, Enum):
+    """Processing stages of an uploaded course, in order; error is terminal."""
+
+    uploading = "uploading"
+    extracting_pages = "extracting_pages"
+    extracting_toc = "extracting_toc"
+    extracting_headers = "extracting_headers"
+    ai_processing = "ai_processing"
+    creating_readings = "creating_readings"
+    complete = "complete"
+    error = "error"
+
+
+# Look rows up by primary key with session.get(Course, id) rather than select(...).where(id == ...):
+# get() is answered from the session's identity map when the row was already loaded during the
+# request (ownership check, then route logic), so repeated lookups cost no extra SELECT. Inserts
+# fetch ids and database defaults via RETURNING, so there is no need to refresh() after commit.
 class Course(SQLModel, table=True):
+    __mapper_args__ = {"properties": {"raw_text": deferred(_COURSE_RAW_TEXT)}}
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     title: str
     source_filename: Optional[str] = None
     pdf_path: Optional[str] = None
     num_pages: Optional[int] = None
     topics: Optional[str] = None
-    raw_text: str
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    raw_text: str = Field(sa_column=_COURSE_RAW_TEXT)
+    created_at: datetime = Field(sa_column=_utc_now_column())
 
     # Progress tracking
-    status: str = Field(default="uploading")  # uploading, extracting_toc, extracting_headers, ai_processing, creating_readings, complete, error
+    status: CourseStatus = Field(
+        default=CourseStatus.uploading,
+        sa_column=Column(SAEnum(CourseStatus, native_enum=False, create_constraint=True, validate_strings=True), nullable=False),
+    )
     status_message: Optional[str] = None
     progress_percent: int = Field(default=0)
 
@@ -61,6 +118,9 @@ class Course(SQLModel, table=True):
 
 
 class SyllabusItem(SQLModel, table=True):
+    __table_args__ = (Index("ix_syllabusitem_course_id_order_index", "course_id", "order_index"),)
+    __mapper_args__ = {"properties": {"content": deferred(_SYLLABUS_ITEM_CONTENT)}}
+
     id: Optional[int] = Field(default=None, primary_key=True)
     course_id: int = Field(foreign_key="course.id")
     order_index: int
@@ -68,13 +128,15 @@ class SyllabusItem(SQLModel, table=True):
     summary: str
     start_page: Optional[int] = None
     end_page: Optional[int] = None
-    content: Optional[str] = None  # Full PDF content for this section
+    content: Optional[str] = Field(default=None, sa_column=_SYLLABUS_ITEM_CONTENT)  # Full PDF content for this section
 
     # Relationship fields are omitted in MVP to simplify mapping
 
 
 class PDFPage(SQLModel, table=True):
     """Stores extracted text content for each page of a PDF"""
+    __table_args__ = (Index("ix_pdfpage_course_id_page_number", "course_id", "page_number"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     course_id: int = Field(foreign_key="course.id")
     page_number: int
@@ -90,12 +152,14 @@ class CourseRead(SQLModel):
     num_pages: Optional[int] = None
     topics: Optional[str] = None
     created_at: datetime
-    status: str
+    status: CourseStatus
     status_message: Optional[str] = None
     progress_percent: int
 
 
-class SyllabusItemRead(SQLModel):
+# List-element read shapes are TypedDicts: responses carry dozens to hundreds of them, and a
+# plain dict validates and serializes several times faster than a model instance per item
+class SyllabusItemRead(TypedDict):
     id: int
     order_index: int
     title: str
@@ -107,9 +171,11 @@ class CourseReadWithSyllabus(CourseRead):
 
 
 class Reading(SQLModel, table=True):
+    __table_args__ = (Index("ix_reading_course_id_order_index", "course_id", "order_index"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     course_id: int = Field(foreign_key="course.id")
-    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id")
+    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id", index=True)
     order_index: int
     title: str
     start_page: int
@@ -126,11 +192,13 @@ class ReadingRead(SQLModel):
 
 
 class ReadingProgress(SQLModel, table=True):
+    __table_args__ = (Index("ix_readingprogress_reading_id_user_id", "reading_id", "user_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     reading_id: int = Field(foreign_key="reading.id")
-    user_id: int = Field(foreign_key="user.id")
+    user_id: int = Field(foreign_key="user.id", index=True)
     last_page: int
-    updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    updated_at: datetime = Field(sa_column=_utc_now_column(on_update=True))
 
 
 class NoteCreate(NoteBase):
@@ -158,20 +226,18 @@ class NoteUpdate(SQLModel):
 
 class Quiz(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.id")
-    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    course_id: int = Field(foreign_key="course.id", index=True)
+    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id", index=True)
+    created_at: datetime = Field(sa_column=_utc_now_column())
+    num_questions: int = Field(default=0, sa_column_kwargs={"server_default": text("0")})  # kept in step with its questions
 
 
 class QuizQuestion(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    quiz_id: int = Field(foreign_key="quiz.id")
+    quiz_id: int = Field(foreign_key="quiz.id", index=True)
     order_index: int
     prompt: str
-    option_a: str
-    option_b: str
-    option_c: str
-    option_d: str
+    options: List[str] = Field(sa_column=Column(JSON, nullable=False))  # the four choices, in display order
     answer_index: int  # 0..3 indicating the correct option
 
 
@@ -184,7 +250,7 @@ class QuizRead(SQLModel):
     num_questions: int
 
 
-class QuizQuestionRead(SQLModel):
+class QuizQuestionRead(TypedDict):
     id: int
     order_index: int
     prompt: str
@@ -201,10 +267,12 @@ class QuizDetailRead(SQLModel):
 
 
 class QuizSubmission(SQLModel, table=True):
+    __table_args__ = (Index("ix_quizsubmission_quiz_id_user_id", "quiz_id", "user_id"),)
+
     id: Optional[int] = Field(default=None, primary_key=True)
     quiz_id: int = Field(foreign_key="quiz.id")
-    user_id: int = Field(foreign_key="user.id")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(sa_column=_utc_now_column())
     score: int
     total: int
 
@@ -219,11 +287,16 @@ class QuizSubmissionRead(SQLModel):
 # --- Progress tracking ---
 
 class SyllabusCompletion(SQLModel, table=True):
+    __table_args__ = (
+        Index("ix_syllabuscompletion_course_id_user_id", "course_id", "user_id"),
+        Index("ix_syllabuscompletion_user_id_syllabus_item_id", "user_id", "syllabus_item_id"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     course_id: int = Field(foreign_key="course.id")
-    syllabus_item_id: int = Field(foreign_key="syllabusitem.id")
-    completed_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    syllabus_item_id: int = Field(foreign_key="syllabusitem.id", index=True)
+    completed_at: datetime = Field(sa_column=_utc_now_column())
 
 
 class ProgressSummaryRead(SQLModel):
@@ -256,8 +329,8 @@ class UserProfileUpdate(SQLModel):
 
 class ScheduleItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.id")
-    syllabus_item_id: int = Field(foreign_key="syllabusitem.id")
+    course_id: int = Field(foreign_key="course.id", index=True)
+    syllabus_item_id: int = Field(foreign_key="syllabusitem.id", index=True)
     week_index: int
     due_date: date
 
@@ -273,13 +346,14 @@ class ScheduleItemRead(SQLModel):
 
 class Assignment(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.id")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    course_id: int = Field(foreign_key="course.id", index=True)
+    created_at: datetime = Field(sa_column=_utc_now_column())
+    num_questions: int = Field(default=0, sa_column_kwargs={"server_default": text("0")})  # kept in step with its questions
 
 
 class AssignmentQuestion(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    assignment_id: int = Field(foreign_key="assignment.id")
+    assignment_id: int = Field(foreign_key="assignment.id", index=True)
     order_index: int
     prompt: str
     expected_keyword: str
@@ -292,18 +366,25 @@ class AssignmentRead(SQLModel):
     num_questions: int
 
 
+class AssignmentQuestionRead(SQLModel):
+    # expected_keyword is the answer key and stays server-side
+    id: int
+    order_index: int
+    prompt: str
+
+
 class AssignmentDetailRead(SQLModel):
     id: int
     course_id: int
     created_at: datetime
-    questions: List[dict]
+    questions: List[AssignmentQuestionRead]
 
 
 class AssignmentSubmission(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    assignment_id: int = Field(foreign_key="assignment.id")
-    user_id: int = Field(foreign_key="user.id")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    assignment_id: int = Field(foreign_key="assignment.id", index=True)
+    user_id: int = Field(foreign_key="user.id", index=True)
+    created_at: datetime = Field(sa_column=_utc_now_column())
     score: int
     total: int
 
@@ -317,20 +398,28 @@ class AssignmentSubmissionRead(SQLModel):
 
 # --- Flashcards ---
 
+class CardType(str, Enum):
+    qa = "qa"
+    term_definition = "term_definition"
+
+
 class Flashcard(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    course_id: int = Field(foreign_key="course.id")
-    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id")
-    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    course_id: int = Field(foreign_key="course.id", index=True)
+    syllabus_item_id: Optional[int] = Field(default=None, foreign_key="syllabusitem.id", index=True)
+    created_at: datetime = Field(sa_column=_utc_now_column())
+    num_cards: int = Field(default=0, sa_column_kwargs={"server_default": text("0")})  # kept in step with its cards
 
 
 class FlashcardItem(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    flashcard_id: int = Field(foreign_key="flashcard.id")
+    flashcard_id: int = Field(foreign_key="flashcard.id", index=True)
     order_index: int
     front: str
     back: str
-    card_type: str  # "qa" or "term_definition"
+    card_type: CardType = Field(
+        sa_column=Column(SAEnum(CardType, native_enum=False, create_constraint=True, validate_strings=True), nullable=False)
+    )
 
 
 class FlashcardRead(SQLModel):
@@ -342,12 +431,12 @@ class FlashcardRead(SQLModel):
     num_cards: int
 
 
-class FlashcardItemRead(SQLModel):
+class FlashcardItemRead(TypedDict):
     id: int
     order_index: int
     front: str
     back: str
-    card_type: str
+    card_type: CardType
 
 
 class FlashcardDetailRead(SQLModel):
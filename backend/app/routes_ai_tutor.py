@@ -1,23 +1,62 @@
 from __future__ import annotations
 
-from typing import List, Dict, Any, Optional
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import json
 import logging
 import os
+import re
+import threading
+import time
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.responses import StreamingResponse
 from sqlmodel import Session, select
 from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
 
 from .auth import get_current_user
 from .db import get_session
 from .models import User, Course, PDFPage
-from .ai import should_use_ai
+from .ai import async_client, openai_model, should_use_ai
+
+try:
+    import tiktoken  # type: ignore
+except ImportError:  # pragma: no cover - in requirements.txt; character budgets if it's missing
+    tiktoken = None  # type: ignore
 
 logger = logging.getLogger("summit.ai_tutor")
 
 router = APIRouter(prefix="/courses", tags=["ai-tutor"])
 
+# Stream deltas are coalesced into one event once this many characters are buffered
+# or this long has passed since the previous event
+_SSE_FLUSH_CHARS = 64
+_SSE_FLUSH_SECONDS = 0.02
+# Opening comment padded past the size proxies buffer before forwarding, and a comment sent
+# whenever the model is silent this long so idle connections are not reaped
+_SSE_PREAMBLE = ": " + " " * 2048 + "\n\n"
+_SSE_HEARTBEAT = ":\n\n"
+_SSE_HEARTBEAT_SECONDS = 15.0
+
+# Line start offsets of each course's raw_text for the text fallback, so a request slices the
+# text instead of splitting megabytes into lines. raw_text never changes after upload; the stored
+# length guards against a reused course id.
+_LINE_STARTS: "OrderedDict[int, Tuple[int, array]]" = OrderedDict()
+_LINE_STARTS_MAX = 32
+_LINE_STARTS_LOCK = threading.Lock()
+_NEWLINE_RE = re.compile("\n")
+
+# Composed prev/current/next context per (course id, course created_at, page). Stored pages are
+# written once at upload and only removed with the course; created_at in the key keeps a reused
+# course id from hitting another course's entries. Repeat questions on a page skip the DB.
+_PAGE_CONTEXT: "OrderedDict[Tuple[int, datetime, int], str]" = OrderedDict()
+_PAGE_CONTEXT_MAX = int(os.getenv("TUTOR_PAGE_CACHE_SIZE", "2048"))
+_PAGE_CONTEXT_LOCK = threading.Lock()
+
 
 class ChatMessage(BaseModel):
     role: str  # 'user' or 'assistant'
@@ -36,85 +75,171 @@ class AITutorResponse(BaseModel):
     response: str
 
 
-def _extract_page_content_from_pdf(course_id: int, page_number: int, session: Session) -> str:
-    """Extract content from stored PDF pages in database."""
+def _cached_page_context(key: Tuple[int, datetime, int]) -> Optional[str]:
+    with _PAGE_CONTEXT_LOCK:
+        content = _PAGE_CONTEXT.get(key)
+        if content is not None:
+            _PAGE_CONTEXT.move_to_end(key)
+        return content
 
-    # Get course to verify it exists
-    course = session.get(Course, course_id)
-    if not course:
-        return "Course content not available."
 
+def _remember_page_context(key: Tuple[int, datetime, int], content: str) -> None:
+    if _PAGE_CONTEXT_MAX <= 0:
+        return
+    with _PAGE_CONTEXT_LOCK:
+        _PAGE_CONTEXT[key] = content
+        _PAGE_CONTEXT.move_to_end(key)
+        if len(_PAGE_CONTEXT) > _PAGE_CONTEXT_MAX:
+            _PAGE_CONTEXT.popitem(last=False)
+
+
+# Context budgets in tokens (tiktoken) with character equivalents used when it's unavailable
+_NEIGHBOR_PAGE_TOKENS, _NEIGHBOR_PAGE_CHARS = 150, 500
+_PAGE_CONTEXT_TOKENS, _PAGE_CONTEXT_CHARS = 2000, 6000
+
+
+@lru_cache(maxsize=1)
+def _encoder() -> Any:
+    """Tokenizer for the tutor models (o200k_base, the gpt-4o family), or None if unavailable."""
+    if tiktoken is None:
+        return None
     try:
-        # Get the current page content from database
-        current_page = session.exec(
-            select(PDFPage).where(
-                (PDFPage.course_id == course_id) &
-                (PDFPage.page_number == page_number)
-            )
-        ).first()
-
-        if not current_page:
-            logger.warning(f"No stored content for course {course_id}, page {page_number}")
-            return _extract_page_content(course.raw_text or "", page_number)
-
-        content_parts = []
-
-        # Get previous page for context (if exists)
-        if page_number > 1:
-            prev_page = session.exec(
-                select(PDFPage).where(
-                    (PDFPage.course_id == course_id) &
-                    (PDFPage.page_number == page_number - 1)
-                )
-            ).first()
-            if prev_page:
-                prev_text = prev_page.content
-                if len(prev_text) > 500:  # Limit previous page content
-                    prev_text = "..." + prev_text[-500:]
-                content_parts.append(f"[Context from page {page_number - 1}]\n{prev_text}\n")
-
-        # Add current page
-        content_parts.append(f"[Current page {page_number}]\n{current_page.content}\n")
-
-        # Get next page for context (if exists)
-        next_page = session.exec(
-            select(PDFPage).where(
-                (PDFPage.course_id == course_id) &
-                (PDFPage.page_number == page_number + 1)
-            )
-        ).first()
-        if next_page:
-            next_text = next_page.content
-            if len(next_text) > 500:  # Limit next page content
-                next_text = next_text[:500] + "..."
-            content_parts.append(f"[Context from page {page_number + 1}]\n{next_text}")
-
-        page_content = "\n".join(content_parts)
-
-        # Limit total content length for API efficiency
-        if len(page_content) > 6000:
-            page_content = page_content[:6000] + "..."
-
-        return page_content
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # encoding files are fetched on first use and may be unreachable
+        logger.warning("tiktoken encoding unavailable, using character budgets: %s", e)
+        return None
+
+
+def _clip(text: str, max_tokens: int, max_chars: int, keep_end: bool = False) -> Optional[str]:
+    """Cut text to its token budget (character budget without tiktoken); None if it already fits."""
+    enc = _encoder()
+    if enc is None:
+        if len(text) <= max_chars:
+            return None
+        return text[-max_chars:] if keep_end else text[:max_chars]
+    tokens = enc.encode_ordinary(text)
+    if len(tokens) <= max_tokens:
+        return None
+    # A token boundary can split a multi-byte character; drop the replacement char that leaves
+    return enc.decode(tokens[-max_tokens:] if keep_end else tokens[:max_tokens]).strip("\ufffd")
+
+
+def _stored_page_context(course_id: int, created_at: datetime, page_number: int, session: Session) -> Optional[str]:
+    """Prev/current/next context from stored PDF pages (cached), or None if the page isn't stored."""
+    cache_key = (course_id, created_at, page_number)
+    cached = _cached_page_context(cache_key)
+    if cached is not None:
+        return cached
+
+    # Previous, current and next page in one round-trip (served by the course_id/page_number index)
+    texts = dict(session.exec(
+        select(PDFPage.page_number, PDFPage.content).where(
+            (PDFPage.course_id == course_id) &
+            PDFPage.page_number.in_([page_number - 1, page_number, page_number + 1])
+        )
+    ).all())
+    current_text = texts.get(page_number)
+    if current_text is None:
+        return None
+
+    content_parts = []
+
+    # Get previous page for context (if exists)
+    prev_text = texts.get(page_number - 1)
+    if prev_text is not None:
+        clipped = _clip(prev_text, _NEIGHBOR_PAGE_TOKENS, _NEIGHBOR_PAGE_CHARS, keep_end=True)  # Limit previous page content
+        if clipped is not None:
+            prev_text = "..." + clipped
+        content_parts.append(f"[Context from page {page_number - 1}]\n{prev_text}\n")
+
+    # Add current page
+    content_parts.append(f"[Current page {page_number}]\n{current_text}\n")
+
+    # Next page for context (if exists)
+    next_text = texts.get(page_number + 1)
+    if next_text is not None:
+        clipped = _clip(next_text, _NEIGHBOR_PAGE_TOKENS, _NEIGHBOR_PAGE_CHARS)  # Limit next page content
+        if clipped is not None:
+            next_text = clipped + "..."
+        content_parts.append(f"[Context from page {page_number + 1}]\n{next_text}")
+
+    page_content = "\n".join(content_parts)
+
+    # Limit total content length for API efficiency
+    clipped = _clip(page_content, _PAGE_CONTEXT_TOKENS, _PAGE_CONTEXT_CHARS)
+    if clipped is not None:
+        page_content = clipped + "..."
+
+    _remember_page_context(cache_key, page_content)
+    return page_content
 
+
+def _extract_page_content_from_pdf(course: Course, page_number: int, session: Session) -> str:
+    """Extract content from stored PDF pages in database (course already loaded and ownership-checked)."""
+    try:
+        page_content = _stored_page_context(course.id, course.created_at, page_number, session)
+        if page_content is not None:
+            return page_content
+        logger.warning(f"No stored content for course {course.id}, page {page_number}")
     except Exception as e:
         logger.warning(f"Failed to extract PDF content from database: {e}")
-        # Fallback to text-based extraction
-        return _extract_page_content(course.raw_text or "", page_number)
+    # Fallback to text-based extraction
+    return _extract_page_content(course, page_number)
+
 
+def _prefetch_page_context(
+    course_id: int, created_at: datetime, num_pages: Optional[int], page_number: int, bind: Any
+) -> None:
+    """Background task: warm the context cache for the page the student is likely to ask about next.
 
-def _extract_page_content(course_text: str, page_number: int, context_pages: int = 1) -> str:
+    Takes plain values rather than the Course, which is detached once the request's session closes.
+    """
+    if num_pages is not None and page_number > num_pages:
+        return
+    try:
+        # The request's session is closed by now; use a short-lived one on the same engine
+        with Session(bind) as session:
+            _stored_page_context(course_id, created_at, page_number, session)
+    except Exception as e:
+        logger.debug("Tutor page prefetch failed for course %s, page %s: %s", course_id, page_number, e)
+
+
+def _line_starts(course_id: int, course_text: str) -> array:
+    """Offsets where each line of the course text begins (computed once per course)."""
+    with _LINE_STARTS_LOCK:
+        entry = _LINE_STARTS.get(course_id)
+        if entry is not None and entry[0] == len(course_text):
+            _LINE_STARTS.move_to_end(course_id)
+            return entry[1]
+    starts = array("q", [0])
+    starts.extend(m.end() for m in _NEWLINE_RE.finditer(course_text))
+    with _LINE_STARTS_LOCK:
+        _LINE_STARTS[course_id] = (len(course_text), starts)
+        _LINE_STARTS.move_to_end(course_id)
+        if len(_LINE_STARTS) > _LINE_STARTS_MAX:
+            _LINE_STARTS.popitem(last=False)
+    return starts
+
+
+def _extract_page_content(course: Course, page_number: int, context_pages: int = 1) -> str:
     """Extract content around the specified page from course text.
     This is a fallback when PDF extraction is not available."""
 
+    course_text = course.raw_text or ""
+    starts = _line_starts(course.id, course_text)
+    num_lines = len(starts)
     # Split text into approximate pages (this is a rough estimation)
-    lines = course_text.split('\n')
-    lines_per_page = max(50, len(lines) // 100)  # Rough estimation
+    lines_per_page = max(50, num_lines // 100)  # Rough estimation
 
     start_line = max(0, (page_number - 1 - context_pages) * lines_per_page)
-    end_line = min(len(lines), (page_number + context_pages) * lines_per_page)
+    end_line = min(num_lines, (page_number + context_pages) * lines_per_page)
 
-    page_content = '\n'.join(lines[start_line:end_line])
+    if start_line >= end_line:
+        page_content = ""
+    else:
+        # Slice whole lines straight out of the text (dropping the newline that ends the last one)
+        stop = starts[end_line] - 1 if end_line < num_lines else len(course_text)
+        page_content = course_text[starts[start_line]:stop]
 
     # Limit content length for API efficiency
     if len(page_content) > 4000:
@@ -123,115 +248,138 @@ def _extract_page_content(course_text: str, page_number: int, context_pages: int
     return page_content
 
 
-def _generate_ai_response_stream(message: str, page_content: str, page_number: int,
-                                 conversation_history: List[ChatMessage]):
-    """Generate streaming AI tutor response using OpenAI API."""
+_TUTOR_PROMPT = """You are a helpful AI tutor assisting a student with their course material.
 
-    if not should_use_ai():
-        yield "data: I'm sorry, the AI tutoring feature is currently unavailable. Please try again later.\n\n"
-        return
-
-    try:
-        import openai
-        client = openai.OpenAI()
-
-        # Build conversation context
-        system_prompt = f"""You are a helpful AI tutor assisting a student with their course material.
-
-The student is currently reading page {page_number} of their course material. Here's the content from around that page:
-
----
-{page_content}
----
+The next system message gives the page the student is currently reading and the content from around that page.
 
 Your role is to:
 1. Answer questions about the content clearly and helpfully
 2. Provide explanations and context when needed
 3. Suggest study strategies and tips
 4. Help the student understand complex concepts
-5. Keep responses concise but thorough
+5. Keep responses concise but thorough{length_hint}
 
 Always be encouraging and educational. If you're not sure about something specific to their course material, acknowledge that and focus on general principles that might help."""
 
-        messages = [{"role": "system", "content": system_prompt}]
+# Built once: the instructions are an identical leading message on every call, which lets the
+# API's prompt caching reuse them; only the page context message after them varies
+_TUTOR_PROMPT_STREAM = _TUTOR_PROMPT.format(length_hint="")
+_TUTOR_PROMPT_CHAT = _TUTOR_PROMPT.format(length_hint=" (2-4 sentences usually)")
+
+
+def _tutor_messages(message: str, page_content: str, page_number: int,
+                    conversation_history: List[ChatMessage], instructions: str) -> List[Dict[str, str]]:
+    """Chat messages for a tutor turn: static instructions, page context, recent history, question."""
+    messages = [
+        {"role": "system", "content": instructions},
+        {
+            "role": "system",
+            "content": f"The student is currently reading page {page_number}. Content from around that page:\n\n---\n{page_content}\n---",
+        },
+    ]
+    # Last 6 messages for context
+    messages.extend({"role": msg.role, "content": msg.content} for msg in conversation_history[-6:])
+    messages.append({"role": "user", "content": message})
+    return messages
+
+
+def _sse(payload: Dict[str, Any]) -> str:
+    """Frame a payload as one server-sent event; JSON keeps newlines inside tokens escaped."""
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _generate_ai_response_stream(message: str, page_content: str, page_number: int,
+                                       conversation_history: List[ChatMessage]):
+    """Generate streaming AI tutor response using OpenAI API."""
+
+    yield _SSE_PREAMBLE
+
+    if not should_use_ai():
+        yield _sse({"token": "I'm sorry, the AI tutoring feature is currently unavailable. Please try again later."})
+        return
 
-        # Add conversation history
-        for msg in conversation_history[-6:]:  # Last 6 messages for context
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
+    try:
+        # Shared async client: chunks are awaited on the event loop instead of tying up a thread per stream
+        client = async_client()
 
-        # Add current message
-        messages.append({"role": "user", "content": message})
+        messages = _tutor_messages(message, page_content, page_number, conversation_history, _TUTOR_PROMPT_STREAM)
 
-        stream = client.chat.completions.create(
+        stream = await client.chat.completions.create(
             model="gpt-3.5-turbo",
             messages=messages,
             max_tokens=800,
             temperature=0.7,
-            stream=True
+            stream=True,
+            # No trailing usage chunk: nothing reads token counts here
+            stream_options={"include_usage": False},
         )
 
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                # Server-sent events format
-                yield f"data: {chunk.choices[0].delta.content}\n\n"
+        buf: List[str] = []
+        buffered = 0
+        last_flush = time.monotonic()
+        chunks = aiter(stream)
+        # asyncio.wait leaves the pending read running on timeout (wait_for would cancel it and
+        # break the stream), so a quiet model yields a heartbeat or the buffered deltas instead
+        pending = asyncio.ensure_future(anext(chunks))
+        try:
+            while True:
+                done, _ = await asyncio.wait({pending}, timeout=_SSE_FLUSH_SECONDS if buf else _SSE_HEARTBEAT_SECONDS)
+                if not done:
+                    if buf:
+                        yield _sse({"token": "".join(buf)})
+                        buf.clear()
+                        buffered = 0
+                        last_flush = time.monotonic()
+                    else:
+                        yield _SSE_HEARTBEAT
+                    continue
+                try:
+                    chunk = pending.result()
+                except StopAsyncIteration:
+                    break
+                pending = asyncio.ensure_future(anext(chunks))
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    buf.append(delta)
+                    buffered += len(delta)
+                    now = time.monotonic()
+                    if buffered >= _SSE_FLUSH_CHARS or now - last_flush >= _SSE_FLUSH_SECONDS:
+                        yield _sse({"token": "".join(buf)})
+                        buf.clear()
+                        buffered = 0
+                        last_flush = now
+        finally:
+            # Client went away mid-stream: drop the outstanding read
+            pending.cancel()
+        if buf:
+            yield _sse({"token": "".join(buf)})
 
         # Send done signal
-        yield "data: [DONE]\n\n"
+        yield _sse({"done": True})
 
     except ImportError:
         logger.error("OpenAI library not available")
-        yield "data: AI tutoring requires the OpenAI library. Please contact support.\n\n"
+        yield _sse({"token": "AI tutoring requires the OpenAI library. Please contact support."})
     except Exception as e:
         logger.error("AI tutor error: %s", e)
-        yield f"data: I'm sorry, I'm having trouble processing your question right now. Please try again in a moment.\n\n"
+        yield _sse({"token": "I'm sorry, I'm having trouble processing your question right now. Please try again in a moment."})
 
 
-def _generate_ai_response(message: str, page_content: str, page_number: int,
-                          conversation_history: List[ChatMessage]) -> str:
+async def _generate_ai_response(message: str, page_content: str, page_number: int,
+                                conversation_history: List[ChatMessage]) -> str:
     """Generate non-streaming AI tutor response using OpenAI API."""
 
     if not should_use_ai():
         return "I'm sorry, the AI tutoring feature is currently unavailable. Please try again later."
 
     try:
-        import openai
-        client = openai.OpenAI()
-
-        # Build conversation context
-        system_prompt = f"""You are a helpful AI tutor assisting a student with their course material.
-
-The student is currently reading page {page_number} of their course material. Here's the content from around that page:
+        # Shared async client: the completion is awaited on the event loop instead of holding a worker thread
+        client = async_client()
 
----
-{page_content}
----
+        messages = _tutor_messages(message, page_content, page_number, conversation_history, _TUTOR_PROMPT_CHAT)
 
-Your role is to:
-1. Answer questions about the content clearly and helpfully
-2. Provide explanations and context when needed
-3. Suggest study strategies and tips
-4. Help the student understand complex concepts
-5. Keep responses concise but thorough (2-4 sentences usually)
-
-Always be encouraging and educational. If you're not sure about something specific to their course material, acknowledge that and focus on general principles that might help."""
-
-        messages = [{"role": "system", "content": system_prompt}]
-
-        # Add conversation history
-        for msg in conversation_history[-6:]:  # Last 6 messages for context
-            messages.append({
-                "role": msg.role,
-                "content": msg.content
-            })
-
-        # Add current message
-        messages.append({"role": "user", "content": message})
-
-        response = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        response = await client.chat.completions.create(
+            model=openai_model(),
             messages=messages,
             max_tokens=800,
             temperature=0.7
@@ -247,14 +395,9 @@ Always be encouraging and educational. If you're not sure about something specif
         return "I'm sorry, I'm having trouble processing your question right now. Please try again in a moment."
 
 
-@router.post("/{course_id}/ai-tutor", response_model=AITutorResponse)
-async def ai_tutor_chat(
-    course_id: int,
-    request: AITutorRequest,
-    current_user: User = Depends(get_current_user),
-    session: Session = Depends(get_session)
-) -> AITutorResponse:
-    """AI tutor chat endpoint that provides contextual help based on the current PDF page."""
+def _tutor_page_content(course_id: int, page_number: int, current_user: User, session: Session,
+                        background_tasks: BackgroundTasks) -> str:
+    """Check the user owns the course and return the stored text around the requested page."""
 
     # Get the course
     course = session.get(Course, course_id)
@@ -265,8 +408,29 @@ async def ai_tutor_chat(
     if course.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
 
-    # Extract relevant page content from stored PDF pages
-    page_content = _extract_page_content_from_pdf(course_id, request.page_number, session)
+    # Extract relevant page content from stored PDF pages, and once the response is sent warm the
+    # next page, which is where students usually ask next
+    page_content = _extract_page_content_from_pdf(course, page_number, session)
+    background_tasks.add_task(
+        _prefetch_page_context, course.id, course.created_at, course.num_pages, page_number + 1, session.get_bind()
+    )
+    return page_content
+
+
+@router.post("/{course_id}/ai-tutor", response_model=AITutorResponse)
+async def ai_tutor_chat(
+    course_id: int,
+    request: AITutorRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    session: Session = Depends(get_session)
+) -> AITutorResponse:
+    """AI tutor chat endpoint that provides contextual help based on the current PDF page."""
+
+    # Blocking SQLite reads stay off the event loop; only the OpenAI call is awaited here
+    page_content = await run_in_threadpool(
+        _tutor_page_content, course_id, request.page_number, current_user, session, background_tasks
+    )
 
     logger.info(
         "AI tutor request: user_id=%s, course_id=%s, page=%s, message_length=%s",
@@ -274,7 +438,7 @@ async def ai_tutor_chat(
     )
 
     # Generate AI response
-    response_text = _generate_ai_response(
+    response_text = await _generate_ai_response(
         message=request.message,
         page_content=page_content,
         page_number=request.page_number,
@@ -285,25 +449,17 @@ async def ai_tutor_chat(
 
 
 @router.post("/{course_id}/ai-tutor/stream")
-async def ai_tutor_chat_stream(
+def ai_tutor_chat_stream(
     course_id: int,
     request: AITutorRequest,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session)
 ):
     """AI tutor streaming chat endpoint that provides contextual help based on the current PDF page."""
 
-    # Get the course
-    course = session.get(Course, course_id)
-    if not course:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
-
-    # Verify user owns the course
-    if course.user_id != current_user.id:
-        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied")
-
-    # Extract relevant page content from stored PDF pages
-    page_content = _extract_page_content_from_pdf(course_id, request.page_number, session)
+    # Runs in the threadpool (sync def); the async generator below is then driven by the event loop
+    page_content = _tutor_page_content(course_id, request.page_number, current_user, session, background_tasks)
 
     logger.info(
         "AI tutor stream request: user_id=%s, course_id=%s, page=%s, message_length=%s",
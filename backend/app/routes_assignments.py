@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, insert, select
 
 from .auth import get_current_user
 from .db import get_session
@@ -13,6 +13,7 @@ from .models import (
     Assignment,
     AssignmentDetailRead,
     AssignmentQuestion,
+    AssignmentQuestionRead,
     AssignmentRead,
     AssignmentSubmission,
     AssignmentSubmissionRead,
@@ -38,25 +39,23 @@ def generate_assignment(
     if not items:
         raise HTTPException(status_code=400, detail="Course has no syllabus items")
 
-    assn = Assignment(course_id=course_id)
-    session.add(assn)
-    session.commit()
-    session.refresh(assn)
-
-    # Generate prompts (AI if enabled)
+    # Generate prompts (AI if enabled) before writing anything, so no transaction spans the AI call
     use_ai = should_use_ai()
     titles = [it.title for it in items]
     questions = generate_assignments_from_titles(titles, max_q=3, use_ai=use_ai)
-    for idx, q in enumerate(questions):
-        session.add(AssignmentQuestion(
-            assignment_id=assn.id,
-            order_index=idx,
-            prompt=q["prompt"],
-            expected_keyword=q["expected_keyword"],
-        ))
+
+    # Assignment and its questions go in one transaction; flush only to get the assignment id
+    assn = Assignment(course_id=course_id, num_questions=len(questions))
+    session.add(assn)
+    session.flush()
+    if questions:
+        session.execute(insert(AssignmentQuestion), [
+            {"assignment_id": assn.id, "order_index": idx, "prompt": q["prompt"], "expected_keyword": q["expected_keyword"]}
+            for idx, q in enumerate(questions)
+        ])
     session.commit()
 
-    return AssignmentRead(id=assn.id, course_id=assn.course_id, created_at=assn.created_at, num_questions=min(3, len(items)))
+    return AssignmentRead(id=assn.id, course_id=assn.course_id, created_at=assn.created_at, num_questions=assn.num_questions)
 
 
 @router.get("/{course_id}/assignments", response_model=List[AssignmentRead])
@@ -64,12 +63,13 @@ def list_assignments(course_id: int, current_user: User = Depends(get_current_us
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
-    assns = session.exec(select(Assignment).where(Assignment.course_id == course_id).order_by(Assignment.created_at.desc())).all()
-    out: List[AssignmentRead] = []
-    for a in assns:
-        num = len(session.exec(select(AssignmentQuestion).where(AssignmentQuestion.assignment_id == a.id)).all())
-        out.append(AssignmentRead(id=a.id, course_id=a.course_id, created_at=a.created_at, num_questions=num))
-    return out
+    # Plain column tuples: no ORM identity-map/instance work for rows that are only copied out
+    rows = session.exec(
+        select(Assignment.id, Assignment.course_id, Assignment.created_at, Assignment.num_questions)
+        .where(Assignment.course_id == course_id)
+        .order_by(Assignment.created_at.desc())
+    ).all()
+    return [AssignmentRead(id=aid, course_id=cid, created_at=created_at, num_questions=num) for aid, cid, created_at, num in rows]
 
 
 @router.get("/assignments/{assignment_id}", response_model=AssignmentDetailRead)
@@ -81,7 +81,7 @@ def get_assignment(assignment_id: int, current_user: User = Depends(get_current_
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Assignment not found")
     qs = session.exec(select(AssignmentQuestion).where(AssignmentQuestion.assignment_id == a.id).order_by(AssignmentQuestion.order_index)).all()
-    questions = [{"id": q.id, "order_index": q.order_index, "prompt": q.prompt} for q in qs]
+    questions = [AssignmentQuestionRead(id=q.id, order_index=q.order_index, prompt=q.prompt) for q in qs]
     return AssignmentDetailRead(id=a.id, course_id=a.course_id, created_at=a.created_at, questions=questions)
 
 
@@ -94,19 +94,22 @@ def submit_assignment(assignment_id: int, answers: List[str], current_user: User
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
-    qs = session.exec(select(AssignmentQuestion).where(AssignmentQuestion.assignment_id == a.id).order_by(AssignmentQuestion.order_index)).all()
-    if len(answers) != len(qs):
+    # Grading only needs the keywords (stored lowercased), not the full question rows
+    keywords = session.exec(
+        select(AssignmentQuestion.expected_keyword)
+        .where(AssignmentQuestion.assignment_id == a.id)
+        .order_by(AssignmentQuestion.order_index)
+    ).all()
+    if len(answers) != len(keywords):
         raise HTTPException(status_code=400, detail="Invalid number of answers")
 
-    score = 0
-    for idx, q in enumerate(qs):
-        if q.expected_keyword and (q.expected_keyword in (answers[idx] or "").lower()):
-            score += 1
+    # Each answer is matched against its own question's keyword only, one scan per answer
+    score = sum(1 for kw, answer in zip(keywords, answers) if kw and kw in (answer or "").lower())
 
-    sub = AssignmentSubmission(assignment_id=a.id, user_id=current_user.id, score=score, total=len(qs))
+    sub = AssignmentSubmission(assignment_id=a.id, user_id=current_user.id, score=score, total=len(keywords))
     session.add(sub)
     session.commit()
-    return {"score": score, "total": len(qs)}
+    return {"score": score, "total": len(keywords)}
 
 
 @router.get("/assignments/{assignment_id}/submissions", response_model=List[AssignmentSubmissionRead])
@@ -121,5 +124,9 @@ def list_assignment_submissions(
     course = session.get(Course, a.course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Assignment not found")
-    subs = session.exec(select(AssignmentSubmission).where(AssignmentSubmission.assignment_id == a.id).order_by(AssignmentSubmission.created_at.desc())).all()
-    return [AssignmentSubmissionRead(id=s.id, created_at=s.created_at, score=s.score, total=s.total) for s in subs]
+    rows = session.exec(
+        select(AssignmentSubmission.id, AssignmentSubmission.created_at, AssignmentSubmission.score, AssignmentSubmission.total)
+        .where(AssignmentSubmission.assignment_id == a.id)
+        .order_by(AssignmentSubmission.created_at.desc())
+    ).all()
+    return [AssignmentSubmissionRead(id=sid, created_at=created_at, score=score, total=total) for sid, created_at, score, total in rows]
@@ -1,9 +1,17 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
-
-from .auth import create_access_token, hash_password, verify_password, get_current_user
+from starlette.concurrency import run_in_threadpool
+
+from .auth import (
+    create_access_token,
+    dummy_verify_password_async,
+    get_current_user,
+    hash_password_async,
+    verify_password_async,
+)
 from .db import get_session
 from .models import User, UserCreate, UserRead
 
@@ -11,22 +19,25 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/register", response_model=UserRead, status_code=status.HTTP_201_CREATED)
-def register(payload: UserCreate, session: Session = Depends(get_session)) -> UserRead:
-    # Check if email exists
-    existing = session.exec(select(User).where(User.email == payload.email)).first()
-    if existing:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
-    user = User(email=payload.email, password_hash=hash_password(payload.password))
+async def register(payload: UserCreate, session: Session = Depends(get_session)) -> UserRead:
+    # bcrypt runs in the worker processes and the DB calls in the threadpool, off the event loop
+    user = User(email=payload.email, password_hash=await hash_password_async(payload.password))
     session.add(user)
-    session.commit()
-    session.refresh(user)
+    try:
+        await run_in_threadpool(session.commit)
+    except IntegrityError:
+        # The unique index on user.email rejects duplicates atomically (no check-then-insert race)
+        await run_in_threadpool(session.rollback)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered")
     return user
 
 
 @router.post("/login")
-def login(payload: UserCreate, session: Session = Depends(get_session)) -> dict:
-    user = session.exec(select(User).where(User.email == payload.email)).first()
-    if not user or not verify_password(payload.password, user.password_hash):
+async def login(payload: UserCreate, session: Session = Depends(get_session)) -> dict:
+    user = await run_in_threadpool(session.scalar, select(User).where(User.email == payload.email))
+    if user is None:
+        await dummy_verify_password_async()
+    if not user or not await verify_password_async(payload.password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
     token = create_access_token(subject=user.email)
     return {"access_token": token, "token_type": "bearer"}
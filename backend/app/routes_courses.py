@@ -1,14 +1,18 @@
 from __future__ import annotations
 
-from typing import List
+from functools import partial
+from typing import Any, Callable, List
 
-from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile, status
+import anyio
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Form, HTTPException, Request, Response, UploadFile, status
 import os
-from sqlmodel import Session, select, delete
+import shutil
+from sqlmodel import Session, select, delete, insert
+from starlette.concurrency import run_in_threadpool
 
 from .auth import get_current_user
 from .db import get_session
-from .ai import generate_syllabus, should_use_ai, summarize_section, generate_intelligent_syllabus
+from .ai import drop_page_cache, extract_pdf_page_texts, generate_syllabus, should_use_ai, generate_intelligent_syllabus
 import logging
 
 logger = logging.getLogger("summit.courses")
@@ -16,6 +20,7 @@ from .models import (
     Course,
     CourseRead,
     CourseReadWithSyllabus,
+    CourseStatus,
     Reading,
     ReadingRead,
     ReadingProgress,
@@ -31,48 +36,52 @@ from .models import (
     ScheduleItem,
     SyllabusCompletion,
     PDFPage,
+    Flashcard,
+    FlashcardItem,
 )
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
+_PDF_CACHE_CONTROL = "private, max-age=3600"
 
-def _extract_text_from_upload(file: UploadFile) -> str:
-    # Support text/plain and application/pdf; fallback to utf-8 decode
-    data = file.file.read()
-    if file.content_type == "application/pdf" or (file.filename and file.filename.lower().endswith(".pdf")):
-        try:
-            import fitz  # PyMuPDF
 
-            text_parts: list[str] = []
-            with fitz.open(stream=data, filetype="pdf") as doc:  # type: ignore[arg-type]
-                for page in doc:
-                    text_parts.append(page.get_text())
-            return "\n".join(text_parts)
-        except Exception:
-            # fall back to bytes decode
-            return data.decode("utf-8", errors="ignore")
-    if file.content_type == "text/plain":
-        return data.decode("utf-8", errors="ignore")
-    return data.decode("utf-8", errors="ignore")
+def _etag_matches(etag: str, if_none_match: str | None) -> bool:
+    """If-None-Match check (RFC 9110): a comma-separated tag list or "*", compared weakly."""
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag.removeprefix("W/") in tags
 
 
-def _naive_syllabus_from_text(text: str, max_items: int = 8) -> list[tuple[str, str]]:
-    # Split by lines, choose non-empty lines as potential titles
-    lines = [line.strip() for line in text.splitlines() if line.strip()]
-    if not lines:
-        return [("Introduction", "Overview of provided material.")]
-    items: list[tuple[str, str]] = []
-    step = max(1, len(lines) // max_items)
-    for idx, i in enumerate(range(0, len(lines), step)):
-        if idx >= max_items:
-            break
-        title = lines[i][:80]
-        # Summary is next few lines joined
-        summary = " ".join(lines[i + 1 : i + 1 + 3])[:200] or "Summary for this section."
-        items.append((title or f"Module {idx+1}", summary))
-    return items
+# Live (status, message, percent) of courses being built by this process. Quick intermediate steps
+# are only recorded here and reach the course row with the next phase commit; /status reads this
+# first. The dict is per process (the Dockerfile runs a single uvicorn worker); with several
+# workers, /status elsewhere reads the row, which is committed before the long AI step.
+_COURSE_PROGRESS: dict[int, tuple[str, str, int]] = {}
+
+# Steps whose status is committed right away: the terminal states, and the AI step because it
+# can run for minutes and every worker's /status should show it
+_COMMITTED_STATUSES = (CourseStatus.ai_processing, CourseStatus.complete, CourseStatus.error)
+
+
+def _insert_syllabus_items(session: Session, course_id: int, items: list[tuple[str, str]]) -> list[SyllabusItem]:
+    """Insert (title, summary) pairs in one batch and return the rows with their ids."""
+    if not items:
+        return []
+    created = session.scalars(
+        insert(SyllabusItem).returning(SyllabusItem, sort_by_parameter_order=True),
+        [
+            {"course_id": course_id, "order_index": idx, "title": title, "summary": summary}
+            for idx, (title, summary) in enumerate(items)
+        ],
+    ).all()
+    session.commit()
+    return list(created)
 
 
+def _extract_text_from_upload(file: UploadFile) -> str:
+    # Non-PDF uploads (text/plain or anything else): utf-8 decode
+    return file.file.read().decode("utf-8", errors="ignore")
 
 
 @router.get("/", response_model=List[CourseRead])
@@ -87,72 +96,127 @@ def get_course_status(course_id: int, current_user: User = Depends(get_current_u
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
 
+    live = _COURSE_PROGRESS.get(course.id)
+    course_status, status_message, progress_percent = live or (course.status, course.status_message, course.progress_percent)
     return {
         "id": course.id,
         "title": course.title,
-        "status": course.status,
-        "status_message": course.status_message,
-        "progress_percent": course.progress_percent
+        "status": course_status,
+        "status_message": status_message,
+        "progress_percent": progress_percent
     }
 
 
-@router.post("/upload", status_code=status.HTTP_201_CREATED)
+@router.post("/upload", status_code=status.HTTP_202_ACCEPTED)
 async def upload_course(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     title: str = Form(...),
     topics: str | None = Form(None),
     current_user: User = Depends(get_current_user),
     session: Session = Depends(get_session),
 ) -> CourseReadWithSyllabus:
-    # Extract text from upload
-    raw_text = _extract_text_from_upload(file)
-    if not raw_text.strip():
-        # allow pdf-only uploads
-        if not (file.content_type == "application/pdf" or (file.filename and file.filename.lower().endswith(".pdf"))):
-            raise HTTPException(status_code=400, detail="Empty or unreadable file")
-
     # Handle PDF storage if applicable
     pdf_path = None
-    num_pages = None
+    raw_text = ""
     if file.content_type == "application/pdf" or (file.filename and file.filename.lower().endswith(".pdf")):
         storage_dir = os.getenv("PDF_STORAGE_DIR", "./storage/pdfs")
         os.makedirs(storage_dir, exist_ok=True)
         safe_name = f"u{current_user.id}_{title.replace(' ', '_')}_{file.filename}"
         pdf_path = os.path.join(storage_dir, safe_name)
-        # Reset file position
-        file.file.seek(0)
-        data = file.file.read()
+        # Copied in 1 MiB chunks so the whole upload is never held in memory, off the event loop
         with open(pdf_path, "wb") as f:
-            f.write(data)
-        try:
-            import fitz  # type: ignore
-            with fitz.open(pdf_path) as doc:
-                num_pages = doc.page_count
-        except Exception:
-            num_pages = None
+            await run_in_threadpool(shutil.copyfileobj, file.file, f, 1 << 20)
+    else:
+        raw_text = await run_in_threadpool(_extract_text_from_upload, file)
+        if not raw_text.strip():
+            raise HTTPException(status_code=400, detail="Empty or unreadable file")
 
-    # Create course with initial status
+    # Create course with initial status; clients poll /{course_id}/status until it is "complete"
     course = Course(
         user_id=current_user.id,
         title=title,
         source_filename=file.filename,
         pdf_path=pdf_path,
-        num_pages=num_pages or None,
         topics=topics,
         raw_text=raw_text,
         status="uploading",
         status_message=f"Uploaded {file.filename}" if file.filename else "Uploaded file",
         progress_percent=10
     )
+    # The INSERT and commit block on SQLite, so they run in the threadpool like the file copy
+    response = await run_in_threadpool(_store_new_course, session, course)
+
+    # Page extraction and syllabus generation run after the response is sent
+    background_tasks.add_task(_process_course, course.id, session.get_bind())
+    return response
+
+
+def _store_new_course(session: Session, course: Course) -> CourseReadWithSyllabus:
+    """Insert the new course and build the upload response (server-set columns load here too)."""
     session.add(course)
     session.commit()
-    session.refresh(course)
+    return CourseReadWithSyllabus(
+        id=course.id,
+        title=course.title,
+        source_filename=course.source_filename,
+        num_pages=course.num_pages,
+        topics=course.topics,
+        created_at=course.created_at,
+        status=course.status,
+        status_message=course.status_message,
+        progress_percent=course.progress_percent,
+        syllabus=[]
+    )
+
+
+def _process_course(course_id: int, bind: Any) -> None:
+    """Background half of upload_course: page text, syllabus and readings, reported through the course status."""
+    # A sync task runs in the threadpool, so MuPDF work and DB writes stay off the event loop
+    # The request's session is closed by now; use one of our own on the same engine
+    with Session(bind, expire_on_commit=False) as session:
+        course = session.get(Course, course_id)
+        if course is None:
+            return
+
+        # Helper function to update status; see _COMMITTED_STATUSES for the steps that commit
+        def update_status(status: str, message: str, percent: int):
+            course.status = status
+            course.status_message = message
+            course.progress_percent = percent
+            session.add(course)
+            if status in _COMMITTED_STATUSES:
+                session.commit()
+            if status in (CourseStatus.complete, CourseStatus.error):
+                _COURSE_PROGRESS.pop(course.id, None)
+            else:
+                _COURSE_PROGRESS[course.id] = (status, message, percent)
+
+        try:
+            _build_course(course, session, update_status)
+        except Exception:
+            logger.exception("Course processing failed for course %d", course_id)
+            session.rollback()
+            update_status("error", "Course processing failed; please try uploading again", course.progress_percent)
+        finally:
+            _COURSE_PROGRESS.pop(course_id, None)
 
-    # Helper function to update status
-    def update_status(status: str, message: str, percent: int):
-        course.status = status
-        course.status_message = message
-        course.progress_percent = percent
+
+def _build_course(course: Course, session: Session, update_status: Callable[[str, str, int], None]) -> None:
+    pdf_path = course.pdf_path
+    num_pages = None
+    page_texts: list[str] = []
+    if pdf_path:
+        try:
+            # Each page is read once (in parallel for large books) for both raw_text and PDFPage rows
+            page_texts = extract_pdf_page_texts(pdf_path)
+            num_pages = len(page_texts)
+            course.raw_text = "\n".join(page_texts)
+        except Exception:
+            # fall back to bytes decode; pdf-only uploads are allowed even if this is empty
+            with open(pdf_path, "rb") as f:
+                course.raw_text = f.read().decode("utf-8", errors="ignore")
+        course.num_pages = num_pages or None
         session.add(course)
         session.commit()
 
@@ -160,28 +224,28 @@ async def upload_course(
     if pdf_path and num_pages:
         update_status("extracting_pages", f"Extracting content from {num_pages} pages", 20)
         try:
-            import fitz  # type: ignore
-            with fitz.open(pdf_path) as doc:
-                for page_num in range(doc.page_count):
-                    page_content = doc[page_num].get_text()
-                    pdf_page = PDFPage(
-                        course_id=course.id,
-                        page_number=page_num + 1,  # 1-indexed for user convenience
-                        content=page_content
-                    )
-                    session.add(pdf_page)
-                session.commit()
-                logger.info("Extracted and stored %d PDF pages for course %d", doc.page_count, course.id)
+            page_rows = [
+                {
+                    "course_id": course.id,
+                    "page_number": page_num,  # 1-indexed for user convenience
+                    "content": content,
+                }
+                for page_num, content in enumerate(page_texts, 1)
+            ]
+            # One executemany INSERT instead of flushing an ORM object per page
+            session.execute(insert(PDFPage), page_rows)
+            session.commit()
+            logger.info("Extracted and stored %d PDF pages for course %d", len(page_rows), course.id)
         except Exception as e:
+            session.rollback()
             logger.warning("Failed to extract PDF pages: %s", e, exc_info=True)
 
     # Build syllabus using NEW intelligent AI-driven approach
     use_ai = should_use_ai()
     logger.info(
-        "upload_course: user_id=%s, title=%r, content_type=%r, pdf_path=%r, num_pages=%r, use_ai=%s",
-        current_user.id,
-        title,
-        file.content_type,
+        "upload_course: user_id=%s, title=%r, pdf_path=%r, num_pages=%r, use_ai=%s",
+        course.user_id,
+        course.title,
         pdf_path,
         num_pages,
         use_ai,
@@ -198,7 +262,7 @@ async def upload_course(
         debug_log_dir = os.getenv("DEBUG_LOG_DIR", "./storage/syllabus_logs")
         os.makedirs(debug_log_dir, exist_ok=True)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        safe_title = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in title)[:50]
+        safe_title = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in course.title)[:50]
         debug_log_path = os.path.join(debug_log_dir, f"{timestamp}_{safe_title}.log")
 
         update_status("extracting_headers", "Analyzing document structure", 40)
@@ -206,90 +270,61 @@ async def upload_course(
         update_status("ai_processing", "Generating syllabus with AI", 50)
 
         # Returns list of dicts with: {title, summary, start_page, end_page}
-        syllabus_data = await generate_intelligent_syllabus(pdf_path, num_pages, use_ai=use_ai, debug_log_path=debug_log_path)
+        # The async pipeline runs on the event loop (its MuPDF steps in worker threads) while this thread waits
+        syllabus_data = anyio.from_thread.run(
+            partial(generate_intelligent_syllabus, pdf_path, num_pages, use_ai=use_ai, debug_log_path=debug_log_path)
+        )
 
         logger.info(f"Syllabus generation debug log saved to: {debug_log_path}")
 
-        created_items: list[SyllabusItem] = []
-        readings_created: list[Reading] = []
-
-        for idx, item_data in enumerate(syllabus_data):
-            # Create syllabus item
-            si = SyllabusItem(
-                course_id=course.id,
-                order_index=idx,
-                title=item_data["title"],
-                summary=item_data["summary"]
-            )
-            session.add(si)
-            created_items.append(si)
-
-        session.commit()  # Commit to get syllabus item IDs
+        created_items = _insert_syllabus_items(
+            session,
+            course.id,
+            [(item_data["title"], item_data["summary"]) for item_data in syllabus_data],
+        )
 
         update_status("creating_readings", f"Creating {len(syllabus_data)} reading sections", 80)
 
         # Now create readings with the page ranges from AI
-        for idx, item_data in enumerate(syllabus_data):
-            si = created_items[idx]
-            r = Reading(
-                course_id=course.id,
-                syllabus_item_id=si.id,
-                order_index=si.order_index,
-                title=si.title,
-                start_page=item_data["start_page"],
-                end_page=item_data["end_page"]
-            )
-            session.add(r)
-            readings_created.append(r)
-
-        session.commit()
+        if created_items:
+            session.execute(insert(Reading), [
+                {
+                    "course_id": course.id,
+                    "syllabus_item_id": si.id,
+                    "order_index": si.order_index,
+                    "title": si.title,
+                    "start_page": item_data["start_page"],
+                    "end_page": item_data["end_page"],
+                }
+                for si, item_data in zip(created_items, syllabus_data)
+            ])
+            session.commit()
 
         update_status("complete", f"Course ready with {len(created_items)} chapters", 100)
 
     # For text files, use old text-based generation (fallback)
     else:
         update_status("ai_processing", "Generating syllabus from text", 50)
-        logger.info("upload_course: generating syllabus from text (len=%d), use_ai=%s", len(raw_text), use_ai)
-        items = generate_syllabus(raw_text, max_items=12, use_ai=use_ai, topics=topics or None)
-        created_items: list[SyllabusItem] = []
-        for idx, (it_title, it_summary) in enumerate(items):
-            si = SyllabusItem(course_id=course.id, order_index=idx, title=it_title, summary=it_summary)
-            session.add(si)
-            created_items.append(si)
-        session.commit()
+        logger.info("upload_course: generating syllabus from text (len=%d), use_ai=%s", len(course.raw_text), use_ai)
+        items = generate_syllabus(course.raw_text, max_items=12, use_ai=use_ai, topics=course.topics or None)
+        created_items = _insert_syllabus_items(session, course.id, items)
 
         update_status("creating_readings", f"Creating {len(items)} reading sections", 80)
 
         # Simple equal page split for text files
-        readings_created: list[Reading] = []
         if num_pages and num_pages > 0 and created_items:
             pages_per = max(1, num_pages // max(1, len(created_items)))
             start = 1
+            reading_rows = []
             for idx, si in enumerate(created_items):
                 end = num_pages if idx == len(created_items) - 1 else min(num_pages, start + pages_per - 1)
-                r = Reading(course_id=course.id, syllabus_item_id=si.id, order_index=si.order_index, title=si.title, start_page=start, end_page=end)
-                session.add(r)
-                readings_created.append(r)
+                reading_rows.append({"course_id": course.id, "syllabus_item_id": si.id, "order_index": si.order_index, "title": si.title, "start_page": start, "end_page": end})
                 start = end + 1
+            session.execute(insert(Reading), reading_rows)
             session.commit()
 
         update_status("complete", f"Course ready with {len(created_items)} chapters", 100)
 
-    # Read back with ids
-    data = [SyllabusItemRead(id=it.id, order_index=it.order_index, title=it.title, summary=it.summary) for it in created_items]
-    return CourseReadWithSyllabus(
-        id=course.id,
-        title=course.title,
-        source_filename=course.source_filename,
-        num_pages=course.num_pages,
-        topics=course.topics,
-        created_at=course.created_at,
-        status=course.status,
-        status_message=course.status_message,
-        progress_percent=course.progress_percent,
-        syllabus=data
-    )
-
 
 @router.get("/{course_id}/readings", response_model=list[ReadingRead])
 def list_readings(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> list[ReadingRead]:
@@ -301,14 +336,22 @@ def list_readings(course_id: int, current_user: User = Depends(get_current_user)
 
 
 @router.get("/{course_id}/pdf")
-def get_pdf(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)):
+def get_pdf(course_id: int, request: Request, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)):
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id or not course.pdf_path:
         raise HTTPException(status_code=404, detail="PDF not found")
     from fastapi.responses import FileResponse
+    try:
+        stat_result = os.stat(course.pdf_path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="PDF not found")
+    # Uploaded PDFs never change: viewers keep their copy for an hour, then revalidate by ETag
+    headers = {"Cache-Control": _PDF_CACHE_CONTROL}
     # Serve inline so browsers can render in-embed viewers instead of force download
-    resp = FileResponse(course.pdf_path, media_type="application/pdf")
+    resp = FileResponse(course.pdf_path, media_type="application/pdf", headers=headers, stat_result=stat_result)
     resp.headers["Content-Disposition"] = f"inline; filename=\"{os.path.basename(course.pdf_path)}\""
+    if _etag_matches(resp.headers["etag"], request.headers.get("if-none-match")):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": resp.headers["etag"], **headers})
     return resp
 
 
@@ -353,7 +396,7 @@ def set_reading_progress(reading_id: int, payload: dict, current_user: User = De
 
 
 @router.get("/{course_id}", response_model=CourseReadWithSyllabus)
-async def get_course(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> CourseReadWithSyllabus:
+def get_course(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> CourseReadWithSyllabus:
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -374,7 +417,7 @@ async def get_course(course_id: int, current_user: User = Depends(get_current_us
 
 
 @router.put("/{course_id}", response_model=CourseRead)
-async def update_course(course_id: int, payload: dict, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> CourseRead:
+def update_course(course_id: int, payload: dict, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> CourseRead:
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
@@ -384,7 +427,6 @@ async def update_course(course_id: int, payload: dict, current_user: User = Depe
         course.title = payload["title"]
         session.add(course)
         session.commit()
-        session.refresh(course)
 
     return CourseRead(
         id=course.id,
@@ -400,37 +442,40 @@ async def update_course(course_id: int, payload: dict, current_user: User = Depe
 
 
 @router.delete("/{course_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_course(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> None:
+def delete_course(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> None:
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
 
-    # Delete dependent rows (no FKs with cascade configured in MVP)
+    # Delete dependent rows (no FKs with cascade configured in MVP). Grandchildren are matched
+    # with IN (SELECT ...) subqueries, so no ids are fetched into Python; one commit at the end
     session.exec(delete(SyllabusCompletion).where(SyllabusCompletion.course_id == course_id))
     session.exec(delete(ScheduleItem).where(ScheduleItem.course_id == course_id))
 
     # Delete readings and reading progress
-    reading_ids = [rid for rid in session.exec(select(Reading.id).where(Reading.course_id == course_id)).all()]
-    if reading_ids:
-        session.exec(delete(ReadingProgress).where(ReadingProgress.reading_id.in_(reading_ids)))
+    reading_ids = select(Reading.id).where(Reading.course_id == course_id)
+    session.exec(delete(ReadingProgress).where(ReadingProgress.reading_id.in_(reading_ids)))
     session.exec(delete(Reading).where(Reading.course_id == course_id))
 
     # Delete PDF pages
     session.exec(delete(PDFPage).where(PDFPage.course_id == course_id))
 
     # Quizzes and related
-    quiz_ids = [qid for qid in session.exec(select(Quiz.id).where(Quiz.course_id == course_id)).all()]
-    if quiz_ids:
-        session.exec(delete(QuizSubmission).where(QuizSubmission.quiz_id.in_(quiz_ids)))
-        session.exec(delete(QuizQuestion).where(QuizQuestion.quiz_id.in_(quiz_ids)))
-        session.exec(delete(Quiz).where(Quiz.id.in_(quiz_ids)))
+    quiz_ids = select(Quiz.id).where(Quiz.course_id == course_id)
+    session.exec(delete(QuizSubmission).where(QuizSubmission.quiz_id.in_(quiz_ids)))
+    session.exec(delete(QuizQuestion).where(QuizQuestion.quiz_id.in_(quiz_ids)))
+    session.exec(delete(Quiz).where(Quiz.course_id == course_id))
 
     # Assignments and related
-    assn_ids = [aid for aid in session.exec(select(Assignment.id).where(Assignment.course_id == course_id)).all()]
-    if assn_ids:
-        session.exec(delete(AssignmentSubmission).where(AssignmentSubmission.assignment_id.in_(assn_ids)))
-        session.exec(delete(AssignmentQuestion).where(AssignmentQuestion.assignment_id.in_(assn_ids)))
-        session.exec(delete(Assignment).where(Assignment.id.in_(assn_ids)))
+    assn_ids = select(Assignment.id).where(Assignment.course_id == course_id)
+    session.exec(delete(AssignmentSubmission).where(AssignmentSubmission.assignment_id.in_(assn_ids)))
+    session.exec(delete(AssignmentQuestion).where(AssignmentQuestion.assignment_id.in_(assn_ids)))
+    session.exec(delete(Assignment).where(Assignment.course_id == course_id))
+
+    # Flashcard sets and their cards
+    flashcard_ids = select(Flashcard.id).where(Flashcard.course_id == course_id)
+    session.exec(delete(FlashcardItem).where(FlashcardItem.flashcard_id.in_(flashcard_ids)))
+    session.exec(delete(Flashcard).where(Flashcard.course_id == course_id))
 
     # Syllabus items
     session.exec(delete(SyllabusItem).where(SyllabusItem.course_id == course_id))
@@ -438,4 +483,8 @@ async def delete_course(course_id: int, current_user: User = Depends(get_current
     # Finally the course
     session.exec(delete(Course).where(Course.id == course_id))
     session.commit()
+
+    # The parsed-page cache for the upload would otherwise stay on disk indefinitely
+    if course.pdf_path:
+        drop_page_cache(course.pdf_path)
     return None
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
+from sqlmodel import Session, delete, insert, select
 from pydantic import BaseModel
 
 from .auth import get_current_user
@@ -77,11 +77,6 @@ def generate_flashcard_set(
         if not target_item:
             raise HTTPException(status_code=400, detail="All syllabus items already have flashcard sets")
 
-    flashcard = Flashcard(course_id=course_id, syllabus_item_id=target_item.id)
-    session.add(flashcard)
-    session.commit()
-    session.refresh(flashcard)
-
     # Get PDF content for this syllabus item's pages if available
     section_content = ""
     if course.pdf_path:
@@ -105,8 +100,8 @@ def generate_flashcard_set(
             end_page = min((item_index + 1) * pages_per_item, course.num_pages or start_page + 10)
 
         # Get PDF page content from database
-        pdf_pages = session.exec(
-            select(PDFPage)
+        page_texts = session.exec(
+            select(PDFPage.content)
             .where(
                 PDFPage.course_id == course_id,
                 PDFPage.page_number >= start_page,
@@ -115,8 +110,8 @@ def generate_flashcard_set(
             .order_by(PDFPage.page_number)
         ).all()
 
-        if pdf_pages:
-            section_content = "\n\n".join(page.content for page in pdf_pages)
+        if page_texts:
+            section_content = "\n\n".join(page_texts)
         else:
             # Fallback to reading PDF directly if pages not in DB
             try:
@@ -147,20 +142,21 @@ def generate_flashcard_set(
             use_ai=use_ai
         )
 
-    num_cards = len(cards)
-    for idx, card in enumerate(cards):
-        front = card["front"]
-        back = card["back"]
-        card_type = card.get("card_type", "qa")
-
-        fc = FlashcardItem(
-            flashcard_id=flashcard.id,
-            order_index=idx,
-            front=front,
-            back=back,
-            card_type=card_type,
-        )
-        session.add(fc)
+    # The set and its cards are written together once generation succeeds, count included
+    flashcard = Flashcard(course_id=course_id, syllabus_item_id=target_item.id, num_cards=len(cards))
+    session.add(flashcard)
+    session.flush()
+    if cards:
+        session.execute(insert(FlashcardItem), [
+            {
+                "flashcard_id": flashcard.id,
+                "order_index": idx,
+                "front": card["front"],
+                "back": card["back"],
+                "card_type": card.get("card_type", "qa"),
+            }
+            for idx, card in enumerate(cards)
+        ])
     session.commit()
 
     return FlashcardRead(
@@ -169,7 +165,7 @@ def generate_flashcard_set(
         syllabus_item_id=target_item.id,
         syllabus_item_title=target_item.title,
         created_at=flashcard.created_at,
-        num_cards=num_cards
+        num_cards=flashcard.num_cards
     )
 
 
@@ -187,24 +183,22 @@ def list_flashcards(
         select(Flashcard).where(Flashcard.course_id == course_id).order_by(Flashcard.created_at.desc())
     ).all()
 
-    reads: List[FlashcardRead] = []
-    for fc in flashcards:
-        card_count = len(session.exec(select(FlashcardItem).where(FlashcardItem.flashcard_id == fc.id)).all())
-        syllabus_item = None
-        syllabus_item_title = None
-        if fc.syllabus_item_id:
-            syllabus_item = session.get(SyllabusItem, fc.syllabus_item_id)
-            if syllabus_item:
-                syllabus_item_title = syllabus_item.title
-        reads.append(FlashcardRead(
+    # Card counts are stored on the set; syllabus titles come from one IN query
+    titles = dict(session.exec(
+        select(SyllabusItem.id, SyllabusItem.title)
+        .where(SyllabusItem.id.in_({fc.syllabus_item_id for fc in flashcards if fc.syllabus_item_id}))
+    ).all())
+    return [
+        FlashcardRead(
             id=fc.id,
             course_id=fc.course_id,
             syllabus_item_id=fc.syllabus_item_id,
-            syllabus_item_title=syllabus_item_title,
+            syllabus_item_title=titles.get(fc.syllabus_item_id),
             created_at=fc.created_at,
-            num_cards=card_count
-        ))
-    return reads
+            num_cards=fc.num_cards
+        )
+        for fc in flashcards
+    ]
 
 
 @router.get("/flashcards/{flashcard_id}", response_model=FlashcardDetailRead)
@@ -266,13 +260,9 @@ def delete_flashcard_set(
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Flashcard set not found")
 
-    # Delete all flashcard items first
-    cards = session.exec(select(FlashcardItem).where(FlashcardItem.flashcard_id == flashcard.id)).all()
-    for card in cards:
-        session.delete(card)
-
-    # Delete the flashcard set
-    session.delete(flashcard)
+    # Bulk DELETEs: the cards are never loaded, one statement however many there are
+    session.exec(delete(FlashcardItem).where(FlashcardItem.flashcard_id == flashcard.id))
+    session.exec(delete(Flashcard).where(Flashcard.id == flashcard.id))
     session.commit()
 
     return None
@@ -30,7 +30,6 @@ def get_profile(current_user: User = Depends(get_current_user), session: Session
         prof = UserProfile(user_id=current_user.id)
         session.add(prof)
         session.commit()
-        session.refresh(prof)
     return UserProfileRead(weekly_hours=prof.weekly_hours, duration_weeks=prof.duration_weeks, depth=prof.depth)
 
 
@@ -44,7 +43,6 @@ def update_profile(payload: UserProfileUpdate, current_user: User = Depends(get_
         setattr(prof, k, v)
     session.add(prof)
     session.commit()
-    session.refresh(prof)
     return UserProfileRead(weekly_hours=prof.weekly_hours, duration_weeks=prof.duration_weeks, depth=prof.depth)
 
 
@@ -66,7 +64,6 @@ def generate_schedule(course_id: int, current_user: User = Depends(get_current_u
         prof = UserProfile(user_id=current_user.id)
         session.add(prof)
         session.commit()
-        session.refresh(prof)
 
     # naive: distribute items across duration_weeks using ceiling to avoid overflow weeks
     per_week = max(1, math.ceil(len(items) / max(1, prof.duration_weeks)))
@@ -94,9 +91,11 @@ def list_schedule(course_id: int, current_user: User = Depends(get_current_user)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
     sched = session.exec(select(ScheduleItem).where(ScheduleItem.course_id == course_id).order_by(ScheduleItem.week_index, ScheduleItem.id)).all()
-    reads: list[ScheduleItemRead] = []
-    for si in sched:
-        it = session.get(SyllabusItem, si.syllabus_item_id)
-        title = it.title if it else "Lesson"
-        reads.append(ScheduleItemRead(syllabus_item_id=si.syllabus_item_id, title=title, week_index=si.week_index, due_date=si.due_date))
-    return reads
+    # Titles for all scheduled items in one query instead of one lookup per row
+    titles = dict(session.exec(
+        select(SyllabusItem.id, SyllabusItem.title).where(SyllabusItem.id.in_({si.syllabus_item_id for si in sched}))
+    ).all())
+    return [
+        ScheduleItemRead(syllabus_item_id=si.syllabus_item_id, title=titles.get(si.syllabus_item_id, "Lesson"), week_index=si.week_index, due_date=si.due_date)
+        for si in sched
+    ]
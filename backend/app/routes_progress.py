@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select, delete
+from sqlmodel import Session, delete, func, select
 
 from .auth import get_current_user
 from .db import get_session
@@ -12,20 +12,25 @@ from .models import Course, ProgressSummaryRead, SyllabusCompletion, SyllabusIte
 router = APIRouter(prefix="/courses", tags=["progress"])
 
 
+def _progress_summary(session: Session, course_id: int, user_id: int) -> ProgressSummaryRead:
+    # One round trip: the item count as a scalar subquery next to the user's completions,
+    # aggregated over the (course_id, user_id) index
+    total_items = select(func.count()).select_from(SyllabusItem).where(SyllabusItem.course_id == course_id).scalar_subquery()
+    total, completed = session.exec(
+        select(total_items, func.group_concat(SyllabusCompletion.syllabus_item_id)).where(
+            (SyllabusCompletion.course_id == course_id) & (SyllabusCompletion.user_id == user_id)
+        )
+    ).one()
+    completed_ids = [int(item_id) for item_id in completed.split(",")] if completed else []
+    return ProgressSummaryRead(total_items=total, completed_count=len(completed_ids), completed_item_ids=completed_ids)
+
+
 @router.get("/{course_id}/progress", response_model=ProgressSummaryRead)
 def get_progress(course_id: int, current_user: User = Depends(get_current_user), session: Session = Depends(get_session)) -> ProgressSummaryRead:
     course = session.get(Course, course_id)
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
-    items = session.exec(select(SyllabusItem).where(SyllabusItem.course_id == course_id)).all()
-    total = len(items)
-    completed = session.exec(
-        select(SyllabusCompletion.syllabus_item_id).where(
-            (SyllabusCompletion.course_id == course_id) & (SyllabusCompletion.user_id == current_user.id)
-        )
-    ).all()
-    completed_ids = [row for row in completed]
-    return ProgressSummaryRead(total_items=total, completed_count=len(completed_ids), completed_item_ids=completed_ids)
+    return _progress_summary(session, course_id, current_user.id)
 
 
 @router.post("/{course_id}/progress/{syllabus_item_id}/toggle", response_model=ProgressSummaryRead)
@@ -59,4 +64,4 @@ def toggle_completion(
         session.add(SyllabusCompletion(user_id=current_user.id, course_id=course_id, syllabus_item_id=syllabus_item_id))
     session.commit()
 
-    return get_progress(course_id, current_user, session)
+    return _progress_summary(session, course_id, current_user.id)
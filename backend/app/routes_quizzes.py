@@ -5,14 +5,13 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
 from fastapi.responses import StreamingResponse, Response
-from sqlmodel import Session, select
+from sqlmodel import Session, insert, select
 from pydantic import BaseModel
 
 from .auth import get_current_user
 from .db import get_session
-import os
 import logging
-from .ai import generate_quiz_from_titles, generate_quiz_from_content, should_use_ai
+from .ai import generate_quiz_from_content, generate_quiz_from_titles, openai_model, parse_json, should_use_ai, sync_client
 
 logger = logging.getLogger("summit.quizzes")
 from .models import (
@@ -32,6 +31,26 @@ from .models import (
 from fpdf import FPDF
 import json
 
+def _create_quiz(session: Session, course_id: int, syllabus_item_id: Optional[int], questions: list[dict]) -> Quiz:
+    """Add a quiz with its question count and insert the questions with one executemany INSERT (caller commits)."""
+    quiz = Quiz(course_id=course_id, syllabus_item_id=syllabus_item_id, num_questions=len(questions))
+    session.add(quiz)
+    session.flush()
+    rows = []
+    for idx, q in enumerate(questions):
+        correct_index = int(q["answer_index"]) if 0 <= int(q["answer_index"]) < 4 else 0
+        rows.append({
+            "quiz_id": quiz.id,
+            "order_index": idx,
+            "prompt": q["prompt"],
+            "options": q["options"][:4],
+            "answer_index": correct_index,
+        })
+    if rows:
+        session.execute(insert(QuizQuestion), rows)
+    return quiz
+
+
 router = APIRouter(prefix="/courses", tags=["quizzes"])
 
 
@@ -99,11 +118,6 @@ def generate_quiz(
         if not target_item:
             raise HTTPException(status_code=400, detail="All syllabus items already have quizzes")
 
-    quiz = Quiz(course_id=course_id, syllabus_item_id=target_item.id)
-    session.add(quiz)
-    session.commit()
-    session.refresh(quiz)
-
     # Get PDF content for this syllabus item's pages if available
     section_content = ""
     if course.pdf_path:
@@ -127,8 +141,8 @@ def generate_quiz(
             end_page = min((item_index + 1) * pages_per_item, course.num_pages or start_page + 10)
 
         # Get PDF page content from database
-        pdf_pages = session.exec(
-            select(PDFPage)
+        page_texts = session.exec(
+            select(PDFPage.content)
             .where(
                 PDFPage.course_id == course_id,
                 PDFPage.page_number >= start_page,
@@ -137,8 +151,8 @@ def generate_quiz(
             .order_by(PDFPage.page_number)
         ).all()
 
-        if pdf_pages:
-            section_content = "\n\n".join(page.content for page in pdf_pages)
+        if page_texts:
+            section_content = "\n\n".join(page_texts)
         else:
             # Fallback to reading PDF directly if pages not in DB
             try:
@@ -164,22 +178,8 @@ def generate_quiz(
         # Fallback to title-based generation
         questions = generate_quiz_from_titles([target_item.title], num_questions=10, use_ai=use_ai)
 
-    num_questions = len(questions)
-    for idx, q in enumerate(questions):
-        prompt = q["prompt"]
-        options = q["options"]
-        correct_index = int(q["answer_index"]) if 0 <= int(q["answer_index"]) < 4 else 0
-        qq = QuizQuestion(
-            quiz_id=quiz.id,
-            order_index=idx,
-            prompt=prompt,
-            option_a=options[0],
-            option_b=options[1],
-            option_c=options[2],
-            option_d=options[3],
-            answer_index=correct_index,
-        )
-        session.add(qq)
+    # The quiz and its questions are written together once generation succeeds
+    quiz = _create_quiz(session, course_id, target_item.id, questions)
     session.commit()
 
     return QuizRead(
@@ -188,7 +188,7 @@ def generate_quiz(
         syllabus_item_id=target_item.id,
         syllabus_item_title=target_item.title,
         created_at=quiz.created_at,
-        num_questions=num_questions
+        num_questions=quiz.num_questions
     )
 
 
@@ -217,17 +217,12 @@ def generate_reading_quiz(
     else:
         titles = [reading.title]
 
-    quiz = Quiz(course_id=course.id, syllabus_item_id=reading.syllabus_item_id)
-    session.add(quiz)
-    session.commit()
-    session.refresh(quiz)
-
     # Get PDF content for the reading pages
     section_content = ""
     if course.pdf_path:
         # Get PDF page content from database
-        pdf_pages = session.exec(
-            select(PDFPage)
+        page_texts = session.exec(
+            select(PDFPage.content)
             .where(
                 PDFPage.course_id == course.id,
                 PDFPage.page_number >= reading.start_page,
@@ -236,8 +231,8 @@ def generate_reading_quiz(
             .order_by(PDFPage.page_number)
         ).all()
 
-        if pdf_pages:
-            section_content = "\n\n".join(page.content for page in pdf_pages)
+        if page_texts:
+            section_content = "\n\n".join(page_texts)
         else:
             # Fallback to reading PDF directly if pages not in DB
             try:
@@ -265,22 +260,7 @@ def generate_reading_quiz(
         # Fallback to title-based generation
         questions = generate_quiz_from_titles(titles, num_questions=10, use_ai=use_ai)
 
-    num_questions = len(questions)
-    for idx, q in enumerate(questions):
-        prompt = q["prompt"]
-        options = q["options"]
-        correct_index = int(q["answer_index"]) if 0 <= int(q["answer_index"]) < 4 else 0
-        qq = QuizQuestion(
-            quiz_id=quiz.id,
-            order_index=idx,
-            prompt=prompt,
-            option_a=options[0],
-            option_b=options[1],
-            option_c=options[2],
-            option_d=options[3],
-            answer_index=correct_index,
-        )
-        session.add(qq)
+    quiz = _create_quiz(session, course.id, reading.syllabus_item_id, questions)
     session.commit()
 
     return QuizRead(
@@ -289,7 +269,7 @@ def generate_reading_quiz(
         syllabus_item_id=reading.syllabus_item_id,
         syllabus_item_title=syllabus_item.title if syllabus_item else None,
         created_at=quiz.created_at,
-        num_questions=num_questions
+        num_questions=quiz.num_questions
     )
 
 
@@ -303,24 +283,22 @@ def list_quizzes(
     if not course or course.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="Course not found")
     quizzes = session.exec(select(Quiz).where(Quiz.course_id == course_id).order_by(Quiz.created_at.desc())).all()
-    reads: List[QuizRead] = []
-    for q in quizzes:
-        qcount = len(session.exec(select(QuizQuestion).where(QuizQuestion.quiz_id == q.id)).all())
-        syllabus_item = None
-        syllabus_item_title = None
-        if q.syllabus_item_id:
-            syllabus_item = session.get(SyllabusItem, q.syllabus_item_id)
-            if syllabus_item:
-                syllabus_item_title = syllabus_item.title
-        reads.append(QuizRead(
+    # Question counts are stored on the quiz; syllabus titles come from one IN query
+    titles = dict(session.exec(
+        select(SyllabusItem.id, SyllabusItem.title)
+        .where(SyllabusItem.id.in_({q.syllabus_item_id for q in quizzes if q.syllabus_item_id}))
+    ).all())
+    return [
+        QuizRead(
             id=q.id,
             course_id=q.course_id,
             syllabus_item_id=q.syllabus_item_id,
-            syllabus_item_title=syllabus_item_title,
+            syllabus_item_title=titles.get(q.syllabus_item_id),
             created_at=q.created_at,
-            num_questions=qcount
-        ))
-    return reads
+            num_questions=q.num_questions
+        )
+        for q in quizzes
+    ]
 
 
 @router.get("/quizzes/{quiz_id}", response_model=QuizDetailRead)
@@ -342,7 +320,7 @@ def get_quiz(
             id=qq.id,
             order_index=qq.order_index,
             prompt=qq.prompt,
-            options=[qq.option_a, qq.option_b, qq.option_c, qq.option_d],
+            options=qq.options,
         )
         for qq in qs
     ]
@@ -507,7 +485,7 @@ def download_quiz_pdf(
 
         # Answer options with proper indentation
         pdf.set_font("Arial", "", 10)
-        options = [q.option_a, q.option_b, q.option_c, q.option_d]
+        options = q.options
         option_letters = ["A", "B", "C", "D"]
 
         for letter, option in zip(option_letters, options):
@@ -576,7 +554,7 @@ def grade_quiz_upload(
             {
                 "index": i,
                 "prompt": q.prompt,
-                "options": [q.option_a, q.option_b, q.option_c, q.option_d],
+                "options": q.options,
                 "answer_index": q.answer_index,
             }
             for i, q in enumerate(qs)
@@ -584,13 +562,12 @@ def grade_quiz_upload(
     }
 
     # Use AI only if configured; otherwise naive zero-score
-    from .ai import should_use_ai
     if not should_use_ai():
         return {"score": 0, "total": len(qs), "message": "AI disabled; cannot grade upload"}
 
     try:
-        from openai import OpenAI  # type: ignore
-        client = OpenAI()
+        # Process-wide client: keeps the connection to the API warm between uploads
+        client = sync_client()
         sys = (
             "You are a strict grader. Given MCQ questions with options and the authoritative correct index, "
             "extract the student's chosen option letters (A-D) from the provided text and grade each question exactly. "
@@ -600,12 +577,12 @@ def grade_quiz_upload(
             "GRADE THESE\n\nRUBRIC (JSON):\n" + json.dumps(rubric) + "\n\nSTUDENT SUBMISSION TEXT:\n" + text[:16000]
         )
         resp = client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+            model=openai_model(),
             messages=[{"role": "system", "content": sys}, {"role": "user", "content": user}],
             temperature=0,
         )
         content = resp.choices[0].message.content or "{}"
-        data = _try_parse_json(content) or {}
+        data = parse_json(content) or {}
         answers = data.get("answers", [])
         score = int(data.get("score", 0))
         # clamp and recompute score for safety
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import os
 from pathlib import Path
 from typing import Iterator
 
 import pytest
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, raiseload
 from sqlmodel import Session, SQLModel, create_engine
 
-from app.main import app
-from app.db import get_session
+# Cheap bcrypt for tests; must be set before app.auth is imported
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from app.main import app  # noqa: E402
+from app.db import get_session  # noqa: E402
 
 
 @pytest.fixture(scope="session")
@@ -23,13 +29,34 @@ def test_engine(tmp_db_path: Path):
     return engine
 
 
+def _raise_on_lazy_load(state: ORMExecuteState) -> None:
+    # Relationships must be loaded explicitly (selectinload/joinedload); an implicit lazy
+    # load in a route is an N+1 and fails the test instead of issuing a hidden query
+    if state.is_select and not state.is_relationship_load:
+        state.statement = state.statement.options(raiseload("*"))
+
+
 @pytest.fixture()
 def client(test_engine) -> Iterator[TestClient]:
     def override_get_session() -> Iterator[Session]:
-        with Session(test_engine) as session:
+        with Session(test_engine, expire_on_commit=False) as session:
+            event.listen(session, "do_orm_execute", _raise_on_lazy_load)
             yield session
 
     app.dependency_overrides[get_session] = override_get_session
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
+
+
+@pytest.fixture()
+def sql_statements(test_engine) -> Iterator[list[str]]:
+    """SQL statements executed against the test database while the fixture is active."""
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, *_args) -> None:
+        statements.append(statement)
+
+    event.listen(test_engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(test_engine, "before_cursor_execute", record)
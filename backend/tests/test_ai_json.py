@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app import ai
+from app.ai import _equal_division_fallback, _merge_window_chapters, _parse_chapters, _try_parse_json
+
+
+def test_parse_raw_and_fenced_json() -> None:
+    assert _try_parse_json('[{"title": "A"}]') == [{"title": "A"}]
+    assert _try_parse_json('```json\n{"score": 2}\n```') == {"score": 2}
+
+
+def test_parse_json_embedded_in_prose() -> None:
+    text = 'Here you go [see below]:\n[{"title": "Sets [intro]", "summary": "a \\"quoted\\" ]"}]\nHope this helps [2].'
+    assert _try_parse_json(text) == [{"title": "Sets [intro]", "summary": 'a "quoted" ]'}]
+    assert _try_parse_json('Result: {"score": 1, "note": "}"} done') == {"score": 1, "note": "}"}
+
+
+def test_parse_json_failure_returns_none() -> None:
+    assert _try_parse_json("no json here [unbalanced") is None
+
+
+def test_merge_window_chapters_dedupes_overlap_and_sets_end_pages() -> None:
+    candidates = [
+        {"title": "Scheduling", "summary": "", "start_page": 95},
+        {"title": "Introduction", "summary": "", "start_page": 1},
+        {"title": "scheduling", "summary": "", "start_page": 96},  # repeated by the overlapping window
+        {"title": "Memory", "summary": "", "start_page": 200},
+    ]
+    merged = _merge_window_chapters(candidates, total_pages=300)
+    assert [(c["title"], c["start_page"], c["end_page"]) for c in merged] == [
+        ("Introduction", 1, 94),
+        ("Scheduling", 95, 199),
+        ("Memory", 200, 300),
+    ]
+
+
+def test_equal_division_fallback_covers_every_page() -> None:
+    sections = _equal_division_fallback(100)
+    assert len(sections) == 8
+    assert sections[0]["start_page"] == 1 and sections[-1]["end_page"] == 100
+    assert all(a["end_page"] + 1 == b["start_page"] for a, b in zip(sections, sections[1:]))
+    assert len(_equal_division_fallback(3)) == 3
+
+
+def test_parse_chapters_accepts_structured_and_sloppy_output() -> None:
+    chapter = {"title": "A", "summary": "s", "start_page": 1, "end_page": 9}
+    assert _parse_chapters('{"chapters": [{"title": "A", "summary": "s", "start_page": 1, "end_page": 9}]}') == [chapter]
+    assert _parse_chapters('```json\n[{"title": "A", "summary": "s", "start_page": 1, "end_page": 9},]\n```') == [chapter]
+    assert _parse_chapters("not json") == []
+
+
+def test_toc_structure_awaits_the_async_client(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Completions:
+        async def create(self, **kwargs):
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='["Sets", "Maps"]'))])
+
+    monkeypatch.setattr(ai, "_has_key", lambda: True)
+    monkeypatch.setattr(ai, "_async_client", lambda: SimpleNamespace(chat=SimpleNamespace(completions=_Completions())))
+    assert asyncio.run(ai.extract_toc_structure("Contents\n1 Sets\n2 Maps", use_ai=True)) == ["Sets", "Maps"]
+    assert asyncio.run(ai.extract_toc_structure("   ", use_ai=True)) == []
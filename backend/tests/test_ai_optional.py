@@ -11,7 +11,10 @@ TEST_AI = os.getenv("TEST_OPENAI") == "1"
 
 pytestmark = pytest.mark.skipif(not (HAS_KEY and TEST_AI), reason="OpenAI key not present or TEST_OPENAI!=1")
 
-from app.ai import generate_syllabus, generate_quiz_from_titles, generate_assignments_from_titles  # noqa: E402
+from app.ai import generate_syllabus, generate_quiz_from_titles, generate_assignments_from_titles, reload_env  # noqa: E402
+
+# app.ai may already be imported (via conftest) before load_dotenv ran
+reload_env()
 
 
 def test_ai_generate_syllabus() -> None:
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from app.ai import _PageCache, drop_page_cache
+
+
+def test_page_cache_reuses_stored_values(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "cache"))
+    pdf = tmp_path / "book.pdf"
+    pdf.write_bytes(b"%PDF-1.4 not really a pdf")
+
+    calls: list[int] = []
+
+    def compute() -> str:
+        calls.append(1)
+        return "page one text"
+
+    assert _PageCache(str(pdf)).get_or_compute(0, "text", compute) == "page one text"
+    assert _PageCache(str(pdf)).get_or_compute(0, "text", compute) == "page one text"
+    assert len(calls) == 1
+
+    # Different bytes -> different key
+    pdf.write_bytes(b"%PDF-1.4 another file")
+    assert _PageCache(str(pdf)).get_or_compute(0, "text", compute) == "page one text"
+    assert len(calls) == 2
+
+
+def test_drop_page_cache_removes_stored_entries(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("PDF_CACHE_DIR", str(tmp_path / "cache"))
+    pdf = tmp_path / "book.pdf"
+    pdf.write_bytes(b"%PDF-1.4 not really a pdf")
+    cache = _PageCache(str(pdf))
+    cache.get_or_compute(0, "text", lambda: "page one text")
+    assert cache.dir is not None and Path(cache.dir).is_dir()
+
+    drop_page_cache(str(pdf))
+    assert not Path(cache.dir).exists()
+    drop_page_cache(str(tmp_path / "missing.pdf"))  # nothing to hash; no error
@@ -14,7 +14,7 @@ def create_course(client: TestClient, headers: dict[str, str]) -> int:
     content = b"Intro\nPart One\nPart Two\nPart Three\n"
     files = {"file": ("c.txt", content, "text/plain")}
     r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Assn Course"})
-    assert r.status_code == 201
+    assert r.status_code == 202
     return r.json()["id"]
 
 
@@ -44,3 +44,21 @@ def test_generate_list_get_submit_assignment(client: TestClient) -> None:
     res = r.json()
     assert res["total"] == n
     assert isinstance(res["score"], int)
+
+
+def test_list_assignments_query_count_is_constant(client: TestClient, sql_statements: list[str]) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+    client.post(f"/courses/{cid}/assignments/generate", headers=headers)
+
+    sql_statements.clear()
+    assert len(client.get(f"/courses/{cid}/assignments", headers=headers).json()) == 1
+    one = len(sql_statements)
+
+    for _ in range(3):
+        client.post(f"/courses/{cid}/assignments/generate", headers=headers)
+    sql_statements.clear()
+    listed = client.get(f"/courses/{cid}/assignments", headers=headers).json()
+    assert len(listed) == 4 and all(a["num_questions"] >= 1 for a in listed)
+    assert len(sql_statements) == one
+    assert not any("assignmentquestion" in s.lower() for s in sql_statements)
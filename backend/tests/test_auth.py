@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+import pytest
 from fastapi.testclient import TestClient
 
+from app import routes_auth
+
 
 def test_register_login_me_flow(client: TestClient) -> None:
     # Register
@@ -20,4 +23,48 @@ def test_register_login_me_flow(client: TestClient) -> None:
     r = client.get("/auth/me", headers={"Authorization": f"Bearer {token}"})
     assert r.status_code == 200, r.text
     me = r.json()
-    assert me["email"] == "a@example.com"
\ No newline at end of file
+    assert me["email"] == "a@example.com"
+
+def test_email_is_case_insensitive(client: TestClient) -> None:
+    r = client.post("/auth/register", json={"email": " Mixed@Example.com", "password": "secret123"})
+    assert r.status_code == 201, r.text
+    assert r.json()["email"] == "mixed@example.com"
+
+    r = client.post("/auth/login", json={"email": "MIXED@example.COM", "password": "secret123"})
+    assert r.status_code == 200, r.text
+
+    r = client.post("/auth/register", json={"email": "mixed@example.com", "password": "other"})
+    assert r.status_code == 400
+
+
+def test_login_unknown_email_still_verifies_a_hash(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[int] = []
+
+    async def fake_dummy_verify() -> None:  # the real one runs in the bcrypt worker processes
+        calls.append(1)
+
+    monkeypatch.setattr(routes_auth, "dummy_verify_password_async", fake_dummy_verify)
+    r = client.post("/auth/login", json={"email": "nobody@example.com", "password": "secret123"})
+    assert r.status_code == 401
+    assert calls == [1]
+
+
+def test_email_normalization_refuses_colliding_accounts(test_engine, monkeypatch: pytest.MonkeyPatch) -> None:
+    from app import db
+
+    monkeypatch.setattr(db, "engine", test_engine)
+    with test_engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO \"user\" (email, password_hash) VALUES ('Old@Example.com', 'x'), ('old@example.com', 'y'), (' Solo@Example.com', 'z')"
+        )
+    with pytest.raises(RuntimeError, match="old@example.com"):
+        db._normalize_user_emails()
+
+    with test_engine.begin() as conn:
+        conn.exec_driver_sql("DELETE FROM \"user\" WHERE email = 'old@example.com'")
+    db._normalize_user_emails()
+    with test_engine.begin() as conn:
+        emails = {row[0] for row in conn.exec_driver_sql('SELECT email FROM "user"')}
+        conn.exec_driver_sql("DELETE FROM \"user\" WHERE email IN ('old@example.com', 'solo@example.com')")
+    assert {"old@example.com", "solo@example.com"} <= emails
+    assert "Old@Example.com" not in emails and " Solo@Example.com" not in emails
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
 from fastapi.testclient import TestClient
+from sqlmodel import Session, select
+
+from app.models import Flashcard, FlashcardItem, Quiz, QuizQuestion
 
 
 def auth_headers(client: TestClient) -> dict[str, str]:
@@ -10,22 +13,33 @@ def auth_headers(client: TestClient) -> dict[str, str]:
     return {"Authorization": f"Bearer {token}"}
 
 
-def test_course_delete_cascade(client: TestClient) -> None:
+def test_course_delete_cascade(client: TestClient, test_engine, sql_statements: list[str]) -> None:
     headers = auth_headers(client)
     content = b"One\nTwo\nThree\n"
     files = {"file": ("c.txt", content, "text/plain")}
     r = client.post("/courses/upload", headers=headers, files=files, data={"title": "ToDelete"})
-    assert r.status_code == 201
+    assert r.status_code == 202
     cid = r.json()["id"]
 
     # create dependent data
     client.post(f"/profile/courses/{cid}/schedule", headers=headers)
     client.post(f"/courses/{cid}/quizzes/generate", headers=headers)
     client.post(f"/courses/{cid}/assignments/generate", headers=headers)
+    fid = client.post(f"/courses/{cid}/flashcards/generate", headers=headers).json()["id"]
+    qid = client.get(f"/courses/{cid}/quizzes", headers=headers).json()[0]["id"]
 
     # delete
+    sql_statements.clear()
     r = client.delete(f"/courses/{cid}", headers=headers)
     assert r.status_code == 204
+    # Child ids are matched in subqueries, never fetched first: only the ownership lookup is a SELECT
+    assert sum(not s.startswith("DELETE") for s in sql_statements) == 1
+
+    with Session(test_engine) as session:
+        assert session.exec(select(Flashcard).where(Flashcard.id == fid)).first() is None
+        assert session.exec(select(FlashcardItem).where(FlashcardItem.flashcard_id == fid)).first() is None
+        assert session.exec(select(Quiz).where(Quiz.id == qid)).first() is None
+        assert session.exec(select(QuizQuestion).where(QuizQuestion.quiz_id == qid)).first() is None
 
     # ensure gone
     r = client.get(f"/courses/{cid}", headers=headers)
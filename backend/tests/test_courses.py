@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import pytest
 from fastapi.testclient import TestClient
+from sqlmodel import Session
+
+from app import routes_courses
+from app.models import Course
 
 
 def auth_headers(client: TestClient) -> dict[str, str]:
@@ -20,14 +25,79 @@ def test_upload_and_get_course(client: TestClient) -> None:
         "title": "Algebra Basics",
     }
     r = client.post("/courses/upload", headers=headers, files=files, data=data)
-    assert r.status_code == 201, r.text
+    assert r.status_code == 202, r.text
     course = r.json()
     assert course["title"] == "Algebra Basics"
-    assert len(course["syllabus"]) >= 1
+    # Accepted before processing; the syllabus is built in the background
+    assert course["status"] == "uploading" and course["syllabus"] == []
 
     cid = course["id"]
+    r = client.get(f"/courses/{cid}/status", headers=headers)
+    assert r.json()["status"] == "complete"
     r = client.get(f"/courses/{cid}", headers=headers)
     assert r.status_code == 200
     got = r.json()
     assert got["id"] == cid
-    assert len(got["syllabus"]) == len(course["syllabus"])
\ No newline at end of file
+    assert len(got["syllabus"]) >= 1
+
+def test_failed_processing_is_reported_in_status(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    def boom(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(routes_courses, "generate_syllabus", boom)
+    headers = auth_headers(client)
+    files = {"file": ("c.txt", b"Chapter 1\nSets.\n", "text/plain")}
+    r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Broken"})
+    assert r.status_code == 202
+    status = client.get(f"/courses/{r.json()['id']}/status", headers=headers).json()
+    assert status["status"] == "error"
+
+
+def test_ai_step_status_is_served_live_and_committed(
+    client: TestClient, test_engine, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    headers = auth_headers(client)
+    seen: dict[str, object] = {}
+    real_generate = routes_courses.generate_syllabus
+
+    def generate(text, **kwargs):
+        cid = next(iter(routes_courses._COURSE_PROGRESS))
+        seen["live"] = client.get(f"/courses/{cid}/status", headers=headers).json()["status"]
+        with Session(test_engine) as other:
+            seen["stored"] = other.get(Course, cid).status
+        return real_generate(text, **kwargs)
+
+    monkeypatch.setattr(routes_courses, "generate_syllabus", generate)
+    files = {"file": ("c.txt", b"Chapter 1\nSets.\nChapter 2\nMaps.\n", "text/plain")}
+    cid = client.post("/courses/upload", headers=headers, files=files, data={"title": "Live"}).json()["id"]
+
+    # Committed before the (possibly long) AI step, so /status on another worker sees it too
+    assert seen == {"live": "ai_processing", "stored": "ai_processing"}
+    assert cid not in routes_courses._COURSE_PROGRESS
+    assert client.get(f"/courses/{cid}/status", headers=headers).json()["status"] == "complete"
+
+
+def test_upload_commits_off_the_event_loop(client: TestClient, test_engine) -> None:
+    import asyncio
+
+    from sqlalchemy import event
+
+    headers = auth_headers(client)
+    on_loop: list[bool] = []
+
+    def record(_conn) -> None:
+        try:
+            asyncio.get_running_loop()
+            on_loop.append(True)
+        except RuntimeError:
+            on_loop.append(False)
+
+    event.listen(test_engine, "commit", record)
+    try:
+        files = {"file": ("c.txt", b"Chapter 1\nSets.\n", "text/plain")}
+        r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Off loop"})
+    finally:
+        event.remove(test_engine, "commit", record)
+
+    assert r.status_code == 202 and r.json()["created_at"]
+    assert on_loop and not any(on_loop)
@@ -35,7 +35,112 @@ def test_upload_pdf_when_supported(client: TestClient) -> None:
     files = {"file": ("syllabus.pdf", content, "application/pdf")}
     data = {"title": "PDF Course"}
     r = client.post("/courses/upload", headers=headers, files=files, data=data)
-    assert r.status_code == 201, r.text
-    course = r.json()
+    assert r.status_code == 202, r.text
+    course = client.get(f"/courses/{r.json()['id']}", headers=headers).json()
     assert course["title"] == "PDF Course"
+    assert course["num_pages"] == 1
     assert len(course["syllabus"]) >= 1
+
+    r = client.get(f"/courses/{course['id']}/readings", headers=headers)
+    assert r.status_code == 200
+    readings = r.json()
+    assert [rd["syllabus_item_id"] for rd in readings] == [it["id"] for it in course["syllabus"]]
+
+
+def test_page_texts_match_in_pool_and_in_process(tmp_path, monkeypatch) -> None:
+    if fitz is None:
+        return
+    from app import ai
+
+    doc = fitz.open()
+    for n in range(7):
+        doc.new_page().insert_text((72, 72), f"Page body {n + 1}")
+    path = str(tmp_path / "book.pdf")
+    doc.save(path)
+
+    serial = ai.extract_pdf_page_texts(path)
+    monkeypatch.setattr(ai, "_PARALLEL_HEADER_SCAN_MIN_PAGES", 0)
+    monkeypatch.setattr(ai, "_HEADER_SCAN_CHUNK_PAGES", 3)
+    monkeypatch.setenv("SUMMIT_PDF_WORKERS", "2")
+    assert ai.extract_pdf_page_texts(path) == serial
+    assert [t.strip() for t in serial] == [f"Page body {n + 1}" for n in range(7)]
+
+
+def test_pdf_is_served_with_validators_and_ranges(client: TestClient) -> None:
+    if fitz is None:
+        return
+    headers = auth_headers(client)
+    files = {"file": ("cached.pdf", make_pdf_bytes("Chapter 1\n"), "application/pdf")}
+    cid = client.post("/courses/upload", headers=headers, files=files, data={"title": "Cached PDF"}).json()["id"]
+
+    r = client.get(f"/courses/{cid}/pdf", headers=headers)
+    assert r.status_code == 200 and r.content.startswith(b"%PDF")
+    assert r.headers["cache-control"] == "private, max-age=3600"
+    etag = r.headers["etag"]
+
+    r = client.get(f"/courses/{cid}/pdf", headers={**headers, "If-None-Match": etag})
+    assert r.status_code == 304 and r.content == b"" and r.headers["etag"] == etag
+    for if_none_match in (f'"other", W/{etag}', "*"):
+        r = client.get(f"/courses/{cid}/pdf", headers={**headers, "If-None-Match": if_none_match})
+        assert r.status_code == 304
+    r = client.get(f"/courses/{cid}/pdf", headers={**headers, "If-None-Match": '"other"'})
+    assert r.status_code == 200
+
+    r = client.get(f"/courses/{cid}/pdf", headers={**headers, "Range": "bytes=0-3"})
+    assert r.status_code == 206 and r.content == b"%PDF"
+
+
+def test_pdf_processing_runs_off_the_event_loop(client: TestClient, test_engine, monkeypatch) -> None:
+    import asyncio
+
+    from sqlmodel import Session, select
+
+    from app import routes_courses
+    from app.models import Course
+
+    seen: dict[str, object] = {}
+
+    def fake_extract(pdf_path: str) -> list[str]:
+        try:
+            asyncio.get_running_loop()
+            seen["extract_on_loop"] = True
+        except RuntimeError:
+            seen["extract_on_loop"] = False
+        return ["Chapter 1", "Chapter 2"]
+
+    async def fake_syllabus(pdf_path, total_pages, use_ai=False, debug_log_path=None):
+        asyncio.get_running_loop()
+        seen["syllabus_awaited"] = True
+        # The long AI step is visible in the row, not only in this process's progress dict
+        with Session(test_engine) as s:
+            seen["row_status"] = s.scalar(select(Course.status).where(Course.pdf_path == pdf_path))
+        return [{"title": "Only", "summary": "s", "start_page": 1, "end_page": total_pages}]
+
+    monkeypatch.setattr(routes_courses, "extract_pdf_page_texts", fake_extract)
+    monkeypatch.setattr(routes_courses, "generate_intelligent_syllabus", fake_syllabus)
+    headers = auth_headers(client)
+    files = {"file": ("loop.pdf", b"%PDF-1.4 stub", "application/pdf")}
+    cid = client.post("/courses/upload", headers=headers, files=files, data={"title": "Loop"}).json()["id"]
+
+    assert seen == {"extract_on_loop": False, "syllabus_awaited": True, "row_status": "ai_processing"}
+    assert client.get(f"/courses/{cid}/status", headers=headers).json()["status"] == "complete"
+    readings = client.get(f"/courses/{cid}/readings", headers=headers).json()
+    assert [(r["start_page"], r["end_page"]) for r in readings] == [(1, 2)]
+
+
+def test_header_scan_covers_books_shorter_than_the_sample(tmp_path) -> None:
+    if fitz is None:
+        return
+    from app.ai import extract_all_headers_from_pdf
+
+    doc = fitz.open()
+    for n in range(6):
+        page = doc.new_page()
+        if n % 2 == 0:
+            page.insert_text((72, 72), f"Chapter {n // 2 + 1}", fontsize=24)
+        page.insert_text((72, 120), "Body text " * 8, fontsize=10)
+    path = str(tmp_path / "short.pdf")
+    doc.save(path)
+
+    headers = extract_all_headers_from_pdf(path, 6)
+    assert [(h["text"], h["page"]) for h in headers] == [("Chapter 1", 1), ("Chapter 2", 3), ("Chapter 3", 5)]
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+
+def auth_headers(client: TestClient) -> dict[str, str]:
+    client.post("/auth/register", json={"email": "fc@example.com", "password": "pw123456"})
+    r = client.post("/auth/login", json={"email": "fc@example.com", "password": "pw123456"})
+    token = r.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def create_course(client: TestClient, headers: dict[str, str]) -> int:
+    content = b"Intro\nPart One\nPart Two\nPart Three\nPart Four\n"
+    files = {"file": ("c.txt", content, "text/plain")}
+    r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Cards Course"})
+    assert r.status_code == 202
+    return r.json()["id"]
+
+
+def test_list_flashcards_query_count_is_constant(client: TestClient, sql_statements: list[str]) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+    assert client.post(f"/courses/{cid}/flashcards/generate", headers=headers).status_code == 201
+
+    sql_statements.clear()
+    assert len(client.get(f"/courses/{cid}/flashcards", headers=headers).json()) == 1
+    one = len(sql_statements)
+
+    for _ in range(2):
+        assert client.post(f"/courses/{cid}/flashcards/generate", headers=headers).status_code == 201
+    sql_statements.clear()
+    listed = client.get(f"/courses/{cid}/flashcards", headers=headers).json()
+    assert len(listed) == 3 and all(fc["num_cards"] >= 1 and fc["syllabus_item_title"] for fc in listed)
+    # Counts are stored on the set and titles come from one IN query, however many sets exist
+    assert len(sql_statements) == one
+    assert not any("flashcarditem" in s.lower() for s in sql_statements)
+
+
+def test_delete_flashcard_set_removes_cards_without_loading_them(client: TestClient, sql_statements: list[str]) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+    fid = client.post(f"/courses/{cid}/flashcards/generate", headers=headers).json()["id"]
+
+    sql_statements.clear()
+    assert client.delete(f"/courses/flashcards/{fid}", headers=headers).status_code == 204
+    card_statements = [s.lower() for s in sql_statements if "flashcarditem" in s.lower()]
+    assert len(card_statements) == 1 and card_statements[0].startswith("delete")
+
+    assert client.get(f"/courses/flashcards/{fid}", headers=headers).status_code == 404
+    assert client.get(f"/courses/{cid}/flashcards", headers=headers).json() == []
@@ -7,3 +7,19 @@ def test_health(client: TestClient) -> None:
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_json_routes_serialize_through_response_models(client: TestClient) -> None:
+    from fastapi.datastructures import DefaultPlaceholder
+    from fastapi.routing import APIRoute
+
+    # FastAPI writes JSON bytes straight from pydantic-core only when a route has a response
+    # model/return type and no custom response class (e.g. ORJSONResponse) is set
+    slow = [
+        route.path
+        for route in client.app.routes
+        if isinstance(route, APIRoute)
+        and route.status_code != 204
+        and not (route.response_field is not None and isinstance(route.response_class, DefaultPlaceholder))
+    ]
+    assert slow == []
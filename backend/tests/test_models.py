@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from collections import Counter
+
+from sqlmodel import SQLModel
+
+from app import models
+
+
+def test_each_table_is_mapped_once() -> None:
+    mapped = Counter(mapper.local_table.name for mapper in SQLModel._sa_registry.mappers)
+    assert set(mapped) == set(SQLModel.metadata.tables)
+    assert all(count == 1 for count in mapped.values()), mapped
+
+
+def test_read_models_are_built_at_import() -> None:
+    reads = [
+        cls
+        for cls in vars(models).values()
+        if isinstance(cls, type) and issubclass(cls, SQLModel) and cls.__name__.endswith("Read")
+    ]
+    assert reads
+    # Schemas compile when the module is imported, not on the first request, and ORM rows
+    # validate directly via attribute access
+    assert all(cls.__pydantic_complete__ and cls.model_config.get("from_attributes") for cls in reads)
+
+
+def test_large_text_columns_are_deferred(test_engine, sql_statements: list[str]) -> None:
+    from sqlmodel import Session
+
+    with Session(test_engine) as session:
+        course = models.Course(user_id=1, title="Deferred", raw_text="x" * 1000)
+        session.add(course)
+        session.commit()
+        course_id = course.id
+
+    with Session(test_engine) as session:
+        course = session.get(models.Course, course_id)
+        assert "raw_text" not in sql_statements[-1]
+        assert course.raw_text == "x" * 1000  # loaded on first access
+        assert "raw_text" in sql_statements[-1]
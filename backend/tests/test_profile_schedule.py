@@ -14,7 +14,7 @@ def make_course(client: TestClient, headers: dict[str, str]) -> int:
     content = b"A\nB\nC\nD\nE\n"
     files = {"file": ("c.txt", content, "text/plain")}
     r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Sched"})
-    assert r.status_code == 201
+    assert r.status_code == 202
     return r.json()["id"]
 
 
@@ -40,3 +40,13 @@ def test_profile_defaults_and_update_and_schedule(client: TestClient) -> None:
     assert len(sched) >= 1
     # week indices should be within duration_weeks
     assert max(it["week_index"] for it in sched) <= prof2["duration_weeks"] - 1
+
+
+def test_profile_update_does_not_reload_after_commit(client: TestClient, sql_statements: list[str]) -> None:
+    headers = auth_headers(client)
+    client.get("/profile/me", headers=headers)
+    sql_statements.clear()
+    r = client.put("/profile/me", headers=headers, json={"weekly_hours": 7})
+    assert r.json()["weekly_hours"] == 7
+    selects = [s for s in sql_statements if s.lstrip().upper().startswith("SELECT") and "userprofile" in s]
+    assert len(selects) == 1
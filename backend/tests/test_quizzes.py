@@ -1,7 +1,12 @@
 from __future__ import annotations
 
+from types import SimpleNamespace
+
+import pytest
 from fastapi.testclient import TestClient
 
+from app import routes_quizzes
+
 
 def auth_headers(client: TestClient) -> dict[str, str]:
     client.post("/auth/register", json={"email": "q@example.com", "password": "pw123456"})
@@ -15,7 +20,7 @@ def create_course(client: TestClient, headers: dict[str, str]) -> int:
     files = {"file": ("c.txt", content, "text/plain")}
     data = {"title": "Course Q"}
     r = client.post("/courses/upload", headers=headers, files=files, data=data)
-    assert r.status_code == 201, r.text
+    assert r.status_code == 202, r.text
     return r.json()["id"]
 
 
@@ -43,6 +48,7 @@ def test_generate_list_get_submit_quiz(client: TestClient) -> None:
     detail = r.json()
     assert detail["id"] == qid
     n = len(detail["questions"]) 
+    assert lst[0]["num_questions"] == n
 
     # Submit
     answers = [0] * n
@@ -51,3 +57,52 @@ def test_generate_list_get_submit_quiz(client: TestClient) -> None:
     res = r.json()
     assert res["total"] == n
     assert isinstance(res["score"], int)
+
+
+def test_list_quizzes_query_count_is_constant(client: TestClient, sql_statements: list[str]) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+    client.post(f"/courses/{cid}/quizzes/generate", headers=headers)
+
+    sql_statements.clear()
+    assert len(client.get(f"/courses/{cid}/quizzes", headers=headers).json()) == 1
+    one = len(sql_statements)
+
+    for _ in range(3):
+        client.post(f"/courses/{cid}/quizzes/generate", headers=headers)
+    sql_statements.clear()
+    assert len(client.get(f"/courses/{cid}/quizzes", headers=headers).json()) == 4
+    assert len(sql_statements) == one
+    assert not any("quizquestion" in s.lower() for s in sql_statements)
+
+
+def test_grade_upload_uses_shared_client(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+    qid = client.post(f"/courses/{cid}/quizzes/generate", headers=headers).json()["id"]
+    n = len(client.get(f"/courses/quizzes/{qid}", headers=headers).json()["questions"])
+    expected = client.post(f"/courses/quizzes/{qid}/submit", headers=headers, json=[0] * n).json()
+
+    # The grader reports answer 0 everywhere; the route recomputes the score against the key
+    reply = SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content='{"answers": %s, "score": 99}' % ([0] * n)))])
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **_kw: reply)))
+    monkeypatch.setattr(routes_quizzes, "should_use_ai", lambda: True)
+    monkeypatch.setattr(routes_quizzes, "sync_client", lambda: fake)
+
+    files = {"file": ("answers.txt", b"1. A\n2. B\n", "text/plain")}
+    r = client.post(f"/courses/quizzes/{qid}/grade-upload", headers=headers, files=files)
+    assert r.status_code == 200, r.text
+    assert r.json() == {"score": expected["score"], "total": n}
+
+
+def test_failed_generation_leaves_no_quiz(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    headers = auth_headers(client)
+    cid = create_course(client, headers)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError("model unavailable")
+
+    monkeypatch.setattr(routes_quizzes, "generate_quiz_from_titles", boom)
+    with pytest.raises(RuntimeError):
+        client.post(f"/courses/{cid}/quizzes/generate", headers=headers)
+    assert client.get(f"/courses/{cid}/quizzes", headers=headers).json() == []
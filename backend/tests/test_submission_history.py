@@ -14,7 +14,7 @@ def make_course(client: TestClient, headers: dict[str, str]) -> int:
     content = b"Intro\nPart One\nPart Two\nPart Three\n"
     files = {"file": ("c.txt", content, "text/plain")}
     r = client.post("/courses/upload", headers=headers, files=files, data={"title": "Hist Course"})
-    assert r.status_code == 201
+    assert r.status_code == 202
     return r.json()["id"]
 
 
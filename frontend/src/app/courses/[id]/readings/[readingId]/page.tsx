@@ -191,31 +191,36 @@ export default function ReadingPage() {
       setMessages(prev => [...prev, { role: "assistant", content: "", pageContext: page }]);
 
       if (reader) {
-        while (true) {
+        // Events are JSON payloads separated by a blank line; a read can end mid-event
+        let pending = "";
+        let finished = false;
+        while (!finished) {
           const { done, value } = await reader.read();
           if (done) break;
 
-          const chunk = decoder.decode(value);
-          const lines = chunk.split("\n");
-
-          for (const line of lines) {
-            if (line.startsWith("data: ")) {
-              const data = line.substring(6);
-              if (data === "[DONE]") {
-                break;
-              }
-              accumulatedContent += data;
-              // Update the last message (assistant's message)
-              setMessages(prev => {
-                const newMessages = [...prev];
-                newMessages[newMessages.length - 1] = {
-                  role: "assistant",
-                  content: accumulatedContent,
-                  pageContext: page
-                };
-                return newMessages;
-              });
+          pending += decoder.decode(value, { stream: true });
+          const events = pending.split("\n\n");
+          pending = events.pop() ?? "";
+
+          for (const event of events) {
+            if (!event.startsWith("data: ")) continue;
+            const payload = JSON.parse(event.substring(6)) as { token?: string; done?: boolean };
+            if (payload.done) {
+              finished = true;
+              break;
             }
+            if (!payload.token) continue;
+            accumulatedContent += payload.token;
+            // Update the last message (assistant's message)
+            setMessages(prev => {
+              const newMessages = [...prev];
+              newMessages[newMessages.length - 1] = {
+                role: "assistant",
+                content: accumulatedContent,
+                pageContext: page
+              };
+              return newMessages;
+            });
           }
         }
       }
@@ -1,6 +1,6 @@
 "use client";
 
-import { useEffect, useState } from "react";
+import { useCallback, useEffect, useState } from "react";
 import { api } from "@/lib/api";
 import toast from "react-hot-toast";
 import Link from "next/link";
@@ -14,10 +14,18 @@ import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
 import { Upload } from "lucide-react";
 import AppLayout from "@/components/AppLayout";
+import { CourseCreationProgress } from "@/components/CourseCreationProgress";
 
 export default function CoursesPage() {
   const { auth } = useAuth();
   const router = useRouter();
+  const [processing, setProcessing] = useState<Course | null>(null);
+
+  const handleProcessingComplete = useCallback(() => {
+    if (!processing) return;
+    // Navigate to the new course page
+    router.push(`/courses/${processing.id}`);
+  }, [processing, router]);
 
   if (!auth.token) {
     return (
@@ -41,10 +49,9 @@ export default function CoursesPage() {
     // Clear the course cache to force refresh in AppLayout sidebar
     sessionStorage.removeItem('summit_courses');
 
-    // Navigate to the new course page
-    router.push(`/courses/${course.id}`);
+    // The syllabus is built in the background; show progress until it is ready
+    setProcessing(course);
   };
-
   return (
     <AppLayout>
       <div className="flex-1 overflow-auto bg-white dark:bg-gray-900">
@@ -77,6 +84,14 @@ export default function CoursesPage() {
               </CardHeader>
               <CardContent>
                 <UploadForm onUploaded={handleCourseUploaded} />
+                {processing && (
+                  <CourseCreationProgress
+                    courseId={processing.id}
+                    courseName={processing.title}
+                    onComplete={handleProcessingComplete}
+                    onMinimize={() => setProcessing(null)}
+                  />
+                )}
               </CardContent>
             </Card>
           </div>
@@ -111,7 +126,7 @@ function UploadForm({ onUploaded }: { onUploaded: (c: Course) => void }) {
         fileInputRef.current.value = '';
       }
 
-      toast.success("Course created successfully! Redirecting...");
+      toast.success("Upload received! Building your course...");
 
       // Clear the course cache to force refresh
       sessionStorage.removeItem('summit_courses');
@@ -4,6 +4,7 @@ import { useEffect, useState } from 'react'
 import { CheckCircle2, Loader2, Circle, Minimize2 } from 'lucide-react'
 import { Dialog, DialogContent, DialogHeader, DialogTitle } from '@/components/ui/dialog'
 import { Button } from '@/components/ui/button'
+import { api } from '@/lib/api'
 
 interface CourseCreationProgressProps {
   courseId: number
@@ -48,21 +49,18 @@ export function CourseCreationProgress({ courseId, courseName, onComplete, onMin
   useEffect(() => {
     const pollStatus = async () => {
       try {
-        const res = await fetch(`/api/courses/${courseId}/status`, {
-          credentials: 'include'
-        })
+        const data = await api.courseStatus(courseId)
+        setCurrentStatus(data.status)
+        setStatusMessage(data.status_message || '')
+        setProgress(data.progress_percent || 0)
 
-        if (res.ok) {
-          const data = await res.json()
-          setCurrentStatus(data.status)
-          setStatusMessage(data.status_message || '')
-          setProgress(data.progress_percent || 0)
-
-          if (data.status === 'complete') {
-            setTimeout(() => {
-              onComplete()
-            }, 1000) // Show complete state for 1 second
-          }
+        if (data.status === 'complete' || data.status === 'error') {
+          clearInterval(interval)
+        }
+        if (data.status === 'complete') {
+          setTimeout(() => {
+            onComplete()
+          }, 1000) // Show complete state for 1 second
         }
       } catch (error) {
         console.error('Failed to fetch course status:', error)
@@ -127,6 +125,9 @@ export function CourseCreationProgress({ courseId, courseName, onComplete, onMin
             />
           </div>
           <p className="text-xs text-gray-500 text-center mt-1">{progress}%</p>
+          {currentStatus === 'error' && (
+            <p className="text-sm text-red-600 text-center mt-2">{statusMessage}</p>
+          )}
         </div>
       </DialogContent>
     </Dialog>
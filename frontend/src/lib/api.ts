@@ -64,8 +64,13 @@ export const api = {
       const text = await resp.text().catch(() => "");
       throw new Error(`Upload failed ${resp.status}: ${text || resp.statusText}`);
     }
+    // 202: the syllabus is built in the background; poll courseStatus until "complete"
     return (await resp.json()) as import("@/types/course").CourseWithSyllabus;
   },
+  courseStatus: (courseId: number) =>
+    fetchJson<{ id: number; title: string; status: string; status_message: string | null; progress_percent: number }>(
+      `/courses/${courseId}/status`
+    ),
   renameCourse: (courseId: number, newTitle: string) =>
     fetchJson<import("@/types/course").Course>(`/courses/${courseId}`, {
       method: "PUT",